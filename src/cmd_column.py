@@ -1,16 +1,22 @@
-from dataclasses import dataclass
+import json
 from typing import Optional
 
 import click
 
 from src.cmd_common import option_path
-from src.csv import csv_file_reader, csv_file_writer
+from src.csv import csv_file_reader, csv_file_transform, csv_file_writer
 from src.table_utl import (
-    column_exclusive_index_group,
-    column_fill_index,
-    column_merge_index_group,
-    column_quote,
-    column_replace_index,
+    column_group_levels,
+    column_if_terms,
+    rows_column_add,
+    rows_column_del,
+    rows_column_exclusive_levels,
+    rows_column_fill,
+    rows_column_merge_levels,
+    rows_column_move,
+    rows_column_quote,
+    rows_column_replace,
+    rows_column_select,
     table_sort,
 )
 
@@ -33,6 +39,27 @@ def option_value_list(value_list: str) -> list[str]:
     return [v for v in value_list[1:-1].split(",")]
 
 
+def option_group_levels(column_group: tuple[str, ...]) -> list[list[list[int]]]:
+    """!
+    @brief オプションのカラムグループ(入れ子を含む)を階層ごとのカラムグループに変換する
+    @param column_group カラムグループのタプル。"[index[,...]]"または"[[index[,...]][,...]]"
+    @return 階層ごとのカラムグループのリスト。先頭が最上位の階層
+    """
+    column_group_tree = []
+    for value in column_group:
+        if value.count("[") == 1:
+            column_group_tree.append(option_index_list(value))
+            continue
+        try:
+            column_group_tree.append(json.loads(value))
+        except json.JSONDecodeError:
+            raise click.BadParameter(f'入れ子のカラムグループは"[[index[,...]][,...]]"の形式である必要があります。{value}')
+    try:
+        return column_group_levels(column_group_tree)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
 def custom_group_index_list(ctx: click.core.Context, param: click.Option, value: tuple[str, ...]):
     """!
     @brief 独自のチェックを行う関数。グループインデックスリストのチェックを行う。
@@ -79,10 +106,12 @@ def cmd_column_add(input: Optional[str], output: Optional[str], column: str, col
     input_path, output_path = option_path(input, output)
     column_index_list = option_index_list(column)
     # 実行
-    tbl = csv_file_reader(input_path)
-    for column in sorted(column_index_list, reverse=True):  # カラムの最後から追加する
-        tbl.table_column_add(column, column_count=column_count)
-    csv_file_writer(output_path, tbl)
+    csv_file_transform(
+        input_path,
+        output_path,
+        lambda rows: rows_column_add(rows, column_index_list, column_count=column_count),
+        columns=column_index_list,
+    )
     return
 
 
@@ -93,11 +122,11 @@ def cmd_column_add(input: Optional[str], output: Optional[str], column: str, col
 def cmd_column_del(input: Optional[str], output: Optional[str], column: str) -> None:
     input_path, output_path = option_path(input, output)
     column_index_list = option_index_list(column)
+    # 削除はインデックスの大きい順に行うため、重複したインデックスはその右のカラムを削除する。
+    # よって、最大のインデックスからインデックスの数だけ右のカラムまで分割する
+    columns = column_index_list + [max(column_index_list) + len(column_index_list) - 1]
     # 実行
-    tbl = csv_file_reader(input_path)
-    for column in sorted(column_index_list, reverse=True):  # インデックスの大きい順に削除する
-        tbl.table_column_del(column)
-    csv_file_writer(output_path, tbl)
+    csv_file_transform(input_path, output_path, lambda rows: rows_column_del(rows, column_index_list), columns=columns)
     return
 
 
@@ -110,15 +139,13 @@ def cmd_column_del(input: Optional[str], output: Optional[str], column: str) ->
     multiple=True,
     required=True,
     type=str,
-    help="カラムのインデックスリスト。2回以上指定する。[index[,...]]",
+    help="カラムのインデックスリスト。2回以上指定する。[index[,...]]。入れ子にすると階層ごとに処理する。[[index[,...]][,...]]",
 )
 def cmd_column_exclusive(input: Optional[str], output: Optional[str], column_group: tuple[str]) -> None:
     input_path, output_path = option_path(input, output)
-    column_group_list = [option_index_list(i) for i in column_group]
+    column_group_levels = option_group_levels(column_group)
     # 実行
-    tbl = csv_file_reader(input_path)
-    column_exclusive_index_group(tbl, column_group_list)
-    csv_file_writer(output_path, tbl)
+    csv_file_transform(input_path, output_path, lambda rows: rows_column_exclusive_levels(rows, column_group_levels))
     return
 
 
@@ -140,7 +167,16 @@ def cmd_column_exclusive(input: Optional[str], output: Optional[str], column_gro
     show_default=True,
     help="置換する値。--value-sourceの指定値により意味が異なる。constant: セットする値 column: カラムのインデックス",
 )
-@click.option("--column-if", type=str, help="行のカラムの値に基づいて、置換を実行するかどうかを判定する")
+@click.option(
+    "--column-if",
+    type=str,
+    help="行のカラムの値に基づいて、置換を実行するかどうかを判定する。比較をand,orで組み合わせることができる",
+)
+@click.option(
+    "--column-if-typed",
+    is_flag=True,
+    help="--column-ifの==,!=で、値が数値の場合にカラムの値を数値として比較する",
+)
 def cmd_column_fill(
     input: Optional[str],
     output: Optional[str],
@@ -148,14 +184,24 @@ def cmd_column_fill(
     value_source: str,
     value: str,
     column_if: Optional[str],
+    column_if_typed: bool,
 ) -> None:
     input_path, output_path = option_path(input, output)
     column_index_list = option_index_list(column)
     # 実行
-    tbl = csv_file_reader(input_path)
-    for column in column_index_list:
-        column_fill_index(tbl, column, value_source, value, column_if=column_if)
-    csv_file_writer(output_path, tbl)
+    columns = list(column_index_list)  # 参照するカラム
+    if value_source == "column":
+        columns.append(int(value))
+    if column_if is not None:
+        columns.extend(term.column_index for terms in column_if_terms(column_if) for term in terms)
+    csv_file_transform(
+        input_path,
+        output_path,
+        lambda rows: rows_column_fill(
+            rows, column_index_list, value_source, value, column_if=column_if, column_if_typed=column_if_typed
+        ),
+        columns=columns,
+    )
     return
 
 
@@ -175,29 +221,38 @@ def cmd_column_fill(
     multiple=True,
     required=True,
     type=str,
-    help="カラムのインデックスリスト。2回以上指定する。[index[,...]]",
+    help="カラムのインデックスリスト。2回以上指定する。[index[,...]]。入れ子にすると階層ごとに処理する。[[index[,...]][,...]]",
+)
+@click.option("--group-by-hash", is_flag=True, help="連続していない行もキーが一致すればマージする。出力は最初に出現した順")
+@click.option(
+    "--spill-groups",
+    type=click.IntRange(min=0),
+    help="--group-by-hashでメモリに保持するグループ数の上限。超えた場合は一時ファイルを使用する",
 )
 def cmd_column_merge(
-    input: Optional[str], output: Optional[str], column_key: str, column_group: tuple[str, ...]
+    input: Optional[str],
+    output: Optional[str],
+    column_key: str,
+    column_group: tuple[str, ...],
+    group_by_hash: bool,
+    spill_groups: Optional[int],
 ) -> None:
     input_path, output_path = option_path(input, output)
     column_key_index_list = option_index_list(column_key)
-    column_group_list = [option_index_list(i) for i in column_group]
+    column_group_levels = option_group_levels(column_group)
+    if spill_groups is not None and not group_by_hash:
+        raise click.BadParameter("--group-by-hashと同時に指定する必要があります。", param_hint="--spill-groups")
     # 実行
-    tbl = csv_file_reader(input_path)
-    column_merge_index_group(tbl, column_key_index_list, column_group_list)
-    csv_file_writer(output_path, tbl)
+    csv_file_transform(
+        input_path,
+        output_path,
+        lambda rows: rows_column_merge_levels(
+            rows, column_key_index_list, column_group_levels, group_by_hash=group_by_hash, group_max=spill_groups
+        ),
+    )
     return
 
 
-@dataclass
-class ColumnMoveFromTo:
-    index: int  # --fromオプションの順番
-    from_: int
-    to: int
-    column_list: list[str]
-
-
 @click.command(name="column-move", help="カラムを移動")
 @click.option("--input", "-i", type=click.Path(exists=True), help="入力ファイル,省略時は標準入力")
 @click.option("--output", "-o", type=click.Path(), help="出力ファイル,省略時は標準出力")
@@ -217,25 +272,10 @@ def cmd_column_move(from_: str, to: str, input: Optional[str], output: Optional[
     to_column_index_list = option_index_list(to)
     if len(from_column_index_list) != len(to_column_index_list):
         raise click.ClickException("--fromと--toに指定したインデックスの数が一致しません。")
-    #
-    column_move_from_to: list[ColumnMoveFromTo] = []
-    for i in range(len(from_column_index_list)):
-        from_index = from_column_index_list[i]
-        to_index = to_column_index_list[i]
-        ft = ColumnMoveFromTo(index=i, from_=from_index, to=to_index, column_list=[])
-        column_move_from_to.append(ft)
     # 実行
-    tbl = csv_file_reader(input_path)
-    # tbl.column_move(from_index=from_, to_index=to)
-    ## 削除
-    for ft in sorted(column_move_from_to, key=lambda x: x.from_, reverse=True):  # インデックスの大きい順に削除する
-        column_list = tbl.column_remove(ft.from_)
-        ft.column_list = column_list
-    ## 追加;インデックスの大きい方から追加する。インデックスが同じ場合は--fromの順番を維持する
-    for ft in sorted(column_move_from_to, key=lambda x: (x.to, x.index), reverse=True):
-        tbl.column_insert(ft.to, ft.column_list)
-
-    csv_file_writer(output_path, tbl)
+    csv_file_transform(
+        input_path, output_path, lambda rows: rows_column_move(rows, from_column_index_list, to_column_index_list)
+    )
     return
 
 
@@ -247,10 +287,9 @@ def cmd_column_quote(input: Optional[str], output: Optional[str], column: str) -
     input_path, output_path = option_path(input, output)
     column_index_list = option_index_list(column)
     # 実行
-    tbl = csv_file_reader(input_path)
-    for column in column_index_list:
-        column_quote(tbl, column)
-    csv_file_writer(output_path, tbl)
+    csv_file_transform(
+        input_path, output_path, lambda rows: rows_column_quote(rows, column_index_list), columns=column_index_list
+    )
     return
 
 
@@ -270,10 +309,12 @@ def cmd_column_replace(
     input_path, output_path = option_path(input, output)
     column_index_list = option_index_list(column)
     # 実行
-    tbl = csv_file_reader(input_path)
-    for column in column_index_list:
-        column_replace_index(tbl, column, regex, repl)
-    csv_file_writer(output_path, tbl)
+    csv_file_transform(
+        input_path,
+        output_path,
+        lambda rows: rows_column_replace(rows, column_index_list, regex, repl),
+        columns=column_index_list,
+    )
     return
 
 
@@ -285,9 +326,9 @@ def cmd_column_select(input: Optional[str], output: Optional[str], column: str)
     input_path, output_path = option_path(input, output)
     column_index_list = option_index_list(column)
     # 実行
-    tbl = csv_file_reader(input_path)
-    new_tbl = tbl.table_select_column_list(column_index_list)
-    csv_file_writer(output_path, new_tbl)
+    csv_file_transform(
+        input_path, output_path, lambda rows: rows_column_select(rows, column_index_list), columns=column_index_list
+    )
     return
 
 
@@ -311,7 +352,7 @@ def cmd_column_sort(
     else:
         column_attr_list = option_value_list(column_attr)
     # 実行
-    tbl = csv_file_reader(input_path)
+    tbl = csv_file_reader(input_path, columns=column_key_index_list, mutable=False)
     table_sort(tbl, set(column_key_index_list), column_attr_list, reverse=reverse)
     csv_file_writer(output_path, tbl)
     return
@@ -50,7 +50,7 @@ def cmd_csv_header_add(input: Optional[str], output: Optional[str], input_header
     input_header_path = Path(input_header)
     # 実行
     input_csv_filetype = csv_filetype_read(input_header_path)  # 追加するCSVヘッダファイルを読み込む
-    tbl = csv_file_reader(input_path)
+    tbl = csv_file_reader(input_path, mutable=False)
     tbl.table_header_add(input_csv_filetype)
     csv_file_writer(output_path, tbl)
     return
@@ -67,7 +67,7 @@ def cmd_csv_header_change(input: Optional[str], output: Optional[str], input_hea
     input_csv_filetype = csv_filetype_read(Path(input_header))
     output_csv_filetype = csv_filetype_read(Path(output_header))
     # 実行
-    tbl = csv_file_reader(input_path, csv_filetype=input_csv_filetype)
+    tbl = csv_file_reader(input_path, csv_filetype=input_csv_filetype, mutable=False)
     tbl.table_header_del()  # ヘッダを削除
     tbl.table_header_add(output_csv_filetype)  # 新しいヘッダを追加
     csv_file_writer(output_path, tbl)
@@ -94,7 +94,7 @@ def cmd_csv_header_del(
     else:
         raise click.ClickException("--input-header,--headerオプションのどちらかを指定してください。")
     # 実行
-    tbl = csv_file_reader(input_path, csv_filetype=input_csv_filetype)
+    tbl = csv_file_reader(input_path, csv_filetype=input_csv_filetype, mutable=False)
 
     tbl.table_header_del(header_count=header_count)
     csv_file_writer(output_path, tbl)
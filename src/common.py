@@ -1,23 +1,181 @@
+import bz2
+import codecs
+import gc
+import gzip
+import itertools
+import lzma
+import os
+import re
 import sys
+from contextlib import ExitStack, contextmanager
 from io import TextIOWrapper
 from pathlib import Path
-from typing import Optional, cast
+from typing import BinaryIO, Iterable, Iterator, Optional, cast
+
+from src.pipeline import ThreadWriteStream
+
+LINE_BATCH_SIZE = 4096  # 一度に処理する行数
+READ_BLOCK_SIZE = 1024 * 1024  # バイナリで一度に読み込むバイト数
+WRITE_CHUNK_ROWS = 4096  # 結合して一度に書き込む行数
+GZIP_COMPRESS_LEVEL = 6  # gzipの圧縮レベル。gzipコマンドの既定値
+ENCODING_AUTO = "auto"  # 入力の先頭から文字コードを判定する
+ENCODING_AUTO_FALLBACK = "cp932"  # UTF-8としてデコードできない場合の文字コード
+INTERN_TABLE_SIZE = 65536  # 値を共有するために保持する値の種類数の上限
+
+COMPRESSION_EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz", ".lzma": "xz"}  # 拡張子と圧縮形式
+# 圧縮形式とファイルの先頭のバイト列。bz2はASCIIの"BZh"で始まるため、ブロックサイズとブロック(空の場合は終端)の識別子まで照合する
+COMPRESSION_MAGICS = {
+    "gzip": re.compile(rb"\x1f\x8b"),
+    "bz2": re.compile(rb"BZh[1-9](1AY&SY|\x17rE8P\x90)"),
+    "xz": re.compile(rb"\xfd7zXZ\x00"),
+}
+COMPRESSION_MAGIC_SIZE = 10  # 圧縮形式の判定に読み込むバイト数
+
+
+class InternTable(dict):
+    """!
+    @brief 上限付きの値の共有テーブル
+    @details 参照した値が未登録の場合は登録して返し、登録済みの場合は登録済みの値(オブジェクト)を返す。
+    登録数が上限に達した後は、未登録の値をそのまま返す。
+    map(intern_table.__getitem__, values)のように使用する。
+    """
+
+    def __init__(self, maxsize: int = INTERN_TABLE_SIZE):
+        """!
+        @brief コンストラクタ
+        @param maxsize 登録する値の種類数の上限
+        """
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __missing__(self, value: str) -> str:
+        if len(self) < self.maxsize:
+            self[value] = value
+        return value
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """!
+    @brief 循環参照のガベージコレクションを一時的に停止する
+    @details 大量の行(リスト)を作成すると、ガベージコレクションが作成済みの行を繰り返し走査する。
+    行は文字列のリストで循環参照を持たないため、表の作成中は停止しても回収漏れは発生しない。
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def encoding_detect(sample: bytes) -> str:
+    """!
+    @brief 入力の先頭のバイト列から文字コードを判定する
+    @details BOMがある場合はutf-8-sig、UTF-8としてデコードできる場合はutf-8、それ以外はENCODING_AUTO_FALLBACK(cp932)
+    @param sample 入力の先頭のバイト列。最後のマルチバイト文字が途中で切れていてもよい
+    @return 文字コード
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+    except UnicodeDecodeError:
+        return ENCODING_AUTO_FALLBACK
+    return "utf-8"
+
+
+def binarystream_encoding(i_stream: BinaryIO, encoding: str) -> str:
+    """!
+    @brief 入力ストリームの文字コードを決定する
+    @details ENCODING_AUTOの場合は、読み込まずに参照できる先頭のバイト列(peek)から判定する
+    @param i_stream 入力ストリーム(バイナリ)
+    @param encoding 文字コード。ENCODING_AUTOの場合は判定する
+    @return 文字コード
+    """
+    if encoding != ENCODING_AUTO:
+        return encoding
+    peek = getattr(i_stream, "peek", None)
+    return encoding_detect(peek(READ_BLOCK_SIZE) if peek is not None else b"")
+
+
+def compression_detect(file_path: Optional[Path], head: bytes = b"") -> Optional[str]:
+    """!
+    @brief 圧縮形式を判定する
+    @details ファイルの先頭のバイト列で判定し、判定できない場合は拡張子で判定する
+    @param file_path ファイルのパス。Noneの場合は先頭のバイト列のみで判定する
+    @param head ファイルの先頭のバイト列
+    @return 圧縮形式。COMPRESSION_MAGICSのキー。圧縮されていない場合はNone
+    """
+    for compression, magic in COMPRESSION_MAGICS.items():
+        if magic.match(head):
+            return compression
+    if file_path is None or len(head) > 0:  # 先頭のバイト列が一致しない場合は非圧縮
+        return None
+    return COMPRESSION_EXTENSIONS.get(file_path.suffix.lower())
+
+
+def binaryfile_compression(file_path: Path) -> Optional[str]:
+    """!
+    @brief ファイルの圧縮形式を判定する
+    @param file_path ファイルのパス
+    @return 圧縮形式。圧縮されていない場合はNone
+    """
+    with open(file_path, mode="rb") as f:
+        head = f.read(COMPRESSION_MAGIC_SIZE)
+    return compression_detect(file_path, head)
+
+
+@contextmanager
+def binaryfile_open_read(file_path: Optional[Path]) -> Iterator[BinaryIO]:
+    """!
+    @brief 入力ファイルをバイナリで開く
+    @details 圧縮されている場合(gzip,bz2,xz)は展開するストリームを返す。圧縮形式は先頭のバイト列で判定する。
+    標準入力の場合はsys.stdin.bufferから読み込む(閉じない)。
+    @param file_path 入力ファイルのパス。Noneの場合は標準入力
+    @return 入力ストリーム(バイナリ)
+    """
+    with ExitStack() as stack:
+        if file_path is None:
+            raw = cast(BinaryIO, sys.stdin.buffer)
+        else:
+            raw = stack.enter_context(open(file_path, mode="rb"))
+        peek = getattr(raw, "peek", None)
+        head = peek(COMPRESSION_MAGIC_SIZE) if peek is not None else b""
+        compression = compression_detect(file_path, head)
+        if compression is None:
+            yield raw
+            return
+        if compression == "gzip":
+            i_stream = cast(BinaryIO, gzip.GzipFile(fileobj=raw, mode="rb"))
+        elif compression == "bz2":
+            i_stream = cast(BinaryIO, bz2.BZ2File(raw, mode="rb"))
+        else:
+            i_stream = cast(BinaryIO, lzma.LZMAFile(raw, mode="rb"))
+        yield stack.enter_context(i_stream)
 
 
 def textfile_read(
-    file_path: Optional[Path], *, line_max: Optional[int] = None, remove_newline: bool = False, skip_line_count: int = 0
+    file_path: Optional[Path],
+    *,
+    line_max: Optional[int] = None,
+    remove_newline: bool = False,
+    skip_line_count: int = 0,
+    encoding: str = "utf-8",
 ) -> list[str]:
     """!
     @brief テキストファイルを読み込む
-    @details textfile_read_stream()のラッパー
+    @details textfile_read_stream()のラッパー。圧縮されたファイルは展開して読み込む。
     @param file_path テキストファイルのパス。Noneの場合は標準入力から読み込む。
+    @param encoding 文字コード。ENCODING_AUTOの場合は先頭から判定する
     """
-    if file_path is None:
-        stream = TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
-        return textfile_read_stream(stream, skip_line_count=skip_line_count, line_max=line_max)
-    #
-    with open(file_path, mode="r", encoding="utf-8") as f:
-        return textfile_read_stream(f, skip_line_count=skip_line_count, line_max=line_max)
+    with binaryfile_open_read(file_path) as i_stream:
+        stream = TextIOWrapper(i_stream, encoding=binarystream_encoding(i_stream, encoding))
+        try:
+            return textfile_read_stream(stream, skip_line_count=skip_line_count, line_max=line_max)
+        finally:
+            stream.detach()  # 入力ストリームはbinaryfile_open_read()で閉じる
 
 
 def textfile_read_stream(
@@ -54,28 +212,147 @@ def textfile_read_stream(
     return lines
 
 
+def textstream_line_batches(i_stream: Iterable[str], *, batch_size: int = LINE_BATCH_SIZE) -> Iterator[list[str]]:
+    """!
+    @brief テキストストリームを行のリスト単位で読み込む
+    @param i_stream 入力ストリーム
+    @param batch_size 一度に読み込む行数
+    @return 改行を除去した行のリストのイテレータ
+    """
+    i_iter = iter(i_stream)
+    while True:
+        text = "".join(itertools.islice(i_iter, batch_size))
+        if text == "":
+            break
+        if text.endswith("\n"):
+            text = text[:-1]
+        yield text.split("\n")
+
+
+def binarystream_line_batches(
+    i_stream: BinaryIO, *, block_size: int = READ_BLOCK_SIZE, encoding: str = "utf-8"
+) -> Iterator[list[str]]:
+    """!
+    @brief バイナリストリームをブロック単位で読み込み、行のリストに分割する
+    @details ブロックごとにまとめてデコードし、1回のstr.split()で行に分割する。ブロックの最後の不完全な行は次のブロックに繰り越す。
+    改行コード(\r\n,\r)は、テキストモードで開いた場合と同様に\nとして扱う。
+    @param i_stream 入力ストリーム(バイナリ)
+    @param block_size 一度に読み込むバイト数
+    @param encoding 文字コード。ENCODING_AUTOの場合は最初のブロックから判定する
+    @return 改行を除去した行のリストのイテレータ
+    @exception ValueError block_sizeが1未満の場合。0バイトの読み込みはファイルの終端と区別できない
+    """
+    if block_size <= 0:
+        raise ValueError(f"block_sizeは1以上を指定してください。block_size={block_size}")
+    read = getattr(i_stream, "read1", i_stream.read)  # パイプの場合に読み込める分だけ読み込む
+    block = read(block_size)
+    if encoding == ENCODING_AUTO:
+        while len(block) < block_size:  # パイプで少量しか読めない場合も、ブロックのサイズまで読んで判定する
+            data = read(block_size - len(block))
+            if len(data) == 0:
+                break
+            block += data
+        encoding = encoding_detect(block)
+    decoder = codecs.getincrementaldecoder(encoding)()
+    carry = ""  # 前のブロックから繰り越した不完全な行
+    while True:
+        final = len(block) == 0
+        text = carry + decoder.decode(block, final=final)
+        carry_cr = ""
+        if "\r" in text:
+            if not final and text.endswith("\r"):  # 次のブロックの先頭が\nの可能性がある
+                text = text[:-1]
+                carry_cr = "\r"
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        lines = text.split("\n")
+        carry = lines.pop() + carry_cr
+        if len(lines) > 0:
+            yield lines
+        if final:
+            break
+        block = read(block_size)
+    if carry != "":
+        yield [carry]
+
+
+@contextmanager
+def binaryfile_open_write(
+    file_path: Optional[Path], *, append: bool = False, compress_thread: bool = False
+) -> Iterator[BinaryIO]:
+    """!
+    @brief 出力ファイルをバイナリで開く
+    @details 標準出力の場合はsys.stdout.bufferに直接書き込み、終了時にflushする(閉じない)。
+    拡張子(.gz,.bz2,.xz,.lzma)に対応する形式で圧縮する。追記の場合は圧縮データを連結する。
+    @param file_path 出力ファイルのパス。Noneの場合は標準出力
+    @param append 追記する
+    @param compress_thread 圧縮する場合に、圧縮と書き込みを別スレッドで行う
+    @return 出力ストリーム(バイナリ)
+    """
+    if file_path is None:
+        sys.stdout.flush()  # print()で出力済みの内容を先に出力する
+        try:
+            yield sys.stdout.buffer
+        finally:
+            sys.stdout.buffer.flush()
+        return
+    #
+    mode = "ab" if append else "wb"
+    compression = COMPRESSION_EXTENSIONS.get(file_path.suffix.lower())
+    with ExitStack() as stack:
+        o_stream = stack.enter_context(open(file_path, mode=mode))
+        if compression is None:
+            yield o_stream
+            return
+        if compression == "gzip":
+            o_stream = gzip.GzipFile(fileobj=o_stream, mode=mode, compresslevel=GZIP_COMPRESS_LEVEL)
+        elif compression == "bz2":
+            o_stream = bz2.BZ2File(o_stream, mode=mode)
+        else:
+            o_stream = lzma.LZMAFile(o_stream, mode=mode)
+        o_stream = stack.enter_context(cast(BinaryIO, o_stream))
+        if compress_thread:
+            o_stream = stack.enter_context(cast(BinaryIO, ThreadWriteStream(o_stream)))
+        yield o_stream
+
+
+def binarystream_write_text(o_stream: BinaryIO, chunks: Iterable[str], *, encoding: str = "utf-8"):
+    """!
+    @brief 文字列をエンコードしてバイナリストリームに書き込む
+    @details 改行コードはテキストモードで開いた場合と同様にos.linesepに変換する
+    @param o_stream 出力ストリーム(バイナリ)
+    @param chunks 書き込む文字列のイテレータ
+    @param encoding 文字コード
+    """
+    for text in chunks:
+        if os.linesep != "\n":
+            text = text.replace("\n", os.linesep)
+        o_stream.write(text.encode(encoding))
+
+
 def textfile_write(
     file_path: Optional[Path],
     lines: list[str],
     *,
     append: bool = False,
     add_newline: bool = False,
-    skip_line_count: int = 0
+    skip_line_count: int = 0,
 ):
     """!
     @brief テキストファイルを出力
-    @details textfile_write_stream()のラッパー
+    @details WRITE_CHUNK_ROWS行ずつ結合して、エンコードしたバイト列を書き込む
     @param file_path テキストファイルのパス。Noneの場合は標準出力に出力する。
+    @param lines 出力する内容
     @param append 追記する
+    @param add_newline 改行を追加する
+    @param skip_line_count linesをスキップする行数
     """
-    if file_path is None:
-        stream = TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
-        return textfile_write_stream(stream, lines, add_newline=add_newline, skip_line_count=skip_line_count)
-    #
-    mode = "a" if append else "w"
-    with open(file_path, mode=mode, encoding="utf-8") as f:
-        stream = cast(TextIOWrapper, f)
-        return textfile_write_stream(stream, lines, add_newline=add_newline, skip_line_count=skip_line_count)
+    lines = lines[skip_line_count:]
+    separator = "\n" if add_newline else ""
+    chunks = (
+        separator.join(lines[i : i + WRITE_CHUNK_ROWS]) + separator for i in range(0, len(lines), WRITE_CHUNK_ROWS)
+    )
+    with binaryfile_open_write(file_path, append=append) as o_stream:
+        binarystream_write_text(o_stream, chunks)
 
 
 def textfile_write_stream(
@@ -88,13 +365,10 @@ def textfile_write_stream(
     @param add_newline 改行を追加する
     @param skip_line_count linesをスキップする行数
     """
-    for line in lines:
-        if skip_line_count > 0:
-            skip_line_count -= 1
-            continue
-        if add_newline:
-            line += "\n"
-        o_stream.write(line)
+    lines = lines[skip_line_count:]
+    if add_newline:
+        lines = [line + "\n" for line in lines]
+    o_stream.writelines(lines)
     return
 
 
@@ -146,3 +420,72 @@ def split_csv_string_no_normalize(input_string: str, *, delimiter: str = ",", st
     result.append(s)
 
     return result
+
+
+def split_csv_string_no_normalize_fast(
+    input_string: str, *, delimiter: str = ",", strip: bool = False, maxsplit: int = -1
+) -> list[str]:
+    """!
+    @brief 文字列を区切り文字で分割する。分割文字列の内容をそのまま
+    @details split_csv_string_no_normalize()の高速版。maxsplitを指定しない場合、結果は同一になる。
+    @param input_string 分割文字列
+    @param delimiter 区切り文字
+    @param strip 値の前後のスペースを除去
+    @param maxsplit 分割するフィールド数。残りは分割せずに最後の要素にする(stripも行わない)。-1の場合はすべて分割する
+    @return 分割された文字列のリスト
+    @note
+    ・クォートを含まない行はstr.split()で分割する
+    ・クォートを含む行はstr.find()でクォート間を読み飛ばす。maxsplitを指定した場合も全体を分割してから残りを結合する
+    """
+    if len(input_string) == 0:  # 入力文字列なし
+        return []
+    if '"' not in input_string:  # クォートなし
+        result = input_string.split(delimiter, maxsplit)
+        return _fields_strip(result, maxsplit=maxsplit) if strip else result
+    #
+    result = []
+    field_start = 0  # 現在のフィールドの開始位置
+    pos = 0  # クォート外の検索開始位置
+    length = len(input_string)
+    while True:
+        quote_start = input_string.find('"', pos)
+        if quote_start < 0:
+            # 以降にクォートなし。残りは区切り文字で分割する
+            fields = input_string[pos:].split(delimiter)
+            fields[0] = input_string[field_start:pos] + fields[0]
+            result.extend(fields)
+            break
+        # クォートの前までの区切り文字で分割する
+        segment = input_string[pos:quote_start]
+        if delimiter in segment:
+            fields = segment.split(delimiter)
+            fields[0] = input_string[field_start:pos] + fields[0]
+            result.extend(fields[:-1])
+            field_start = quote_start - len(fields[-1])
+        # 閉じるクォートを探す。連続するダブルクォートはエスケープされたダブルクォートとして扱う
+        pos = quote_start + 1
+        while True:
+            quote_end = input_string.find('"', pos)
+            if quote_end < 0 or quote_end + 1 >= length or input_string[quote_end + 1] != '"':
+                break
+            pos = quote_end + 2
+        if quote_end < 0:
+            # 閉じるクォートが無い。残りはすべて現在のフィールド
+            result.append(input_string[field_start:])
+            break
+        pos = quote_end + 1
+    if 0 <= maxsplit < len(result) - 1:
+        result[maxsplit:] = [delimiter.join(result[maxsplit:])]
+    return _fields_strip(result, maxsplit=maxsplit) if strip else result
+
+
+def _fields_strip(fields: list[str], *, maxsplit: int = -1) -> list[str]:
+    """!
+    @brief フィールドの前後のスペースを除去する
+    @param fields フィールドのリスト
+    @param maxsplit 除去するフィールド数。-1の場合はすべて
+    @return 除去したフィールドのリスト
+    """
+    if maxsplit < 0:
+        return [s.strip() for s in fields]
+    return [s.strip() for s in fields[:maxsplit]] + fields[maxsplit:]
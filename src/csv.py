@@ -1,38 +1,159 @@
 import difflib
-import sys
+import itertools
+from collections.abc import Sequence
+from contextlib import closing
+from dataclasses import dataclass
 from io import TextIOWrapper
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
 
-from src.common import split_csv_string_no_normalize
+from src.common import (
+    LINE_BATCH_SIZE,
+    READ_BLOCK_SIZE,
+    WRITE_CHUNK_ROWS,
+    InternTable,
+    binaryfile_compression,
+    binaryfile_open_read,
+    binaryfile_open_write,
+    binarystream_line_batches,
+    binarystream_write_text,
+    gc_paused,
+    textstream_line_batches,
+)
+from src.csv_engine import parse_engine_get
+from src.csv_mmap import mmap_row_list_read
+from src.pipeline import PIPELINE_QUEUE_SIZE, iter_batches, thread_reader, thread_writer
 from src.table import *
+from src.table_backend import table_backend_get
+from src.table_column import ColumnCountError
 
 
-def csv_reader(
-    i_stream: TextIOWrapper, *, header: int = 0, csv_filetype: Optional[CsvFileTypeInfo] = None, strip: bool = False
-) -> Table:
+@dataclass
+class CsvOption:
     """!
-    @brief CSVファイルを読み込む
+    @brief CSVファイルの入出力の既定値
+    @details コマンドのグローバルオプションで変更する
+    """
+
+    engine: str = "auto"  # 行の分割エンジン。src.csv_engine.PARSE_ENGINESのキー
+    block_size: int = READ_BLOCK_SIZE  # ファイル,標準入力から一度に読み込むバイト数
+    mmap: bool = False  # 入力ファイルをmmapし、行を参照時に分割する
+    flush_rows: int = WRITE_CHUNK_ROWS  # 結合して一度に書き込む行数
+    pipeline: bool = False  # 読み込み,書き込みを別スレッドで行う
+    compress_thread: bool = False  # 出力ファイルを圧縮する場合に、圧縮と書き込みを別スレッドで行う
+    encoding: str = "utf-8"  # 入力の文字コード。"auto"の場合は先頭のブロックから判定する
+    backend: str = "rows"  # 表の実装。src.table_backend.TABLE_BACKENDSのキー
+    compact: bool = False  # 同じ値を共有し、変更しない行をタプルで保持する
+    queue_size: int = PIPELINE_QUEUE_SIZE  # スレッド間のキューに保持するバッチ数の上限
+
+
+csv_option = CsvOption()
+
+RowsTransform = Callable[[Iterable[list[str]]], Iterable[list[str]]]  # 行のイテレータを変換する関数
+
+
+def csv_columns_maxsplit(columns: Optional[Iterable[int]]) -> int:
+    """!
+    @brief 必要なカラムのインデックスから行を分割するフィールド数を求める
+    @param columns 処理に必要なカラムのインデックス。Noneの場合はすべてのカラム
+    @return 分割するフィールド数。すべて分割する場合は-1
+    @note 負のインデックス(最後からの位置)を含む場合は、すべて分割する
+    """
+    if columns is None:
+        return -1
+    columns = list(columns)
+    if len(columns) == 0 or min(columns) < 0:
+        return -1
+    return max(columns) + 1
+
+
+def csv_batch_reader(
+    line_batches: Iterable[list[str]],
+    *,
+    strip: bool = False,
+    engine: Optional[str] = None,
+    columns: Optional[Iterable[int]] = None,
+    compact: Optional[bool] = None,
+    mutable: bool = True,
+) -> Iterator[Sequence[str]]:
+    """!
+    @brief 行のリストを分割して1行ずつ返す
+    @details columnsを指定した場合は、最大のインデックスまで分割し、残りは分割せずに行の最後の要素にする。
+    残りは書き込み時にそのまま出力されるため、最大のインデックスより後のカラムを参照しない処理に使用する。
+    compactの場合は、同じ値をInternTableで1つの文字列オブジェクトにまとめる。
+    @param line_batches 改行を除去した行のリストのイテレータ
+    @param strip 値の前後のスペースを除去
+    @param engine 行の分割エンジン。Noneの場合はcsv_option.engine
+    @param columns 処理に必要なカラムのインデックス。Noneの場合はすべてのカラムを分割する
+    @param compact 値を共有し、mutable=Falseの場合は行をタプルにする。Noneの場合はcsv_option.compact
+    @param mutable 行の値を変更する場合はTrue。Falseの場合、compactであれば行をタプルにする
+    @return 行のイテレータ
+    """
+    parse_lines = parse_engine_get(engine if engine is not None else csv_option.engine)
+    maxsplit = csv_columns_maxsplit(columns)
+    if compact is None:
+        compact = csv_option.compact
+    if not compact:
+        for lines in line_batches:
+            yield from parse_lines(lines, strip=strip, maxsplit=maxsplit)
+        return
+    intern = InternTable().__getitem__
+    row_type = list if mutable else tuple
+    for lines in line_batches:
+        yield from [row_type(map(intern, row)) for row in parse_lines(lines, strip=strip, maxsplit=maxsplit)]
+
+
+def csv_row_reader(
+    i_stream: Iterable[str],
+    *,
+    strip: bool = False,
+    engine: Optional[str] = None,
+    columns: Optional[Iterable[int]] = None,
+) -> Iterator[list[str]]:
+    """!
+    @brief CSVファイルを1行ずつ読み込む
     @param i_stream 入力ストリーム
+    @param strip 値の前後のスペースを除去
+    @param engine 行の分割エンジン。Noneの場合はcsv_option.engine
+    @param columns 処理に必要なカラムのインデックス。Noneの場合はすべてのカラムを分割する
+    @return 行のイテレータ
+    """
+    return csv_batch_reader(textstream_line_batches(i_stream), strip=strip, engine=engine, columns=columns)
+
+
+def csv_rows_to_table(
+    rows: Iterable[list[str]],
+    *,
+    header: int = 0,
+    csv_filetype: Optional[CsvFileTypeInfo] = None,
+    backend: Optional[str] = None,
+) -> Table:
+    """!
+    @brief 行のイテレータから表を作成する
+    @param rows 行のイテレータ。シーケンスの場合はそのまま表の行にする(行指向の表の場合)
     @param header ヘッダの行数
     @param csv_filetype CSVファイルの情報
-    @param strip 値の前後のスペースを除去
+    @param backend 表の実装。Noneの場合はcsv_option.backend。列指向の表にできない場合(カラム数が異なる行を含む)は行指向の表にする
     @return 表
+    @exception ValueError csv_filetypeのヘッダと一致しない場合
     """
-    rows: list[list[str]] = []
-    for line in i_stream:
-        line = line.rstrip("\n")
-        # columns = line.split(",")
-        columns = split_csv_string_no_normalize(line, strip=strip)
-        rows.append(columns)
+    table_class = table_backend_get(backend if backend is not None else csv_option.backend)
     # csv_filetypeのヘッダ行数が優先
     if csv_filetype is not None:
         header = csv_filetype.header_row_count
     #
-    if header > 0:
-        header_rows = rows[:header]
-        rows = rows[header:]
-    table = Table.create_rows(rows=rows)
+    with gc_paused():
+        if table_class is Table:
+            if not isinstance(rows, Sequence):
+                rows = list(rows)
+            if header > 0:
+                header_rows = [list(row) for row in rows[:header]]
+                rows = rows[header:]
+            table = Table.create_rows(rows=rows)
+        else:  # 行のリストを作成せずに、読み込みながら表に追加する
+            rows_iter = iter(rows)
+            header_rows = [list(row) for row in itertools.islice(rows_iter, header)]
+            table = table_rows_add(table_class(), rows_iter)
     if header > 0:
         table._header_rows = header_rows
     # csv_filetypeの情報と一致するか確認
@@ -46,38 +167,235 @@ def csv_reader(
     return table
 
 
-def csv_file_reader(file: Optional[Path], *, header: int = 0, csv_filetype: Optional[CsvFileTypeInfo] = None) -> Table:
-    if file is None:
-        stream = TextIOWrapper(sys.stdin.buffer, encoding="utf-8")
-        return csv_reader(stream, header=header, csv_filetype=csv_filetype)
-    #
-    with file.open(mode="r", encoding="utf-8") as i_stream:
-        return csv_reader(i_stream, header=header, csv_filetype=csv_filetype)
+def table_rows_add(table: Table, rows: Iterator[list[str]]) -> Table:
+    """!
+    @brief 行をLINE_BATCH_SIZE行ずつ表に追加する
+    @param table 表
+    @param rows 行のイテレータ
+    @return 行を追加した表。表の実装で保持できない行を含む場合は、行指向の表
+    """
+    batch: list[list[str]] = []
+    try:
+        for batch in iter_batches(rows, LINE_BATCH_SIZE):
+            table.row_add_multi(batch)
+    except ColumnCountError:  # 追加済みの行と残りの行で行指向の表を作成する
+        added_rows = [list(row) for row in table.row_values()]
+        return Table.create_rows(added_rows + batch + list(rows))
+    return table
 
 
-def csv_writer(o_stream: TextIOWrapper, table: Table):
+def csv_reader(
+    i_stream: TextIOWrapper,
+    *,
+    header: int = 0,
+    csv_filetype: Optional[CsvFileTypeInfo] = None,
+    strip: bool = False,
+    engine: Optional[str] = None,
+    columns: Optional[Iterable[int]] = None,
+) -> Table:
+    """!
+    @brief CSVファイルを読み込む
+    @param i_stream 入力ストリーム
+    @param header ヘッダの行数
+    @param csv_filetype CSVファイルの情報
+    @param strip 値の前後のスペースを除去
+    @param engine 行の分割エンジン。Noneの場合はcsv_option.engine
+    @param columns 処理に必要なカラムのインデックス。Noneの場合はすべてのカラムを分割する
+    @return 表
+    """
+    rows = csv_row_reader(i_stream, strip=strip, engine=engine, columns=columns)
+    return csv_rows_to_table(rows, header=header, csv_filetype=csv_filetype)
+
+
+def csv_file_reader(
+    file: Optional[Path],
+    *,
+    header: int = 0,
+    csv_filetype: Optional[CsvFileTypeInfo] = None,
+    block_size: Optional[int] = None,
+    use_mmap: Optional[bool] = None,
+    columns: Optional[Iterable[int]] = None,
+    encoding: Optional[str] = None,
+    mutable: bool = True,
+    backend: Optional[str] = None,
+) -> Table:
+    """!
+    @brief CSVファイルを読み込む
+    @param file CSVファイルのパス。Noneの場合は標準入力から読み込む。
+    @param header ヘッダの行数
+    @param csv_filetype CSVファイルの情報
+    @param block_size 一度に読み込むバイト数。Noneの場合はcsv_option.block_size
+    @param use_mmap ファイルをmmapし、行を参照時に分割する。標準入力,圧縮されたファイル,改行コードが\rのみの行を含むファイルの場合は無視する。
+    Noneの場合はcsv_option.mmap
+    @param columns 処理に必要なカラムのインデックス。Noneの場合はすべてのカラムを分割する。mmapの場合は無視する
+    @param encoding 文字コード。"auto"の場合は先頭のブロックから判定する。Noneの場合はcsv_option.encoding
+    @param mutable 表の行の値を変更する場合はTrue。Falseの場合、csv_option.compactであれば行をタプルで保持する
+    @param backend 表の実装。Noneの場合はcsv_option.backend
+    @return 表
+    """
+    if use_mmap is None:
+        use_mmap = csv_option.mmap
+    if encoding is None:
+        encoding = csv_option.encoding
+    rows: Optional[Iterable[list[str]]] = None
+    if file is not None and use_mmap and binaryfile_compression(file) is None:
+        rows = mmap_row_list_read(file, encoding=encoding)  # 改行コードが\rのみの行を含む場合はNone
+    if rows is None:
+        rows = csv_file_row_reader(file, block_size=block_size, columns=columns, encoding=encoding, mutable=mutable)
+    return csv_rows_to_table(rows, header=header, csv_filetype=csv_filetype, backend=backend)
+
+
+def csv_file_row_reader(
+    file: Optional[Path],
+    *,
+    block_size: Optional[int] = None,
+    columns: Optional[Iterable[int]] = None,
+    encoding: Optional[str] = None,
+    mutable: bool = True,
+) -> Iterator[Sequence[str]]:
+    """!
+    @brief CSVファイルを1行ずつ読み込む
+    @details ファイル,標準入力をバイナリでブロック単位に読み込み、まとめてデコードする。圧縮されている場合は展開する。
+    csv_option.pipelineの場合は、読み込みとデコードを別スレッドで行う。
+    @param file CSVファイルのパス。Noneの場合は標準入力から読み込む。
+    @param block_size 一度に読み込むバイト数。Noneの場合はcsv_option.block_size
+    @param columns 処理に必要なカラムのインデックス。Noneの場合はすべてのカラムを分割する
+    @param encoding 文字コード。"auto"の場合は先頭のブロックから判定する。Noneの場合はcsv_option.encoding
+    @param mutable 行の値を変更する場合はTrue。Falseの場合、csv_option.compactであれば行をタプルにする
+    @return 行のイテレータ
+    """
+    if block_size is None:
+        block_size = csv_option.block_size
+    if encoding is None:
+        encoding = csv_option.encoding
+    with binaryfile_open_read(file) as i_stream, closing(
+        _line_batches(i_stream, block_size=block_size, encoding=encoding)
+    ) as line_batches:
+        yield from csv_batch_reader(line_batches, columns=columns, mutable=mutable)
+
+
+def _line_batches(i_stream: BinaryIO, *, block_size: int, encoding: str) -> Iterator[list[str]]:
+    """!
+    @brief 入力ストリームから行のリストを読み込む
+    @details csv_option.pipelineの場合は、読み込みスレッドで読み込む
+    @param i_stream 入力ストリーム(バイナリ)
+    @param block_size 一度に読み込むバイト数
+    @param encoding 文字コード
+    @return 改行を除去した行のリストのイテレータ
+    """
+    line_batches = binarystream_line_batches(i_stream, block_size=block_size, encoding=encoding)
+    if csv_option.pipeline:
+        return thread_reader(line_batches, maxsize=csv_option.queue_size)
+    return line_batches
+
+
+def _flush_rows_get(flush_rows: Optional[int]) -> int:
+    """!
+    @brief 結合して書き込む行数を取得する
+    @param flush_rows 結合する行数。Noneの場合はcsv_option.flush_rows
+    @return 結合する行数
+    @exception ValueError 1未満の場合。0行ずつ結合すると何も書き込まれない
+    """
+    if flush_rows is None:
+        flush_rows = csv_option.flush_rows
+    if flush_rows <= 0:
+        raise ValueError(f"flush_rowsは1以上を指定してください。flush_rows={flush_rows}")
+    return flush_rows
+
+
+def csv_text_chunks(rows: Iterable[list[str]], *, flush_rows: Optional[int] = None) -> Iterator[str]:
+    """!
+    @brief 行を結合して書き込み単位の文字列にする
+    @param rows 行のイテレータ
+    @param flush_rows 結合する行数。Noneの場合はcsv_option.flush_rows
+    @return 改行で終わる文字列のイテレータ
+    @exception ValueError flush_rowsが1未満の場合
+    """
+    flush_rows = _flush_rows_get(flush_rows)
+    rows_iter = iter(rows)
+    while True:
+        lines = list(map(",".join, itertools.islice(rows_iter, flush_rows)))
+        if len(lines) == 0:
+            break
+        lines.append("")  # 最後の行の改行
+        yield "\n".join(lines)
+
+
+def csv_row_writer(o_stream: TextIOWrapper, rows: Iterable[list[str]], *, flush_rows: Optional[int] = None):
+    """!
+    @brief CSVファイルに1行ずつ書き込む
+    @param o_stream 出力ストリーム
+    @param rows 行のイテレータ
+    @param flush_rows 結合して一度に書き込む行数。Noneの場合はcsv_option.flush_rows
+    """
+    for text in csv_text_chunks(rows, flush_rows=flush_rows):
+        o_stream.write(text)
+    return
+
+
+def csv_writer(o_stream: TextIOWrapper, table: Table, *, flush_rows: Optional[int] = None):
     """!
     @brief CSVファイルに書き込む
     @param o_stream 出力ストリーム
     @param table 表
+    @param flush_rows 結合して一度に書き込む行数。Noneの場合はcsv_option.flush_rows
     """
-    # ヘッダ行の出力
-    for row in table._header_rows:
-        line = ",".join(row)
-        o_stream.write(line)
-        o_stream.write("\n")
-    # データ行の出力
-    for row in table._rows:
-        line = ",".join(row)
-        o_stream.write(line)
-        o_stream.write("\n")
+    csv_row_writer(o_stream, itertools.chain(table._header_rows, table.row_values()), flush_rows=flush_rows)
     return
 
 
-def csv_file_writer(file: Optional[Path], table: Table):
-    if file is None:
-        stream = TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
-        return csv_writer(stream, table)
-    #
-    with file.open(mode="w", encoding="utf-8") as o_stream:
-        return csv_writer(o_stream, table)
+def csv_file_writer(file: Optional[Path], table: Table, *, flush_rows: Optional[int] = None):
+    """!
+    @brief CSVファイルに書き込む
+    @param file CSVファイルのパス。Noneの場合は標準出力に出力する。
+    @param table 表
+    @param flush_rows 結合して一度に書き込む行数。Noneの場合はcsv_option.flush_rows
+    """
+    csv_file_row_writer(file, itertools.chain(table._header_rows, table.row_values()), flush_rows=flush_rows)
+
+
+def csv_file_row_writer(file: Optional[Path], rows: Iterable[list[str]], *, flush_rows: Optional[int] = None):
+    """!
+    @brief CSVファイルに1行ずつ書き込む
+    @details flush_rows行ずつ結合し、エンコードしたバイト列をバイナリストリームに書き込む。
+    拡張子(.gz,.bz2,.xz,.lzma)に対応する形式で圧縮する。
+    csv_option.pipelineの場合は、flush_rows行ずつのリストを書き込みスレッドに渡し、結合と書き込みを別スレッドで行う。
+    @param file CSVファイルのパス。Noneの場合は標準出力に出力する。
+    @param rows 行のイテレータ
+    @param flush_rows 結合して一度に書き込む行数。Noneの場合はcsv_option.flush_rows
+    @exception ValueError flush_rowsが1未満の場合。出力ファイルを開く前に判定する
+    """
+    flush_rows = _flush_rows_get(flush_rows)
+    with binaryfile_open_write(file, compress_thread=csv_option.compress_thread) as o_stream:
+        if not csv_option.pipeline:
+            binarystream_write_text(o_stream, csv_text_chunks(rows, flush_rows=flush_rows))
+            return
+
+        def write_batches(batches: Iterable[list[list[str]]]):  # 書き込みスレッドで実行する
+            for batch in batches:
+                binarystream_write_text(o_stream, csv_text_chunks(batch, flush_rows=flush_rows))
+
+        thread_writer(write_batches, iter_batches(rows, flush_rows), maxsize=csv_option.queue_size)
+
+
+def csv_file_transform(
+    input_file: Optional[Path],
+    output_file: Optional[Path],
+    transform: RowsTransform,
+    *,
+    columns: Optional[Iterable[int]] = None,
+):
+    """!
+    @brief CSVファイルを1行ずつ読み込み、変換して書き込む
+    @details 表全体をメモリに保持しないため、行単位で完結する処理に使用する。
+    @param input_file 入力ファイルのパス。Noneの場合は標準入力から読み込む。
+    @param output_file 出力ファイルのパス。Noneの場合は標準出力に出力する。
+    @param transform 行のイテレータを変換する関数
+    @param columns transformが参照するカラムのインデックス。Noneの場合はすべてのカラムを分割する
+    """
+    with closing(csv_file_row_reader(input_file, columns=columns)) as row_reader:  # 書き込みエラー時に読み込みを終了する
+        rows: Iterable[list[str]] = row_reader
+        if input_file is not None and output_file is not None and output_file.exists():
+            if input_file.samefile(output_file):  # 入力ファイルに上書きする場合は、先にすべて読み込む
+                rows = list(rows)
+        csv_file_row_writer(output_file, transform(rows))
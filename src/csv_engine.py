@@ -0,0 +1,141 @@
+import csv
+from typing import Callable
+
+from src.common import split_csv_string_no_normalize_fast
+
+ParseEngine = Callable[..., list[list[str]]]
+
+AUTO_STDLIB_COLUMN_COUNT = 100  # autoエンジンでstdlibエンジンを選択する1行の平均カラム数
+
+
+def fields_quote_merge(fields: list[str], *, delimiter: str = ",") -> list[str]:
+    """!
+    @brief クォート内の区切り文字で分割されたフィールドを結合する
+    @details 行の先頭から数えたダブルクォートの数が奇数の位置はクォート内になる。
+    区切り文字で単純に分割したフィールドをダブルクォートの数の偶奇で結合すると、split_csv_string_no_normalize()と同じ結果になる。
+    @param fields 区切り文字で単純に分割したフィールドのリスト
+    @param delimiter 区切り文字
+    @return 結合したフィールドのリスト
+    """
+    result: list[str] = []
+    current: list[str] = []  # クォート内で分割されたフィールド
+    for field in fields:
+        if len(current) == 0:
+            if field.count('"') % 2 == 0:
+                result.append(field)
+            else:  # クォートの開始
+                current.append(field)
+        else:
+            current.append(field)
+            if field.count('"') % 2 == 1:  # クォートの終了
+                result.append(delimiter.join(current))
+                current = []
+    if len(current) > 0:  # 閉じるクォートが無い
+        result.append(delimiter.join(current))
+    return result
+
+
+def parse_lines_python(
+    lines: list[str], *, delimiter: str = ",", strip: bool = False, maxsplit: int = -1
+) -> list[list[str]]:
+    """!
+    @brief 行のリストを分割する(Python実装)
+    @param lines 行のリスト※改行を含まないこと
+    @param delimiter 区切り文字
+    @param strip 値の前後のスペースを除去
+    @param maxsplit 分割するフィールド数。残りは分割せずに最後の要素にする。-1の場合はすべて分割する
+    @return 行ごとのフィールドのリスト
+    """
+    return [
+        split_csv_string_no_normalize_fast(line, delimiter=delimiter, strip=strip, maxsplit=maxsplit) for line in lines
+    ]
+
+
+def parse_lines_stdlib(
+    lines: list[str], *, delimiter: str = ",", strip: bool = False, maxsplit: int = -1
+) -> list[list[str]]:
+    """!
+    @brief 行のリストを分割する(標準ライブラリcsvモジュールによるC実装)
+    @details csvモジュールはクォートを除去するため、クォートを無効にして分割後、fields_quote_merge()で結合する。
+    maxsplitを指定した場合も全体を分割してから残りを結合する。
+    @param lines 行のリスト※改行を含まないこと
+    @param delimiter 区切り文字
+    @param strip 値の前後のスペースを除去
+    @param maxsplit 分割するフィールド数。残りは分割せずに最後の要素にする。-1の場合はすべて分割する
+    @return 行ごとのフィールドのリスト
+    @exception ValueError csvモジュールで正しく分割できない行を含む場合
+    """
+    text = "\n".join(lines)
+    if maxsplit < 0:
+        return _parse_text_stdlib(lines, text, delimiter=delimiter, strip=strip)
+    rows = _parse_text_stdlib(lines, text, delimiter=delimiter, strip=False)
+    rows = [row[:maxsplit] + [delimiter.join(row[maxsplit:])] if len(row) > maxsplit + 1 else row for row in rows]
+    if strip:
+        rows = [[s.strip() for s in row[:maxsplit]] + row[maxsplit:] for row in rows]
+    return rows
+
+
+def _parse_text_stdlib(lines: list[str], text: str, *, delimiter: str, strip: bool) -> list[list[str]]:
+    """!
+    @brief parse_lines_stdlib()の本体
+    @param lines 行のリスト
+    @param text 行を改行で結合した文字列
+    """
+    if "\r" in text:  # csvモジュールは\rを改行として扱うため、値に含む\rを保持できない
+        raise ValueError("stdlibエンジンは\\rを含む行を分割できません。")
+    try:
+        rows = list(csv.reader(lines, delimiter=delimiter, quoting=csv.QUOTE_NONE, strict=False))
+    except csv.Error as e:
+        raise ValueError(f"stdlibエンジンで分割できません。{e}") from e
+    if '"' in text:
+        rows = [fields_quote_merge(row, delimiter=delimiter) if '"' in line else row for line, row in zip(lines, rows)]
+    if strip:
+        rows = [[s.strip() for s in row] for row in rows]
+    return rows
+
+
+def parse_lines_auto(
+    lines: list[str], *, delimiter: str = ",", strip: bool = False, maxsplit: int = -1
+) -> list[list[str]]:
+    """!
+    @brief 行のリストを分割する(エンジン自動選択)
+    @details 行のリストごとに、正しく分割できるエンジンのうち速いエンジンを選択する。
+    ・\rを含む場合は、pythonエンジン(stdlibエンジンでは正しく分割できない)
+    ・クォートを含まない場合は、pythonエンジン(str.split()がcsvモジュールより速い)
+    ・maxsplitを指定した場合は、pythonエンジン(str.split()で残りを分割しない)
+    ・クォートを含みカラム数が多い場合は、stdlibエンジン
+    @param lines 行のリスト※改行を含まないこと
+    @param delimiter 区切り文字
+    @param strip 値の前後のスペースを除去
+    @param maxsplit 分割するフィールド数。残りは分割せずに最後の要素にする。-1の場合はすべて分割する
+    @return 行ごとのフィールドのリスト
+    """
+    if maxsplit >= 0:
+        return parse_lines_python(lines, delimiter=delimiter, strip=strip, maxsplit=maxsplit)
+    text = "\n".join(lines)
+    if "\r" in text or '"' not in text or text.count(delimiter) < AUTO_STDLIB_COLUMN_COUNT * len(lines):
+        return parse_lines_python(lines, delimiter=delimiter, strip=strip)
+    try:
+        return _parse_text_stdlib(lines, text, delimiter=delimiter, strip=strip)
+    except ValueError:  # フィールドサイズの上限を超えた場合など
+        return parse_lines_python(lines, delimiter=delimiter, strip=strip)
+
+
+PARSE_ENGINES: dict[str, ParseEngine] = {
+    "auto": parse_lines_auto,
+    "python": parse_lines_python,
+    "stdlib": parse_lines_stdlib,
+}
+
+
+def parse_engine_get(name: str) -> ParseEngine:
+    """!
+    @brief 名前から分割エンジンを取得する
+    @param name エンジン名。PARSE_ENGINESのキー
+    @return 分割エンジン
+    @exception ValueError 未知のエンジン名
+    """
+    engine = PARSE_ENGINES.get(name)
+    if engine is None:
+        raise ValueError(f"未知のエンジンです。engine={name}")
+    return engine
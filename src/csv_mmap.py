@@ -0,0 +1,210 @@
+import codecs
+import itertools
+import mmap
+from array import array
+from collections.abc import MutableSequence
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union, overload
+
+from src.common import ENCODING_AUTO, READ_BLOCK_SIZE, encoding_detect, split_csv_string_no_normalize_fast
+
+
+def mmap_line_offsets(buffer: Union[bytes, mmap.mmap], *, block_size: int = READ_BLOCK_SIZE) -> array:
+    """!
+    @brief 行の開始位置のインデックスを作成する
+    @param buffer ファイルの内容
+    @param block_size 一度に検索するバイト数
+    @return 行の開始位置の配列。最後の要素はファイルの終端
+    """
+    offsets = array("q", [0])
+    size = len(buffer)
+    pos = 0
+    while pos < size:
+        block = buffer[pos : pos + block_size]
+        line_lengths = map(len, block.split(b"\n")[:-1])  # 最後の要素は次のブロックに続く
+        line_ends = itertools.accumulate(map((1).__add__, line_lengths), initial=pos)
+        offsets.extend(itertools.islice(line_ends, 1, None))
+        pos += len(block)
+    if offsets[-1] != size:  # 最後の行に改行なし
+        offsets.append(size)
+    return offsets
+
+
+def mmap_has_lone_cr(buffer: Union[bytes, mmap.mmap], *, block_size: int = READ_BLOCK_SIZE) -> bool:
+    """!
+    @brief 改行コードが\rのみの行を含むかを判定する
+    @details \rを含まない場合は1回の検索で終了する。含む場合はブロックごとに\rと\r\nの数を比較する
+    @param buffer ファイルの内容
+    @param block_size 一度に検索するバイト数
+    @retval True \nが続かない\rを含む
+    @retval False 含まない
+    """
+    if buffer.find(b"\r") < 0:
+        return False
+    size = len(buffer)
+    for pos in range(0, size, block_size):
+        block = buffer[pos : pos + block_size + 1]  # ブロックの最後の\rの次のバイトを含める
+        if block.count(b"\r", 0, block_size) != block.count(b"\r\n"):
+            return True
+    return False
+
+
+class MmapRowList(MutableSequence):
+    """!
+    @brief mmapしたCSVファイルの行のリスト
+    @details 行の開始位置のインデックスだけを保持し、行は参照された時にデコード,分割する。
+    分割した行はキャッシュするため、行の値の変更は保持される。行の挿入,削除を行った場合は全行を分割してリストに変換する。
+    スライスは分割済みの行を共有する行のリストになる(listのスライスと同様)。
+    @note 改行コードは\\nと\\r\\nを扱う
+    """
+
+    def __init__(
+        self,
+        buffer: Union[bytes, mmap.mmap],
+        offsets: array,
+        *,
+        encoding: str = "utf-8",
+        start: int = 0,
+        stop: Optional[int] = None,
+        cache: Optional[dict[int, list[str]]] = None,
+    ):
+        """!
+        @brief コンストラクタ
+        @param buffer ファイルの内容
+        @param offsets 行の開始位置の配列。最後の要素は最後の行の終端
+        @param encoding 文字コード
+        @param start 先頭の行のoffsetsのインデックス
+        @param stop 終端の行のoffsetsのインデックス※含まない。Noneの場合は最後の行まで
+        @param cache 分割済みの行。キーはoffsetsのインデックス。スライス元と共有する
+        """
+        self._buffer = buffer
+        self._offsets = offsets
+        self._encoding = encoding
+        self._start = start
+        self._stop = stop if stop is not None else len(offsets) - 1
+        self._cache: dict[int, list[str]] = cache if cache is not None else {}
+        self._list: Optional[list[list[str]]] = None  # リストに変換した行
+
+    def _row(self, index: int) -> list[str]:
+        """!
+        @brief 行を取得する
+        @param index 行のインデックス※0以上であること
+        @return 行
+        """
+        index += self._start
+        row = self._cache.get(index)
+        if row is None:
+            line = self._buffer[self._offsets[index] : self._offsets[index + 1]]
+            if line.endswith(b"\n"):
+                line = line[:-2] if line.endswith(b"\r\n") else line[:-1]
+            row = split_csv_string_no_normalize_fast(line.decode(self._encoding))
+            self._cache[index] = row
+        return row
+
+    def _materialize(self) -> list[list[str]]:
+        """!
+        @brief 全行を分割してリストに変換する
+        @return 行のリスト
+        """
+        if self._list is None:
+            self._list = [self._row(i) for i in range(self._stop - self._start)]
+        return self._list
+
+    def materialized(self) -> bool:
+        """!
+        @brief リストに変換済みか
+        """
+        return self._list is not None
+
+    def __len__(self) -> int:
+        if self._list is not None:
+            return len(self._list)
+        return self._stop - self._start
+
+    @overload
+    def __getitem__(self, index: int) -> list[str]:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "MmapRowList":
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if self._list is not None:
+            return self._list[index]
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self._row(i) for i in range(start, stop, step)]
+            return MmapRowList(
+                self._buffer,
+                self._offsets,
+                encoding=self._encoding,
+                start=self._start + start,
+                stop=self._start + max(start, stop),
+                cache=self._cache,
+            )
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("list index out of range")
+        return self._row(index)
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        if self._list is None and isinstance(index, int):
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError("list assignment index out of range")
+            self._cache[self._start + index] = value
+            return
+        self._materialize()[index] = value
+
+    def __delitem__(self, index: Union[int, slice]) -> None:
+        del self._materialize()[index]
+
+    def __iter__(self) -> Iterator[list[str]]:
+        if self._list is not None:
+            return iter(self._list)
+        return (self._row(i) for i in range(len(self)))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, MmapRowList)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def insert(self, index: int, value: list[str]) -> None:
+        self._materialize().insert(index, value)
+
+    def append(self, value: list[str]) -> None:
+        self._materialize().append(value)
+
+    def copy(self) -> list[list[str]]:
+        return list(self)
+
+
+def mmap_row_list_read(file: Path, *, encoding: str = "utf-8") -> Optional[MmapRowList]:
+    """!
+    @brief CSVファイルをmmapして行のリストを作成する
+    @param file CSVファイルのパス
+    @param encoding 文字コード。ENCODING_AUTOの場合は先頭のブロックから判定する
+    @return 行のリスト。改行コードが\rのみの行を含む場合はNone(行の位置を\nで判定するため)
+    @note utf-8-sigの場合は、先頭のBOMを除いてutf-8でデコードする
+    """
+    with file.open(mode="rb") as f:
+        if file.stat().st_size == 0:  # 空のファイルはmmapできない
+            buffer: Union[bytes, mmap.mmap] = b""
+        else:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mmap_has_lone_cr(buffer):
+        return None
+    if encoding == ENCODING_AUTO:
+        encoding = encoding_detect(buffer[:READ_BLOCK_SIZE])
+    offsets = mmap_line_offsets(buffer)
+    if encoding.replace("_", "-").lower() == "utf-8-sig":
+        encoding = "utf-8"
+        if buffer[: len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+            offsets[0] = len(codecs.BOM_UTF8)
+            if offsets[0] == offsets[1]:  # BOMのみのファイル
+                offsets.pop(0)
+    return MmapRowList(buffer, offsets, encoding=encoding)
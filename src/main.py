@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
+import codecs
+
 import click
 
 from src.cmd_column import (
@@ -16,15 +18,99 @@ from src.cmd_column import (
 )
 from src.cmd_csv import cmd_csv_filetype, cmd_csv_header_add, cmd_csv_header_change, cmd_csv_header_del, cmd_csv_report
 from src.cmd_custom import cmd_custom_header_get, cmd_custom_header_line1
+from src.common import ENCODING_AUTO, ENCODING_AUTO_FALLBACK, READ_BLOCK_SIZE, WRITE_CHUNK_ROWS
+from src.csv import csv_option
+from src.csv_engine import PARSE_ENGINES
+from src.pipeline import PIPELINE_QUEUE_SIZE
+from src.table_backend import TABLE_BACKENDS
 
 __VERSION__ = "0.6.0"
 
 
+def custom_encoding(ctx: click.core.Context, param: click.Option, value: str):
+    """!
+    @brief 独自のチェックを行う関数。文字コードのチェックを行う。
+    """
+    if value == ENCODING_AUTO:
+        return value
+    try:
+        codecs.lookup(value)
+    except LookupError:
+        raise click.BadParameter(f"未知の文字コードです。{value}")
+    return value
+
+
 # サブコマンドをメインコマンドに追加
 @click.group(help="CSVファイルの前処理ツール")
 @click.version_option(version=__VERSION__)
-def cli():
-    pass
+@click.option(
+    "--engine",
+    type=click.Choice(list(PARSE_ENGINES.keys())),
+    default="auto",
+    show_default=True,
+    help="CSV行の分割エンジン。python:Python実装 stdlib:csvモジュール auto:入力に合わせて自動選択",
+)
+@click.option(
+    "--block-size",
+    type=click.IntRange(min=1),
+    default=READ_BLOCK_SIZE,
+    show_default=True,
+    help="入力から一度に読み込むバイト数",
+)
+@click.option("--mmap", "use_mmap", is_flag=True, help="入力ファイルをmmapし、行を参照時に分割する")
+@click.option(
+    "--flush-rows",
+    type=click.IntRange(min=1),
+    default=WRITE_CHUNK_ROWS,
+    show_default=True,
+    help="結合して一度に書き込む行数",
+)
+@click.option("--pipeline", is_flag=True, help="入力の読み込み,デコードと出力の書き込みを別スレッドで行う")
+@click.option(
+    "--queue-size",
+    type=click.IntRange(min=1),
+    default=PIPELINE_QUEUE_SIZE,
+    show_default=True,
+    help="--pipeline指定時にスレッド間で保持するバッチ数の上限",
+)
+@click.option("--compress-thread", is_flag=True, help="出力ファイルを圧縮する場合に、圧縮と書き込みを別スレッドで行う")
+@click.option(
+    "--encoding",
+    callback=custom_encoding,
+    default="utf-8",
+    show_default=True,
+    help=f"入力の文字コード。{ENCODING_AUTO}:先頭のブロックから判定(utf-8-sig,utf-8,{ENCODING_AUTO_FALLBACK})",
+)
+@click.option(
+    "--backend",
+    type=click.Choice(list(TABLE_BACKENDS.keys())),
+    default="rows",
+    show_default=True,
+    help="表の実装。rows:行指向 columns:列指向(カラムの追加,削除,移動が速い) category:列指向で値を辞書符号化(メモリ使用量が少ない) blocked:行をブロックに分割(行の挿入,削除が速い) sqlite:一時ファイルのSQLiteに保持(メモリに収まらない表)",
+)
+@click.option("--compact", is_flag=True, help="同じ値を共有し、変更しない行をタプルで保持してメモリ使用量を減らす")
+def cli(
+    engine: str,
+    block_size: int,
+    use_mmap: bool,
+    flush_rows: int,
+    pipeline: bool,
+    queue_size: int,
+    compress_thread: bool,
+    encoding: str,
+    backend: str,
+    compact: bool,
+):
+    csv_option.engine = engine
+    csv_option.block_size = block_size
+    csv_option.mmap = use_mmap
+    csv_option.flush_rows = flush_rows
+    csv_option.pipeline = pipeline
+    csv_option.queue_size = queue_size
+    csv_option.compress_thread = compress_thread
+    csv_option.encoding = encoding
+    csv_option.backend = backend
+    csv_option.compact = compact
 
 
 cli.add_command(cmd_column_add)
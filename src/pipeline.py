@@ -0,0 +1,209 @@
+import itertools
+import queue
+import threading
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+PIPELINE_QUEUE_SIZE = 4  # スレッド間のキューに保持するバッチ数の上限
+_POLL_INTERVAL = 0.1  # キューの待機中に中断を確認する間隔(秒)
+
+
+class _End:
+    """!
+    @brief キューの終端を表す
+    """
+
+    def __init__(self, error: Optional[BaseException] = None):
+        """!
+        @brief コンストラクタ
+        @param error 送り側で発生した例外。正常終了の場合はNone
+        """
+        self.error = error
+
+
+def _queue_drain(q: queue.Queue, thread: threading.Thread) -> None:
+    """!
+    @brief スレッドが終了するまでキューの要素を捨てる
+    @details キューへの追加を待機しているスレッドを終了させるために使用する
+    @param q キュー
+    @param thread 終了を待つスレッド
+    """
+    while thread.is_alive():
+        try:
+            q.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            pass
+    thread.join()
+
+
+def iter_batches(iterable: Iterable[T], batch_size: int) -> Iterator[list[T]]:
+    """!
+    @brief 要素をbatch_size個ずつのリストにまとめる
+    @param iterable 要素のイテレータ
+    @param batch_size 1つのリストの要素数
+    @return リストのイテレータ
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if len(batch) == 0:
+            return
+        yield batch
+
+
+def thread_reader(iterable: Iterable[T], *, maxsize: int = PIPELINE_QUEUE_SIZE) -> Iterator[T]:
+    """!
+    @brief 別スレッドでイテレータを進め、上限付きのキューを経由して要素を返す
+    @details キューが一杯になると読み込みスレッドは待機するため、先読みする要素数はmaxsizeまでになる。
+    読み込みスレッドで発生した例外は呼び出し側のスレッドで再送出する。
+    途中で呼び出し側が終了した場合は、読み込みスレッドを中断して終了を待つ。
+    @param iterable 要素のイテレータ。読み込みスレッドで進める
+    @param maxsize キューの上限
+    @return 要素のイテレータ
+    """
+    q: queue.Queue = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def run():
+        try:
+            for item in iterable:
+                if stop.is_set():
+                    return
+                q.put(item)
+        except BaseException as e:  # 呼び出し側のスレッドで再送出する
+            q.put(_End(e))
+            return
+        q.put(_End())
+
+    thread = threading.Thread(target=run, name="thread_reader", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = q.get()
+            if isinstance(item, _End):
+                if item.error is not None:
+                    raise item.error
+                return
+            yield item
+    finally:
+        stop.set()
+        _queue_drain(q, thread)
+
+
+def thread_writer(
+    consume: Callable[[Iterable[T]], object], items: Iterable[T], *, maxsize: int = PIPELINE_QUEUE_SIZE
+) -> None:
+    """!
+    @brief 別スレッドで要素を処理し、呼び出し側のスレッドは上限付きのキューに要素を追加する
+    @details キューが一杯になると呼び出し側のスレッドは待機する。
+    書き込みスレッドで発生した例外は呼び出し側のスレッドで再送出する。
+    @param consume 要素のイテレータを受け取って処理する関数。書き込みスレッドで実行する
+    @param items 要素のイテレータ。呼び出し側のスレッドで進める
+    @param maxsize キューの上限
+    """
+    q: queue.Queue = queue.Queue(maxsize=maxsize)
+    errors: list[BaseException] = []
+
+    def queue_items() -> Iterator[T]:
+        while True:
+            item = q.get()
+            if isinstance(item, _End):
+                return
+            yield item
+
+    def run():
+        items = queue_items()
+        try:
+            consume(items)
+        except BaseException as e:  # 呼び出し側のスレッドで再送出する
+            errors.append(e)
+        for _item in items:  # 呼び出し側が待機しないように、残りの要素を捨てる
+            pass
+
+    thread = threading.Thread(target=run, name="thread_writer", daemon=True)
+    thread.start()
+    try:
+        for item in items:
+            if len(errors) > 0:  # 書き込みスレッドでエラーが発生した
+                break
+            q.put(item)
+    finally:
+        q.put(_End())  # 呼び出し側で例外が発生した場合も、追加済みの要素までで終了させる
+        thread.join()
+    if len(errors) > 0:
+        raise errors[0]
+
+
+class ThreadWriteStream:
+    """!
+    @brief 書き込みを別スレッドで行うストリーム
+    @details write()したバイト列を上限付きのキューを経由して書き込みスレッドに渡す。
+    圧縮ストリームに書き込む場合は、圧縮と書き込みが呼び出し側の処理と並行して行われる(zlib,bz2,lzmaは圧縮中にGILを解放する)。
+    書き込みスレッドで発生した例外は、次のwrite()またはclose()で再送出する。
+    """
+
+    def __init__(self, o_stream: BinaryIO, *, maxsize: int = PIPELINE_QUEUE_SIZE):
+        """!
+        @brief コンストラクタ。書き込みスレッドを開始する
+        @param o_stream 書き込み先のストリーム(バイナリ)。閉じないので呼び出し側で閉じること
+        @param maxsize キューの上限
+        """
+        self._o_stream = o_stream
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._errors: list[BaseException] = []
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="thread_write_stream", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """!
+        @brief 書き込みスレッドの処理
+        @details エラー発生後も呼び出し側が待機しないように、終端までキューの要素を取り出す
+        """
+        while True:
+            data = self._queue.get()
+            if isinstance(data, _End):
+                return
+            if len(self._errors) > 0:
+                continue
+            try:
+                self._o_stream.write(data)
+            except BaseException as e:  # 呼び出し側のスレッドで再送出する
+                self._errors.append(e)
+
+    def _raise_error(self):
+        """!
+        @brief 書き込みスレッドで発生した例外を再送出する
+        """
+        if len(self._errors) > 0:
+            raise self._errors[0]
+
+    def write(self, data: bytes) -> int:
+        """!
+        @brief バイト列を書き込みスレッドに渡す
+        @param data 書き込むバイト列
+        @return 書き込んだバイト数
+        """
+        if self._closed:
+            raise ValueError("I/O operation on closed file.")
+        self._raise_error()
+        self._queue.put(bytes(data))
+        return len(data)
+
+    def close(self):
+        """!
+        @brief 書き込みスレッドの終了を待つ
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_End())
+        self._thread.join()
+        self._raise_error()
+
+    def __enter__(self) -> "ThreadWriteStream":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
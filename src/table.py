@@ -1,8 +1,10 @@
+import sys
 from dataclasses import dataclass, field
-from typing import Type, TypeVar
+from operator import itemgetter
+from typing import Callable, Iterable, Optional, Sequence, Type, TypeVar
 
 
-@dataclass
+@dataclass(slots=True)
 class CsvFileTypeInfo:
     """!
     @brief CSVファイルの種別情報
@@ -16,6 +18,113 @@ class CsvFileTypeInfo:
 
 
 Self = TypeVar("Self", bound="Table")
+T = TypeVar("T")
+
+
+def column_permute_getter(column_index_list: list[int]) -> Callable[[Sequence[str]], list[str]]:
+    """!
+    @brief 行から指定したカラムを順に取り出す関数を作成する
+    @details operator.itemgetter()で1回の呼び出しで取り出す
+    @param column_index_list 取り出すカラムのインデックスリスト。同じインデックスを複数回指定できる
+    @return 行を受け取り、取り出したカラムのリストを返す関数
+    @exception IndexError 関数の呼び出し時に、インデックスが範囲外の場合
+    """
+    if len(column_index_list) == 0:
+        return lambda values: []
+    getter = itemgetter(*column_index_list)
+    if len(column_index_list) == 1:  # itemgetter()は要素を1つだけ返す
+        return lambda values: [getter(values)]
+    return lambda values: list(getter(values))
+
+
+def column_move_permutation(from_index_list: list[int], to_index_list: list[int], column_count: int) -> list[int]:
+    """!
+    @brief カラムの移動を、移動後の各カラムの移動前のインデックスのリストに変換する
+    @details 移動元のカラムをインデックスの大きい順に削除してから、移動先のインデックスの大きい順に挿入した場合と同じになる。
+    移動先のインデックスが同じ場合は、移動元の指定順になる。
+    @param from_index_list 移動元のカラムのインデックスリスト
+    @param to_index_list 移動先のカラムのインデックスリスト。移動元を削除した後のインデックス
+    @param column_count 移動前のカラム数
+    @return 移動後のカラムの順に並べた、移動前のインデックスのリスト
+    @exception IndexError 移動元のインデックスが範囲外の場合
+    """
+    permutation = list(range(column_count))
+    removed: list[tuple[int, int, int]] = []  # (移動先,指定順,移動前のインデックス)
+    for order, from_index in sorted(enumerate(from_index_list), key=lambda x: x[1], reverse=True):
+        removed.append((to_index_list[order], order, permutation.pop(from_index)))
+    for to_index, _order, column_index in sorted(removed, reverse=True):
+        permutation.insert(to_index, column_index)
+    return permutation
+
+
+ColumnAddPlan = list[tuple[int, int]]  # (追加する位置,カラム数)のリスト。位置の昇順
+
+
+def column_add_plan(column_index_list: list[int], *, column_count: int = 1) -> ColumnAddPlan:
+    """!
+    @brief カラムを追加する位置と数の計画を作成する
+    @details 追加前の行のインデックスで位置を表す。負のインデックスは最後に追加する。
+    Table.table_column_add()をインデックスの大きい順に実行した場合と同じ結果になる。
+    @param column_index_list 追加するカラムのインデックスリスト。インデックスの前に追加する
+    @param column_count 1つのインデックスに追加するカラム数
+    @return 計画
+    """
+    counts: dict[int, int] = {}
+    for column_index in column_index_list:
+        position = sys.maxsize if column_index < 0 else column_index
+        counts[position] = counts.get(position, 0) + column_count
+    return sorted(counts.items())
+
+
+def column_del_plan(column_index_list: list[int], column_count: int) -> list[slice]:
+    """!
+    @brief カラムを削除した後に残す範囲の計画を作成する
+    @details Table.table_column_del()をインデックスの大きい順に実行した場合と同じ結果になる
+    @param column_index_list 削除するカラムのインデックスリスト
+    @param column_count 削除前の行のカラム数
+    @return 残すカラムの連続した範囲のリスト
+    @exception IndexError インデックスが範囲外の場合
+    """
+    kept = list(range(column_count))
+    for column_index in sorted(column_index_list, reverse=True):
+        del kept[column_index]
+    plan: list[slice] = []
+    start = 0
+    for i in range(1, len(kept) + 1):
+        if i == len(kept) or kept[i] != kept[i - 1] + 1:  # 連続する範囲の終端
+            plan.append(slice(kept[start], kept[i - 1] + 1))
+            start = i
+    return plan
+
+
+def values_column_add(values: list[str], plan: ColumnAddPlan) -> list[str]:
+    """!
+    @brief 計画に従いカラムを追加した行を作成する
+    @param values 行
+    @param plan column_add_plan()で作成した計画
+    @return 空文字のカラムを追加した行
+    """
+    new_values: list[str] = []
+    start = 0
+    for position, count in plan:
+        new_values += values[start:position]
+        new_values += [""] * count
+        start = position
+    new_values += values[start:]
+    return new_values
+
+
+def values_column_del(values: list[str], plan: list[slice]) -> list[str]:
+    """!
+    @brief 計画に従いカラムを削除した行を作成する
+    @param values 行
+    @param plan column_del_plan()で作成した計画
+    @return カラムを削除した行
+    """
+    new_values: list[str] = []
+    for s in plan:
+        new_values += values[s]
+    return new_values
 
 
 class Table:
@@ -23,6 +132,8 @@ class Table:
     @brief 表のデータクラス
     """
 
+    __slots__ = ("_header_rows", "_rows")
+
     def __init__(self: Self):
         """!
         @brief コンストラクタ
@@ -49,6 +160,15 @@ class Table:
         for i, row in enumerate(self._rows):
             row.append(column[i])
 
+    def column_map(self: Self, column_index: int, func: Callable[[str], T]) -> list[T]:
+        """!
+        @brief カラムの各行の値に関数を適用する
+        @param column_index カラムのインデックス
+        @param func 値に適用する関数
+        @return 行の順に並べた関数の戻り値のリスト
+        """
+        return [func(row[column_index]) for row in self._rows]
+
     def column_count(self: Self) -> int:
         """!
         @brief カラムの数を取得する
@@ -103,6 +223,14 @@ class Table:
         """
         self._rows.append(row)
 
+    def row_add_multi(self: Self, rows: list[list[str]]) -> None:
+        """!
+        @brief 複数の行を追加
+        @param rows 追加する行のリスト
+        @exception ValueError 表の実装で保持できない行を含む場合。その場合は表を変更しない
+        """
+        self._rows.extend(rows)
+
     def row_count(self: Self) -> int:
         """!
         @brief 行数を取得する
@@ -162,6 +290,21 @@ class Table:
         del self._rows[start_row_index:end_row_index]
         return removed_items
 
+    def row_values(self: Self) -> Iterable[Sequence[str]]:
+        """!
+        @brief 値を参照するための行のイテレータを取得する
+        @details 出力などで値を順に参照する場合に使用する。行の値の変更は表に反映されない場合がある
+        @return 行のイテレータ
+        """
+        return self._rows
+
+    def rows_transform(self: Self, transform: Callable[[Iterable[list[str]]], Iterable[list[str]]]) -> None:
+        """!
+        @brief 行のイテレータを変換する関数で、すべての行を変換する
+        @param transform 行のイテレータを変換する関数。table_utlのrows_column_*()など
+        """
+        self._rows = list(transform(self._rows))
+
     def table_column_add(self: Self, column_index: int, *, column_count: int = 1) -> None:
         """!
         @brief カラムを追加
@@ -184,6 +327,48 @@ class Table:
         for columns in self._rows:
             del columns[column_index]
 
+    def table_column_add_multi(self: Self, column_index_list: list[int], *, column_count: int = 1) -> None:
+        """!
+        @brief 複数の位置にカラムを追加
+        @details 各行は1回だけ作り直す。table_column_add()をインデックスの大きい順に実行した場合と同じ結果になる。
+        @param column_index_list 追加するカラム(インデックス)のリスト。インデックスの前に追加する。最後に追加する場合は、-1を指定する。
+        @param column_count 1つのインデックスに追加するカラム数
+        """
+        plan = column_add_plan(column_index_list, column_count=column_count)
+        self._rows = [values_column_add(row, plan) for row in self._rows]
+
+    def table_column_del_multi(self: Self, column_index_list: list[int]) -> None:
+        """!
+        @brief 複数のカラムを削除
+        @details 各行は1回だけ作り直す。table_column_del()をインデックスの大きい順に実行した場合と同じ結果になる。
+        @param column_index_list 削除するカラム(インデックス)のリスト
+        @exception IndexError インデックスが範囲外の場合
+        """
+        plans: dict[int, list[slice]] = {}  # 行のカラム数ごとの計画
+        new_rows = []
+        for row in self._rows:
+            plan = plans.get(len(row))
+            if plan is None:
+                plan = plans[len(row)] = column_del_plan(column_index_list, len(row))
+            new_rows.append(values_column_del(row, plan))
+        self._rows = new_rows
+
+    def table_permute_rows(self: Self, row_index_list: list[int]) -> None:
+        """!
+        @brief 行を並べ替える
+        @param row_index_list 並べ替え後の行の順に並べた、元の行のインデックスのリスト
+        """
+        self._rows = list(map(self._rows.__getitem__, row_index_list))
+
+    def table_permute_columns(self: Self, column_index_list: list[int]) -> None:
+        """!
+        @brief カラムを並べ替える
+        @details 各行に同じインデックスリストを適用し、1回で作り直す
+        @param column_index_list 並べ替え後のカラムの順に並べた、元のカラムのインデックスのリスト
+        @exception IndexError インデックスが範囲外の場合
+        """
+        self._rows = list(map(column_permute_getter(column_index_list), self._rows))
+
     def table_header_add(self: Self, csv_filetype: CsvFileTypeInfo) -> None:
         """!
         @brief テーブルにヘッダを追加
@@ -216,9 +401,9 @@ class Table:
         @return 抽出した表
         """
         tbl = type(self)()
+        getter = column_permute_getter(column_index_list)
         for row in self._rows:
-            row_new = [row[i] for i in column_index_list]
-            tbl.row_add(row_new)
+            tbl.row_add(getter(row))
         return tbl
 
     def table_select_column_range(self: Self, start_index: int, end_index: int) -> Self:
@@ -232,3 +417,110 @@ class Table:
         for row in self._rows:
             tbl.row_add(row[start_index:end_index])
         return tbl
+
+    def table_view_column_list(self: Self, column_index_list: list[int]) -> "TableView":
+        """!
+        @brief 指定したカラムの列を、行を複製せずに参照するビューを作成する
+        @details 出力など、抽出した列を参照するだけの場合に使用する。ビューを変更した時点で行を複製する
+        @param column_index_list 抽出するカラムのインデックスのリスト
+        @return ビュー
+        @note 行を複製する前にこの表を変更した場合は、ビューにも反映される
+        """
+        return TableView(self, column_permute_getter(column_index_list), column_index_list=list(column_index_list))
+
+    def table_view_column_range(self: Self, start_index: int, end_index: int) -> "TableView":
+        """!
+        @brief 指定した範囲の列を、行を複製せずに参照するビューを作成する
+        @details 出力など、抽出した列を参照するだけの場合に使用する。ビューを変更した時点で行を複製する
+        @param start_index 抽出する列の開始位置
+        @param end_index 抽出する列の終了位置
+        @return ビュー
+        @note 行を複製する前にこの表を変更した場合は、ビューにも反映される
+        """
+        return TableView(self, itemgetter(slice(start_index, end_index)))
+
+
+class TableView(Table):
+    """!
+    @brief 親の表の行からカラムを抽出するビュー
+    @details Table.table_view_column_list(),table_view_column_range()で作成する。
+    行は参照する時に親の表の行から作成し、保持しない。値の参照(row_values(),column_map()など)は親の表を
+    参照したまま行う。変更する操作を行った時点で、抽出した行を複製した行指向の表になる。
+    @note 複製する前に親の表を変更した場合は、ビューにも反映される。親の表を変更する場合は
+    table_select_column_list(),table_select_column_range()で複製した表を使用する
+    """
+
+    __slots__ = ("_parent", "_getter", "_column_index_list", "_table_rows")
+
+    def __init__(
+        self,
+        parent: Optional[Table] = None,
+        getter: Optional[Callable[[Sequence[str]], Sequence[str]]] = None,
+        *,
+        column_index_list: Optional[list[int]] = None,
+    ):
+        """!
+        @brief コンストラクタ
+        @param parent 親の表。Noneの場合は空の行指向の表
+        @param getter 親の行から抽出した行を作成する関数
+        @param column_index_list 抽出するカラムのインデックスのリスト。範囲で抽出する場合はNone
+        """
+        self._parent = parent
+        self._getter = getter
+        self._column_index_list = column_index_list
+        self._table_rows: Optional[list[list[str]]] = None  # 複製した行
+        self._header_rows: list[list[str]] = []
+        if parent is None:
+            self._table_rows = []
+
+    def materialized(self) -> bool:
+        """!
+        @brief 行を複製したか(親の表を参照していないか)
+        """
+        return self._table_rows is not None
+
+    @property  # type: ignore[override]
+    def _rows(self) -> list[list[str]]:
+        """!
+        @brief 行のリスト。参照すると行を複製する
+        """
+        if self._table_rows is None:
+            self._table_rows = [row if type(row) is list else list(row) for row in self.row_values()]
+            self._parent = None
+            self._getter = None
+        return self._table_rows
+
+    @_rows.setter
+    def _rows(self, rows: list[list[str]]) -> None:
+        self._table_rows = rows
+        self._parent = None
+        self._getter = None
+
+    def column_map(self, column_index: int, func: Callable[[str], T]) -> list[T]:
+        if self._parent is not None and self._column_index_list is not None:  # 親の表のカラムに適用する
+            return self._parent.column_map(self._column_index_list[column_index], func)
+        return [func(row[column_index]) for row in self.row_values()]
+
+    def column_count(self) -> int:
+        if self._parent is None:
+            return super().column_count()
+        if self._parent.row_count() == 0:
+            return 0
+        if self._column_index_list is not None:
+            return len(self._column_index_list)
+        return len(next(iter(self.row_values())))
+
+    def row_count(self) -> int:
+        if self._parent is not None:
+            return self._parent.row_count()
+        return super().row_count()
+
+    def row_values(self) -> Iterable[Sequence[str]]:
+        if self._parent is not None:
+            return map(self._getter, self._parent.row_values())  # type: ignore[arg-type]
+        return super().row_values()
+
+    def table_view_column_list(self, column_index_list: list[int]) -> "TableView":
+        if self._parent is not None and self._column_index_list is not None:  # 親の表のインデックスに置き換える
+            return self._parent.table_view_column_list([self._column_index_list[i] for i in column_index_list])
+        return super().table_view_column_list(column_index_list)
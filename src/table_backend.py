@@ -0,0 +1,28 @@
+from typing import Type
+
+from src.table import Table
+from src.table_blocked import BlockedTable
+from src.table_category import CategoryTable
+from src.table_column import ColumnTable
+from src.table_sqlite import SqliteTable
+
+TABLE_BACKENDS: dict[str, Type[Table]] = {
+    "rows": Table,
+    "columns": ColumnTable,
+    "category": CategoryTable,
+    "blocked": BlockedTable,
+    "sqlite": SqliteTable,
+}
+
+
+def table_backend_get(name: str) -> Type[Table]:
+    """!
+    @brief 名前から表の実装を取得する
+    @param name 実装名。TABLE_BACKENDSのキー
+    @return 表のクラス
+    @exception ValueError 未知の実装名
+    """
+    backend = TABLE_BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"未知の表の実装です。backend={name}")
+    return backend
@@ -0,0 +1,220 @@
+import bisect
+import itertools
+from collections.abc import MutableSequence
+from typing import Any, Iterable, Iterator
+
+from src.table import Self, Table
+
+BLOCKED_ROWS_SIZE = 1024  # ブロックの行数。挿入でこの2倍を超えたブロックは分割する
+
+
+class BlockedRowList(MutableSequence):
+    """!
+    @brief ブロックに分割した行のリスト
+    @details 行をBLOCKED_ROWS_SIZE行程度のブロック(リスト)に分けて保持し、各ブロックの先頭の行番号で行を探す。
+    行の挿入,削除は1つのブロック内の移動になるため、行数nに対しO(sqrt(n))程度になる。
+    挿入,削除したブロックより後ろのブロックの先頭の行番号は、次にそのブロックの行を参照する時に再計算する。
+    """
+
+    __slots__ = ("_blocks", "_starts", "_valid_blocks", "_len", "_block_size")
+
+    def __init__(self, rows: Iterable[Any] = (), *, block_size: int = BLOCKED_ROWS_SIZE):
+        """!
+        @brief コンストラクタ
+        @param rows 行のイテレータ
+        @param block_size ブロックの行数
+        """
+        self._blocks: list[list[Any]] = []
+        self._starts: list[int] = []  # 各ブロックの先頭の行番号
+        self._valid_blocks = 0  # _startsが正しい先頭からのブロック数
+        self._len = 0
+        self._block_size = block_size
+        self.extend(rows)
+
+    def _invalidate(self, block_index: int) -> None:
+        """!
+        @brief ブロックの行数を変更した場合に、後ろのブロックの先頭の行番号を無効にする
+        @param block_index 先頭の行番号が変わらない最後のブロックのインデックス。-1の場合はすべて無効にする
+        """
+        if block_index + 1 < self._valid_blocks:
+            self._valid_blocks = block_index + 1
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        """!
+        @brief 行のブロックとブロック内の位置を取得する
+        @param index 行のインデックス。負の場合は末尾から数える
+        @return (ブロックのインデックス,ブロック内のインデックス)
+        @exception IndexError インデックスが範囲外の場合
+        """
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("list index out of range")
+        starts = self._starts
+        valid = self._valid_blocks
+        if valid == 0 or index >= starts[valid - 1] + len(self._blocks[valid - 1]):  # 後ろのブロックを再計算する
+            last = max(valid - 1, 0)
+            first_start = starts[last] if valid > 0 else 0
+            starts[last:] = itertools.accumulate(map(len, self._blocks[last:-1]), initial=first_start)
+            valid = self._valid_blocks = len(self._blocks)
+        block_index = bisect.bisect_right(starts, index, 0, valid) - 1
+        return block_index, index - starts[block_index]
+
+    def _iter_from(self, index: int) -> Iterator[Any]:
+        """!
+        @brief 指定した行から末尾までのイテレータ
+        @param index 行のインデックス※0以上であること
+        """
+        if index >= self._len:
+            return iter(())
+        block_index, offset = self._locate(index)
+        rest = itertools.chain.from_iterable(self._blocks[block_index + 1 :])
+        return itertools.chain(self._blocks[block_index][offset:], rest)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step != 1:
+                return list(self)[index]
+            return list(itertools.islice(self._iter_from(start), max(0, stop - start)))
+        block_index, offset = self._locate(index)
+        return self._blocks[block_index][offset]
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        if isinstance(index, slice):
+            rows = list(self)
+            rows[index] = value
+            self._reset(rows)
+            return
+        block_index, offset = self._locate(index)
+        self._blocks[block_index][offset] = value
+
+    def __delitem__(self, index: Any) -> None:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step != 1:
+                rows = list(self)
+                del rows[index]
+                self._reset(rows)
+                return
+            self._delete_range(start, stop)
+            return
+        block_index, offset = self._locate(index)
+        rows = self._blocks[block_index]
+        del rows[offset]
+        if len(rows) == 0:
+            del self._blocks[block_index]
+            self._invalidate(block_index - 1)
+        else:
+            self._invalidate(block_index)
+        self._len -= 1
+
+    def _delete_range(self, start: int, stop: int) -> None:
+        """!
+        @brief 連続する行を削除する
+        @param start 削除する最初の行のインデックス
+        @param stop 削除する最後の行の次のインデックス
+        """
+        count = stop - start
+        if count <= 0:
+            return
+        block_index, offset = self._locate(start)
+        self._invalidate(block_index - 1)
+        self._len -= count
+        while count > 0:
+            rows = self._blocks[block_index]
+            n = min(len(rows) - offset, count)
+            del rows[offset : offset + n]
+            count -= n
+            if len(rows) == 0:
+                del self._blocks[block_index]
+            else:
+                block_index += 1
+            offset = 0
+
+    def _reset(self, rows: list[Any]) -> None:
+        """!
+        @brief すべての行を置き換える
+        @param rows 行のリスト
+        """
+        self._blocks = []
+        self._len = 0
+        self._invalidate(-1)
+        self.extend(rows)
+
+    def __iter__(self) -> Iterator[Any]:
+        return itertools.chain.from_iterable(self._blocks)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, BlockedRowList)):
+            return self._len == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def insert(self, index: int, value: Any) -> None:
+        if index < 0:
+            index = max(0, index + self._len)
+        if index >= self._len:
+            self.append(value)
+            return
+        block_index, offset = self._locate(index)
+        rows = self._blocks[block_index]
+        rows.insert(offset, value)
+        if len(rows) > self._block_size * 2:  # ブロックを分割する
+            half = len(rows) // 2
+            self._blocks[block_index : block_index + 1] = [rows[:half], rows[half:]]
+        self._invalidate(block_index)
+        self._len += 1
+
+    def append(self, value: Any) -> None:
+        if len(self._blocks) == 0 or len(self._blocks[-1]) >= self._block_size:
+            self._blocks.append([])
+        self._blocks[-1].append(value)
+        self._len += 1
+
+    def extend(self, values: Iterable[Any]) -> None:
+        iterator = iter(values)
+        if len(self._blocks) > 0:  # 最後のブロックの残りを埋める
+            rows = self._blocks[-1]
+            count = len(rows)
+            rows.extend(itertools.islice(iterator, max(0, self._block_size - count)))
+            self._len += len(rows) - count
+        while True:
+            rows = list(itertools.islice(iterator, self._block_size))
+            if len(rows) == 0:
+                break
+            self._blocks.append(rows)
+            self._len += len(rows)
+
+    def copy(self) -> list[Any]:
+        return list(self)
+
+
+class BlockedTable(Table):
+    """!
+    @brief 行をブロックに分割して保持する表
+    @details 行の挿入,削除(row_duplicate,row_insert,row_remove,row_remove_multi)が表の途中でも行数に比例しない。
+    行のリストはBlockedRowListで、行指向の表と同じ操作で参照,変更できる。
+    """
+
+    __slots__ = ("_blocked_rows",)
+
+    @property  # type: ignore[override]
+    def _rows(self) -> BlockedRowList:
+        """!
+        @brief 行のリスト
+        """
+        return self._blocked_rows
+
+    @_rows.setter
+    def _rows(self, rows: Iterable[list[str]]) -> None:
+        self._blocked_rows = rows if isinstance(rows, BlockedRowList) else BlockedRowList(rows)
+
+    def table_permute_rows(self: Self, row_index_list: list[int]) -> None:
+        rows = list(self._rows)
+        self._rows = map(rows.__getitem__, row_index_list)
@@ -0,0 +1,169 @@
+from array import array
+from collections.abc import MutableSequence
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
+
+from src.table import Self, T
+from src.table_column import ColumnTable
+
+CATEGORY_DISTINCT_RATIO = 0.5  # 値の種類数が行数のこの割合を超える列は辞書符号化しない
+
+
+class CategoryDictionary(dict):
+    """!
+    @brief 値から符号への辞書
+    @details 未登録の値を参照すると新しい符号を割り当てる。登録した値は削除しない。
+    列の複製では辞書を共有する(符号と値の対応は変わらないため)。
+    """
+
+    def __init__(self):
+        """!
+        @brief コンストラクタ
+        """
+        super().__init__()
+        self.values: list[str] = []  # 符号から値へのリスト
+
+    def __missing__(self, value: str) -> int:
+        code = len(self.values)
+        self[value] = code
+        self.values.append(value)
+        return code
+
+
+class CategoryColumn(MutableSequence):
+    """!
+    @brief 辞書符号化した列
+    @details 値を辞書の符号(整数)の配列で保持する。同じ値の行は同じ文字列オブジェクトを参照するため、
+    値の比較は同一オブジェクトの比較になる。
+    """
+
+    __slots__ = ("_dictionary", "_codes")
+
+    def __init__(self, values: Iterable[str] = (), *, dictionary: Optional[CategoryDictionary] = None):
+        """!
+        @brief コンストラクタ
+        @param values 列の値
+        @param dictionary 値の辞書。Noneの場合は新しい辞書を作成する
+        """
+        self._dictionary = dictionary if dictionary is not None else CategoryDictionary()
+        self._codes = array("I", map(self._dictionary.__getitem__, values))
+
+    def dictionary_size(self) -> int:
+        """!
+        @brief 辞書に登録した値の種類数
+        """
+        return len(self._dictionary.values)
+
+    def map(self, func: Callable[[str], T]) -> list[T]:
+        """!
+        @brief 各行の値に関数を適用する
+        @details 関数は値の種類ごとに1回だけ呼び出す。
+        ただし、戻り値がNaNの値は行ごとに呼び出す(同じNaNのオブジェクトを共有すると、タプルの比較で一致と判定されソートの順序が変わるため)
+        @param func 値に適用する関数
+        @return 行の順に並べた関数の戻り値のリスト
+        """
+        results = list(map(func, self._dictionary.values))
+        nan_codes = {code for code, result in enumerate(results) if result != result}  # NaNは自身と一致しない
+        if len(nan_codes) > 0:
+            values = self._dictionary.values
+            return [func(values[code]) if code in nan_codes else results[code] for code in self._codes]
+        return list(map(results.__getitem__, self._codes))
+
+    def take(self, row_index_list: list[int]) -> "CategoryColumn":
+        """!
+        @brief 指定した行の順に値を取り出した列を作成する
+        @param row_index_list 行のインデックスのリスト
+        @return 辞書を共有する列
+        """
+        column = CategoryColumn(dictionary=self._dictionary)
+        column._codes = array("I", map(self._codes.__getitem__, row_index_list))
+        return column
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return self.take(list(range(*index.indices(len(self)))))
+        return self._dictionary.values[self._codes[index]]
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        if isinstance(index, slice):
+            self._codes[index] = array("I", map(self._dictionary.__getitem__, value))
+            return
+        self._codes[index] = self._dictionary[value]
+
+    def __delitem__(self, index: Any) -> None:
+        del self._codes[index]
+
+    def __iter__(self) -> Iterator[str]:
+        return map(self._dictionary.values.__getitem__, self._codes)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, CategoryColumn)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def insert(self, index: int, value: str) -> None:
+        self._codes.insert(index, self._dictionary[value])
+
+    def append(self, value: str) -> None:
+        self._codes.append(self._dictionary[value])
+
+    def extend(self, values: Iterable[str]) -> None:
+        self._codes.extend(map(self._dictionary.__getitem__, values))
+
+    def copy(self) -> "CategoryColumn":
+        column = CategoryColumn(dictionary=self._dictionary)
+        column._codes = array("I", self._codes)
+        return column
+
+
+class CategoryTable(ColumnTable):
+    """!
+    @brief 辞書符号化した列の表
+    @details 列指向の表の列をCategoryColumnで保持する。値は書き込み時にデコードする。
+    値の種類が多い列(CATEGORY_DISTINCT_RATIOを超える)は、最初に作成した時点でリストの列にする。
+    """
+
+    __slots__ = ()
+
+    def _column_create(self, values: Iterable[str]) -> MutableSequence[str]:
+        return CategoryColumn(values)
+
+    def _column_take(self, column: MutableSequence[str], row_index_list: list[int]) -> MutableSequence[str]:
+        if isinstance(column, CategoryColumn):
+            return column.take(row_index_list)
+        return super()._column_take(column, row_index_list)
+
+    def _columns_compact(self) -> None:
+        """!
+        @brief 値の種類が多い列をリストの列にする
+        """
+        self._columns = [
+            list(column)
+            if isinstance(column, CategoryColumn) and column.dictionary_size() > len(column) * CATEGORY_DISTINCT_RATIO
+            else column
+            for column in self._columns
+        ]
+
+    @ColumnTable._rows.setter  # type: ignore[attr-defined]
+    def _rows(self, rows: Iterable[Sequence[str]]) -> None:
+        ColumnTable._rows.fset(self, rows)  # type: ignore[attr-defined]
+        self._columns_compact()
+
+    def column_map(self: Self, column_index: int, func: Callable[[str], T]) -> list[T]:
+        if self._row_count == 0:  # 行がない場合は列もない
+            return []
+        column = self._columns[column_index]
+        if isinstance(column, CategoryColumn):
+            return column.map(func)
+        return super().column_map(column_index, func)
+
+    def row_add_multi(self: Self, rows: list[list[str]]) -> None:
+        first = self._row_count == 0
+        super().row_add_multi(rows)
+        if first:  # 最初の行のリストで列の表現を決める
+            self._columns_compact()
@@ -0,0 +1,335 @@
+import itertools
+from collections.abc import MutableSequence
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from src.table import Self, T, Table, column_add_plan, column_del_plan, values_column_del
+
+
+class ColumnCountError(ValueError):
+    """!
+    @brief カラム数が異なる行を列指向の表に追加しようとした
+    """
+
+
+class ColumnRow(MutableSequence):
+    """!
+    @brief 列指向の表の1行のビュー
+    @details 値の参照,変更は表の列に反映される。行の長さ(カラム数)は変更できない。
+    """
+
+    __slots__ = ("_table", "_row_index")
+
+    def __init__(self, table: "ColumnTable", row_index: int):
+        """!
+        @brief コンストラクタ
+        @param table 列指向の表
+        @param row_index 行のインデックス
+        """
+        self._table = table
+        self._row_index = row_index
+
+    def __len__(self) -> int:
+        return len(self._table._columns)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [column[self._row_index] for column in self._table._columns[index]]
+        return self._table._columns[index][self._row_index]
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        if isinstance(index, slice):
+            columns = self._table._columns[index]
+            values = list(value)
+            if len(columns) != len(values):
+                raise TypeError("列指向の表の行の長さは変更できません。")
+            for column, v in zip(columns, values):
+                column[self._row_index] = v
+            return
+        self._table._columns[index][self._row_index] = value
+
+    def __delitem__(self, index: Any) -> None:
+        raise TypeError("列指向の表の行の長さは変更できません。")
+
+    def __iter__(self) -> Iterator[str]:
+        row_index = self._row_index
+        return (column[row_index] for column in self._table._columns)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, ColumnRow)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def insert(self, index: int, value: str) -> None:
+        raise TypeError("列指向の表の行の長さは変更できません。")
+
+    def copy(self) -> list[str]:
+        return list(self)
+
+
+class ColumnRows(MutableSequence):
+    """!
+    @brief 列指向の表の行のリストのビュー
+    @details 要素はColumnRow。行の挿入,削除は表の各列に反映される。
+    """
+
+    __slots__ = ("_table",)
+
+    def __init__(self, table: "ColumnTable"):
+        """!
+        @brief コンストラクタ
+        @param table 列指向の表
+        """
+        self._table = table
+
+    def __len__(self) -> int:
+        return self._table._row_count
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [ColumnRow(self._table, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("list index out of range")
+        return ColumnRow(self._table, index)
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        if isinstance(index, slice):
+            rows = [list(row) for row in self]
+            rows[index] = value
+            self._table._rows = rows
+            return
+        self[index][:] = value
+
+    def __delitem__(self, index: Any) -> None:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise TypeError("列指向の表では連続しない行を削除できません。")
+            self._table.row_remove_multi(start, stop)
+            return
+        self._table.row_remove(index)
+
+    def __iter__(self) -> Iterator[ColumnRow]:
+        table = self._table
+        return (ColumnRow(table, i) for i in range(table._row_count))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, ColumnRows)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def insert(self, index: int, value: Sequence[str]) -> None:
+        self._table.row_insert(index, list(value))
+
+
+class ColumnTable(Table):
+    """!
+    @brief 列指向の表
+    @details 列ごとのリストで値を保持する。カラムの追加,削除,移動,選択は列のリストの操作のみで行う。
+    行はColumnRowのビューとして参照,変更できる。すべての行のカラム数が同じであること。
+    """
+
+    __slots__ = ("_columns", "_row_count")
+
+    def __init__(self: Self):
+        """!
+        @brief コンストラクタ
+        """
+        self._columns: list[MutableSequence[str]] = []
+        self._row_count = 0
+        super().__init__()
+
+    @property  # type: ignore[override]
+    def _rows(self) -> ColumnRows:
+        """!
+        @brief 行のリストのビュー
+        """
+        return ColumnRows(self)
+
+    @_rows.setter
+    def _rows(self, rows: Iterable[Sequence[str]]) -> None:
+        """!
+        @brief 行のリストから列を作成する
+        @exception ColumnCountError カラム数が異なる行を含む場合
+        """
+        if not isinstance(rows, list):
+            rows = list(rows)
+        if len({len(row) for row in rows}) > 1:
+            raise ColumnCountError("カラム数が異なる行を含むため、列指向の表にできません。")
+        self._columns = [self._column_create(column) for column in zip(*rows)]
+        self._row_count = len(rows)
+
+    def _column_create(self, values: Iterable[str]) -> MutableSequence[str]:
+        """!
+        @brief 列を作成する
+        @param values 列の値
+        @return 列。派生クラスで列の表現を変更する
+        """
+        return list(values)
+
+    def _column_take(self, column: MutableSequence[str], row_index_list: list[int]) -> MutableSequence[str]:
+        """!
+        @brief 指定した行の順に値を取り出した列を作成する
+        @param column 列
+        @param row_index_list 行のインデックスのリスト
+        @return 列
+        """
+        return list(map(column.__getitem__, row_index_list))
+
+    def _row_check(self, row: Sequence[str]) -> None:
+        """!
+        @brief 追加する行のカラム数を確認する
+        @exception ColumnCountError カラム数が一致しない場合
+        """
+        if self._row_count == 0:  # 最初の行のカラム数にする
+            self._columns = [self._column_create(()) for _ in row]
+        elif len(row) != len(self._columns):
+            raise ColumnCountError(f"カラム数が一致しません。column_count={len(self._columns)},row={len(row)}")
+
+    def _column_new(self, column: Sequence[str]) -> list[str]:
+        """!
+        @brief 追加する列を作成する
+        @param column 列。行数より長い場合は切り捨てる
+        @return 行数の長さの列
+        @exception IndexError 列が行数より短い場合
+        """
+        if len(column) < self._row_count:
+            raise IndexError("list index out of range")
+        return self._column_create(column[: self._row_count])
+
+    def column_add(self: Self, column: list[str]) -> None:
+        self._columns.append(self._column_new(column))
+
+    def column_map(self: Self, column_index: int, func: Callable[[str], T]) -> list[T]:
+        if self._row_count == 0:  # 行がない場合は列もない
+            return []
+        return list(map(func, self._columns[column_index]))
+
+    def column_count(self: Self) -> int:
+        if self._row_count == 0:
+            return 0
+        return len(self._columns)
+
+    def column_insert(self: Self, column_index: int, column: list[str]) -> None:
+        self._columns.insert(column_index, self._column_new(column))
+
+    def column_insert_empty(self: Self, column_index: int) -> None:
+        self._columns.insert(column_index, self._column_create([""] * self._row_count))
+
+    def column_move(self: Self, from_index: int, to_index: int) -> None:
+        self._columns.insert(to_index, self._columns.pop(from_index))
+
+    def column_remove(self: Self, column_index: int) -> list[str]:
+        return self._columns.pop(column_index)
+
+    def row_add(self: Self, row: list[str]) -> None:
+        self._row_check(row)
+        for column, value in zip(self._columns, row):
+            column.append(value)
+        self._row_count += 1
+
+    def row_add_multi(self: Self, rows: list[list[str]]) -> None:
+        if len(rows) == 0:
+            return
+        column_count = len(self._columns) if self._row_count > 0 else len(rows[0])
+        if any(len(row) != column_count for row in rows):
+            raise ColumnCountError(f"カラム数が一致しません。column_count={column_count}")
+        if self._row_count == 0:
+            self._columns = [self._column_create(column) for column in zip(*rows)]
+        else:
+            for column, values in zip(self._columns, zip(*rows)):
+                column.extend(values)
+        self._row_count += len(rows)
+
+    def row_count(self: Self) -> int:
+        return self._row_count
+
+    def row_duplicate(self: Self, row_index: int) -> ColumnRow:  # type: ignore[override]
+        for column in self._columns:
+            column.insert(row_index + 1, column[row_index])
+        self._row_count += 1
+        return ColumnRow(self, row_index + 1)
+
+    def row_insert(self: Self, row_index: int, row: list[str]) -> None:
+        self._row_check(row)
+        for column, value in zip(self._columns, row):
+            column.insert(row_index, value)
+        self._row_count += 1
+
+    def row_insert_empty(self: Self, row_index: int) -> None:
+        self.row_insert(row_index, [""] * len(self._columns))
+
+    def row_move(self: Self, from_index: int, to_index: int) -> None:
+        for column in self._columns:
+            column.insert(to_index, column.pop(from_index))
+
+    def row_remove(self: Self, row_index: int) -> list[str]:
+        row = [column.pop(row_index) for column in self._columns]
+        self._row_count -= 1
+        return row
+
+    def row_remove_multi(self: Self, start_row_index: int, end_row_index: int) -> list[list[str]]:
+        removed_items = [list(row) for row in self._rows[start_row_index:end_row_index]]
+        for column in self._columns:
+            del column[start_row_index:end_row_index]
+        self._row_count -= len(removed_items)
+        return removed_items
+
+    def row_values(self: Self) -> Iterable[Sequence[str]]:
+        if len(self._columns) == 0:
+            return itertools.repeat((), self._row_count)
+        return zip(*self._columns)
+
+    def rows_transform(self: Self, transform: Callable[[Iterable[list[str]]], Iterable[list[str]]]) -> None:
+        self._rows = list(transform(map(list, self.row_values())))  # 変換は行の長さを変更する場合があるため、リストで渡す
+
+    def table_column_add(self: Self, column_index: int, *, column_count: int = 1) -> None:
+        new_columns = [self._column_create([""] * self._row_count) for _ in range(column_count)]
+        if column_index < 0:
+            self._columns.extend(new_columns)
+        else:
+            self._columns[column_index:column_index] = new_columns
+
+    def table_column_del(self: Self, column_index: int) -> None:
+        del self._columns[column_index]
+
+    def table_column_add_multi(self: Self, column_index_list: list[int], *, column_count: int = 1) -> None:
+        plan = column_add_plan(column_index_list, column_count=column_count)
+        for position, count in reversed(plan):  # 後ろから追加すると位置がずれない
+            self._columns[position:position] = [self._column_create([""] * self._row_count) for _ in range(count)]
+
+    def table_column_del_multi(self: Self, column_index_list: list[int]) -> None:
+        if self._row_count == 0:
+            return
+        self._columns = values_column_del(self._columns, column_del_plan(column_index_list, len(self._columns)))
+
+    def table_permute_rows(self: Self, row_index_list: list[int]) -> None:
+        self._columns = [self._column_take(column, row_index_list) for column in self._columns]
+        self._row_count = len(row_index_list)
+
+    def table_permute_columns(self: Self, column_index_list: list[int]) -> None:
+        if self._row_count == 0:
+            return
+        used: set[int] = set()
+        columns = []
+        for i in column_index_list:
+            column = self._columns[i]
+            columns.append(column if id(column) not in used else column.copy())  # 同じ列を複数回指定した場合は複製する
+            used.add(id(column))
+        self._columns = columns
+
+    def table_select_column_list(self: Self, column_index_list: list[int]) -> Self:
+        tbl = type(self)()
+        tbl._columns = [self._columns[i].copy() for i in column_index_list]
+        tbl._row_count = self._row_count
+        return tbl
+
+    def table_select_column_range(self: Self, start_index: int, end_index: int) -> Self:
+        tbl = type(self)()
+        tbl._columns = [column.copy() for column in self._columns[start_index:end_index]]
+        tbl._row_count = self._row_count
+        return tbl
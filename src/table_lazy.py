@@ -0,0 +1,272 @@
+import functools
+from typing import Any, Callable, Iterable, Iterator, Sequence, Type
+
+from src.common import gc_paused
+from src.table import Self, T, Table, column_permute_getter
+from src.table_column import ColumnCountError
+
+RowsStage = Callable[[Iterable[list[str]]], Iterable[list[str]]]  # 行のイテレータを変換する関数
+
+LayoutOperation = tuple[str, tuple[Any, ...], dict[str, Any]]  # (Tableのメソッド名,位置引数,キーワード引数)
+
+
+def layout_column_index_list(operations: list[LayoutOperation], column_count: int) -> list[int]:
+    """!
+    @brief カラムの操作を順に適用した後の、各カラムの元のカラムのインデックスを求める
+    @details 元のカラムのインデックスを値とする1行の表に操作を適用する。そのため、操作の結果は行の表と同じになる
+    @param operations カラムの操作のリスト
+    @param column_count 元の行のカラム数
+    @return 操作後のカラムの順に並べた、元のカラムのインデックスのリスト。追加したカラムはcolumn_countになる
+    @exception IndexError インデックスが範囲外の場合
+    """
+    tbl = Table.create_rows([list(range(column_count))])  # type: ignore[list-item]
+    for name, args, kwargs in operations:
+        result = getattr(tbl, name)(*args, **kwargs)
+        if isinstance(result, Table):  # 抽出は新しい表を返す
+            tbl = result
+    return [column_count if value == "" else value for value in tbl._rows[0]]  # type: ignore[misc]
+
+
+def _row_permute_padded(getter: Callable[[Sequence[str]], list[str]], row: Sequence[str]) -> list[str]:
+    """!
+    @brief 行の末尾に空文字列を追加してからカラムを取り出す
+    @param getter カラムを取り出す関数
+    @param row 行
+    @return 取り出したカラムのリスト
+    """
+    return getter((*row, ""))
+
+
+class LayoutStage:
+    """!
+    @brief 連続するカラムの操作をまとめた変換
+    @details 行のカラム数ごとに、操作後のカラムの並びを1回だけ求める。各行は1回のitemgetterの呼び出しで作り直す。
+    """
+
+    __slots__ = ("operations", "_getters")
+
+    def __init__(self):
+        """!
+        @brief コンストラクタ
+        """
+        self.operations: list[LayoutOperation] = []
+        self._getters: dict[int, Callable[[Sequence[str]], list[str]]] = {}  # 行のカラム数ごとの関数
+
+    def column_count(self, column_count: int) -> int:
+        """!
+        @brief 操作後のカラム数を取得する
+        @param column_count 元の行のカラム数
+        @return 操作後のカラム数
+        """
+        return len(layout_column_index_list(self.operations, column_count))
+
+    def _getter(self, column_count: int) -> Callable[[Sequence[str]], list[str]]:
+        """!
+        @brief 行を作り直す関数を取得する
+        @param column_count 元の行のカラム数
+        @return 行を受け取り、操作後の行を返す関数
+        """
+        getter = self._getters.get(column_count)
+        if getter is not None:
+            return getter
+        column_index_list = layout_column_index_list(self.operations, column_count)
+        getter = column_permute_getter(column_index_list)
+        if column_count in column_index_list:  # 追加したカラムは末尾に追加した空文字列を参照する
+            getter = functools.partial(_row_permute_padded, getter)
+        self._getters[column_count] = getter
+        return getter
+
+    def __call__(self, rows: Iterable[Sequence[str]]) -> Iterator[list[str]]:
+        if isinstance(rows, Sequence) and len(rows) > 0:
+            column_count_set = set(map(len, rows))
+            if len(column_count_set) == 1:  # すべての行のカラム数が同じ場合は、関数を直接適用する
+                return map(self._getter(column_count_set.pop()), rows)
+        return map(lambda row: self._getter(len(row))(row), rows)
+
+
+class LazyTable(Table):
+    """!
+    @brief カラムの操作と行の変換を記録し、まとめて実行する表
+    @details table_column_add(),table_column_del(),column_move()などのカラムの操作と、rows_transform()で指定した
+    行の変換(table_utlのrows_column_*()など)は、すぐには実行せずに記録する。記録した操作は、行の参照,出力や
+    materialize()の時点で、元の表の行を1回だけ走査して実行する。連続するカラムの操作は1回の行の作り直しにまとめる。
+    それ以外の操作は、記録した操作を実行してから元の表で行う。
+    create_table()で指定した表と、抽出した表と共有する表は変更しない。行を変更する操作の前に複製する。
+    @note 記録した操作のエラー(インデックスが範囲外など)は、実行した時点で発生する
+    """
+
+    __slots__ = ("_source", "_stages", "_owned")
+
+    def __init__(self: Self):
+        """!
+        @brief コンストラクタ
+        """
+        self._source: Table = Table()
+        self._stages: list[RowsStage] = []
+        self._owned = True  # 元の表を変更してよいか。Falseの場合は変更する前に複製する
+        super().__init__()
+
+    @classmethod
+    def create_table(cls: Type[Self], table: Table) -> Self:
+        """!
+        @brief 表を元にして作成する
+        @param table 元の表。記録した操作を実行するまでは変更しない
+        @return 表のデータ
+        """
+        tbl = cls()
+        tbl._source = table
+        tbl._owned = False
+        tbl._header_rows = table._header_rows
+        return tbl
+
+    @property  # type: ignore[override]
+    def _rows(self) -> Any:
+        """!
+        @brief 行のリスト。記録した操作を実行する
+        @details 行は変更される場合があるため、元の表を変更してはいけない場合は複製する
+        """
+        self._detach()
+        return self._source._rows
+
+    @_rows.setter
+    def _rows(self, rows: Iterable[list[str]]) -> None:
+        self._source = Table.create_rows(rows)  # type: ignore[arg-type]
+        self._stages = []
+        self._owned = True
+
+    def materialized(self) -> bool:
+        """!
+        @brief 記録した操作がないか
+        """
+        return len(self._stages) == 0
+
+    def materialize(self) -> None:
+        """!
+        @brief 記録した操作を実行する
+        @details 元の表の行を1回だけ走査し、結果の行で元の表と同じ種類の表を作り直す
+        """
+        if len(self._stages) == 0:
+            return
+        self._rebuild()
+
+    def _detach(self) -> None:
+        """!
+        @brief 記録した操作を実行し、元の表を変更してはいけない場合は複製する
+        @details 元の表で行を変更する操作の前に呼び出す
+        """
+        if len(self._stages) > 0 or not self._owned:
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        """!
+        @brief 記録した操作を実行した行で、元の表と同じ種類の新しい表を作成する
+        """
+        rows: Iterable[Any] = self._source.row_values()
+        if len(self._stages) == 0 or not isinstance(self._stages[0], LayoutStage):  # 元の表の行を複製する
+            rows = map(list, rows)
+        with gc_paused():  # 多数の行を作成するため、実行中はGCを止める
+            for stage in self._stages:
+                rows = stage(rows)
+            rows = list(rows)
+            source = type(self._source)()
+            try:
+                source._rows = rows
+            except ColumnCountError:
+                source = Table.create_rows(rows)
+        self._source = source
+        self._stages = []
+        self._owned = True
+
+    def _layout_record(self: Self, name: str, *args: Any, **kwargs: Any) -> None:
+        """!
+        @brief カラムの操作を記録する
+        @param name Tableのメソッド名
+        @param args 位置引数
+        @param kwargs キーワード引数
+        """
+        if len(self._stages) == 0 or not isinstance(self._stages[-1], LayoutStage):
+            self._stages.append(LayoutStage())
+        self._stages[-1].operations.append((name, args, kwargs))  # type: ignore[union-attr]
+
+    def _layout_only(self: Self) -> bool:
+        """!
+        @brief 記録した操作がカラムの操作だけか(行数が変わらないか)
+        """
+        return all(isinstance(stage, LayoutStage) for stage in self._stages)
+
+    def rows_transform(self: Self, transform: RowsStage) -> None:
+        self._stages.append(transform)
+
+    def column_count(self: Self) -> int:
+        if not self._layout_only() or self._source.row_count() == 0:
+            return super().column_count()
+        column_count = self._source.column_count()
+        for stage in self._stages:
+            column_count = stage.column_count(column_count)  # type: ignore[attr-defined]
+        return column_count
+
+    def column_insert_empty(self: Self, column_index: int) -> None:
+        self._layout_record("column_insert_empty", column_index)
+
+    def column_map(self: Self, column_index: int, func: Callable[[str], T]) -> list[T]:
+        self.materialize()
+        return self._source.column_map(column_index, func)
+
+    def column_move(self: Self, from_index: int, to_index: int) -> None:
+        self._layout_record("column_move", from_index, to_index)
+
+    def row_add_multi(self: Self, rows: list[list[str]]) -> None:
+        self._detach()
+        self._source.row_add_multi(rows)
+
+    def row_count(self: Self) -> int:
+        if self._layout_only():
+            return self._source.row_count()
+        return super().row_count()
+
+    def row_values(self: Self) -> Iterable[Sequence[str]]:
+        self.materialize()
+        return self._source.row_values()
+
+    def table_column_add(self: Self, column_index: int, *, column_count: int = 1) -> None:
+        self._layout_record("table_column_add", column_index, column_count=column_count)
+
+    def table_column_del(self: Self, column_index: int) -> None:
+        self._layout_record("table_column_del", column_index)
+
+    def table_column_add_multi(self: Self, column_index_list: list[int], *, column_count: int = 1) -> None:
+        self._layout_record("table_column_add_multi", list(column_index_list), column_count=column_count)
+
+    def table_column_del_multi(self: Self, column_index_list: list[int]) -> None:
+        self._layout_record("table_column_del_multi", list(column_index_list))
+
+    def table_permute_rows(self: Self, row_index_list: list[int]) -> None:
+        self._detach()
+        self._source.table_permute_rows(row_index_list)
+
+    def table_permute_columns(self: Self, column_index_list: list[int]) -> None:
+        self._layout_record("table_permute_columns", list(column_index_list))
+
+    def _select_record(self: Self, name: str, *args: Any) -> Self:
+        """!
+        @brief 元の表と記録した操作を共有し、抽出を記録した表を作成する
+        @param name Tableのメソッド名
+        @param args 位置引数
+        @return 抽出した表
+        """
+        tbl = type(self)()
+        tbl._source = self._source
+        tbl._owned = self._owned = False  # 元の表を共有するため、どちらも変更する前に複製する
+        tbl._stages = list(self._stages)
+        if len(tbl._stages) > 0 and isinstance(tbl._stages[-1], LayoutStage):  # 最後のカラムの操作は複製して追加する
+            stage = LayoutStage()
+            stage.operations = list(tbl._stages[-1].operations)
+            tbl._stages[-1] = stage
+        tbl._layout_record(name, *args)
+        return tbl
+
+    def table_select_column_list(self: Self, column_index_list: list[int]) -> Self:
+        return self._select_record("table_select_column_list", list(column_index_list))
+
+    def table_select_column_range(self: Self, start_index: int, end_index: int) -> Self:
+        return self._select_record("table_select_column_range", start_index, end_index)
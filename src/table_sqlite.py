@@ -0,0 +1,511 @@
+import itertools
+import math
+import sqlite3
+from array import array
+from collections.abc import MutableSequence
+from typing import Any, Callable, Iterable, Iterator, Sequence
+
+from src.table import Self, T, Table, column_add_plan, column_del_plan, values_column_add, values_column_del
+from src.table_column import ColumnCountError
+
+SQLITE_CACHE_SIZE_KB = 65536  # SQLiteのページキャッシュの上限(KB)。これを超える行はファイルに置く
+SQLITE_FETCH_SIZE = 1000  # 行番号順でない行を読み出す場合に、1回の問い合わせで読み出す行数
+SQLITE_COLUMN_MAX = 1000  # 表のカラム数の上限。SQLiteの表のカラム数の上限(2000)に対し、カラムの追加の余裕を残す
+
+
+def _sqlite_int(value: str) -> int:
+    """!
+    @brief ソートのキーにする整数に変換する(SQLiteの関数)
+    @param value 値
+    @return 整数
+    @exception ValueError 整数に変換できない場合
+    """
+    return int(value)
+
+
+def _sqlite_float(value: str) -> float:
+    """!
+    @brief ソートのキーにする浮動小数点数に変換する(SQLiteの関数)
+    @param value 値
+    @return 浮動小数点数
+    @exception ValueError 浮動小数点数に変換できない場合。SQLiteはNaNをNULLとして扱うため、NaNの場合も例外にする
+    """
+    result = float(value)
+    if math.isnan(result):
+        raise ValueError("NaNはSQLiteでソートできません。")
+    return result
+
+
+class SqliteRow(MutableSequence):
+    """!
+    @brief SQLiteの表の1行のビュー
+    @details 作成した時点の行の値を保持し、値の変更はデータベースにも反映する。行の長さ(カラム数)は変更できない。
+    """
+
+    __slots__ = ("_table", "_rowid", "_values")
+
+    def __init__(self, table: "SqliteTable", rowid: int, values: Sequence[str]):
+        """!
+        @brief コンストラクタ
+        @param table SQLiteの表
+        @param rowid 行のrowid
+        @param values 行の値
+        """
+        self._table = table
+        self._rowid = rowid
+        self._values = list(values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getitem__(self, index: Any) -> Any:
+        return self._values[index]
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        if isinstance(index, slice):
+            values = self._values.copy()
+            values[index] = value
+            if len(values) != len(self._values):
+                raise TypeError("SQLiteの表の行の長さは変更できません。")
+            self._table._row_update(self._rowid, values)
+            self._values = values
+            return
+        self._values[index] = value
+        self._table._cell_update(self._rowid, index, value)
+
+    def __delitem__(self, index: Any) -> None:
+        raise TypeError("SQLiteの表の行の長さは変更できません。")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, SqliteRow)):
+            return self._values == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self._values)
+
+    def insert(self, index: int, value: str) -> None:
+        raise TypeError("SQLiteの表の行の長さは変更できません。")
+
+    def copy(self) -> list[str]:
+        return self._values.copy()
+
+
+class SqliteRows(MutableSequence):
+    """!
+    @brief SQLiteの表の行のリストのビュー
+    @details 要素はSqliteRow。行の挿入,削除は表に反映される。
+    """
+
+    __slots__ = ("_table",)
+
+    def __init__(self, table: "SqliteTable"):
+        """!
+        @brief コンストラクタ
+        @param table SQLiteの表
+        """
+        self._table = table
+
+    def __len__(self) -> int:
+        return len(self._table._order)
+
+    def __getitem__(self, index: Any) -> Any:
+        table = self._table
+        if isinstance(index, slice):
+            rowids = table._order[index]
+            return [SqliteRow(table, rowid, values) for rowid, values in zip(rowids, table._rows_fetch(rowids))]
+        return SqliteRow(table, table._order[index], next(table._rows_fetch([table._order[index]])))
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        if isinstance(index, slice):
+            rows = [list(row) for row in self._table.row_values()]
+            rows[index] = value
+            self._table._rows = rows
+            return
+        self._table._row_update(self._table._order[index], list(value))
+
+    def __delitem__(self, index: Any) -> None:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise TypeError("SQLiteの表では連続しない行を削除できません。")
+            self._table.row_remove_multi(start, stop)
+            return
+        self._table.row_remove(index)
+
+    def __iter__(self) -> Iterator[SqliteRow]:
+        table = self._table
+        return (SqliteRow(table, rowid, values) for rowid, values in zip(table._order, table.row_values()))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, SqliteRows)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def insert(self, index: int, value: Sequence[str]) -> None:
+        self._table.row_insert(index, list(value))
+
+
+class SqliteTable(Table):
+    """!
+    @brief 一時ファイルのSQLiteデータベースに行を保持する表
+    @details 行はデータベースの表(t)の1レコードで、カラムは物理カラム(c0,c1,...)に格納する。メモリには行の順序(rowidの配列)と
+    カラムの順序(物理カラムの番号のリスト)だけを保持するため、メモリに収まらない大きさの表を扱える。
+    カラムの追加,削除,移動は物理カラムの番号のリストの操作で、行の並べ替えはrowidの配列の操作で行う。
+    削除したカラムの物理カラムは、次にカラムを追加する際に空文字列にして再利用する(SQLiteの表のカラム数の上限を超えないように)。
+    ソートはtable_sort_sql()でSQLiteのORDER BYで行う。1回のソートでは索引を作成しても速くならないため、索引は作成しない。
+    すべての行のカラム数が同じであること。
+    @note データベースは表を破棄した時点で削除される
+    """
+
+    __slots__ = ("_connection", "_columns", "_columns_free", "_column_next", "_order", "_order_rowid")
+
+    def __init__(self: Self):
+        """!
+        @brief コンストラクタ
+        """
+        self._database_open()
+        super().__init__()
+
+    def _database_open(self: Self) -> None:
+        """!
+        @brief 新しい一時ファイルのデータベースで空の表を作成する
+        @details 元のデータベースは参照がなくなった時点(読み出し中のカーソルがあればその終了後)に削除される
+        """
+        self._connection = sqlite3.connect("", check_same_thread=False)  # 空のファイル名は一時ファイルのデータベース
+        self._connection.execute("PRAGMA journal_mode=OFF")
+        self._connection.execute("PRAGMA synchronous=OFF")
+        self._connection.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        self._connection.create_function("csv_int", 1, _sqlite_int, deterministic=True)
+        self._connection.create_function("csv_float", 1, _sqlite_float, deterministic=True)
+        self._connection.execute("CREATE TABLE t (_)")  # 物理カラムは後から追加する
+        self._columns: list[int] = []  # カラムの順に並べた物理カラムの番号
+        self._columns_free: list[int] = []  # 削除したカラムの、再利用できる物理カラムの番号
+        self._column_next = 0  # 次に追加する物理カラムの番号
+        self._order = array("q")  # 行の順に並べたrowid
+        self._order_rowid = True  # 行の順序がrowidの昇順か
+
+    def _column_physical_add(self: Self) -> int:
+        """!
+        @brief 空文字列の物理カラムを追加する
+        @details 削除したカラムの物理カラムがある場合は、空文字列にして再利用する
+        @return 物理カラムの番号
+        """
+        if len(self._columns_free) > 0:
+            physical = self._columns_free.pop()
+            if len(self._order) > 0:
+                self._connection.execute(f"UPDATE t SET c{physical}=''")
+            return physical
+        physical = self._column_next
+        self._connection.execute(f"ALTER TABLE t ADD COLUMN c{physical} DEFAULT ''")
+        self._column_next += 1
+        return physical
+
+    def _columns_set(self: Self, columns: list[int]) -> None:
+        """!
+        @brief カラムの順に並べた物理カラムの番号を変更する
+        @details 使用しなくなった物理カラムは再利用できるようにする
+        @param columns カラムの順に並べた物理カラムの番号
+        """
+        used = set(columns)
+        self._columns_free.extend(physical for physical in self._columns if physical not in used)
+        self._columns = columns
+
+    def _column_names(self: Self) -> str:
+        """!
+        @brief カラムの順に並べた物理カラム名
+        @return SELECTのカラムのリスト
+        """
+        return ",".join(f"c{physical}" for physical in self._columns) if len(self._columns) > 0 else "''"
+
+    def _rows_fetch(self: Self, rowids: Iterable[int]) -> Iterator[Sequence[str]]:
+        """!
+        @brief rowidの順に行の値を読み出す
+        @param rowids rowidのイテレータ
+        @return 行の値のイテレータ
+        """
+        column_names = self._column_names()
+        column_count = len(self._columns)
+        rowid_iter = iter(rowids)
+        while True:
+            batch = list(itertools.islice(rowid_iter, SQLITE_FETCH_SIZE))
+            if len(batch) == 0:
+                break
+            placeholders = ",".join("?" * len(batch))
+            cursor = self._connection.execute(
+                f"SELECT rowid,{column_names} FROM t WHERE rowid IN ({placeholders})", batch
+            )
+            rows = {row[0]: row[1 : column_count + 1] for row in cursor}
+            yield from map(rows.__getitem__, batch)
+
+    def _row_update(self: Self, rowid: int, values: Sequence[str]) -> None:
+        """!
+        @brief 行のすべての値を変更する
+        @param rowid 行のrowid
+        @param values 行の値
+        @exception ColumnCountError カラム数が一致しない場合
+        """
+        if len(values) != len(self._columns):
+            raise ColumnCountError(f"カラム数が一致しません。column_count={len(self._columns)},row={len(values)}")
+        if len(values) == 0:
+            return
+        assignments = ",".join(f"c{physical}=?" for physical in self._columns)
+        self._connection.execute(f"UPDATE t SET {assignments} WHERE rowid=?", (*values, rowid))
+
+    def _cell_update(self: Self, rowid: int, column_index: int, value: str) -> None:
+        """!
+        @brief 1つの値を変更する
+        @param rowid 行のrowid
+        @param column_index カラムのインデックス
+        @param value 値
+        """
+        self._connection.execute(f"UPDATE t SET c{self._columns[column_index]}=? WHERE rowid=?", (value, rowid))
+
+    def _rows_insert(self: Self, rows: Sequence[Sequence[str]]) -> array:
+        """!
+        @brief 行をデータベースに追加する
+        @param rows 行のリスト。カラム数が表と同じであること
+        @return 追加した行のrowidの配列
+        """
+        (rowid_max,) = self._connection.execute("SELECT coalesce(max(rowid),0) FROM t").fetchone()
+        if len(self._columns) == 0:
+            self._connection.executemany("INSERT INTO t (_) VALUES (NULL)", itertools.repeat((), len(rows)))
+        else:
+            column_names = ",".join(f"c{physical}" for physical in self._columns)
+            placeholders = ",".join("?" * len(self._columns))
+            self._connection.executemany(f"INSERT INTO t ({column_names}) VALUES ({placeholders})", rows)
+        return array("q", range(rowid_max + 1, rowid_max + 1 + len(rows)))  # rowidは最大値の次から順に割り当てられる
+
+    def _row_check(self: Self, rows: Sequence[Sequence[str]]) -> None:
+        """!
+        @brief 追加する行のカラム数を確認する
+        @param rows 行のリスト
+        @exception ColumnCountError カラム数が一致しない場合
+        """
+        column_count = len(self._columns) if len(self._order) > 0 else len(rows[0])
+        if any(len(row) != column_count for row in rows):
+            raise ColumnCountError(f"カラム数が一致しません。column_count={column_count}")
+        if column_count > SQLITE_COLUMN_MAX:
+            raise ColumnCountError(f"SQLiteの表にできないカラム数です。column_count={column_count}")
+        if len(self._order) == 0:  # 最初の行のカラム数にする
+            self._order_rowid = True
+            self._columns_set([])
+            self._columns = [self._column_physical_add() for _ in range(column_count)]
+
+    @property  # type: ignore[override]
+    def _rows(self) -> SqliteRows:
+        """!
+        @brief 行のリストのビュー
+        """
+        return SqliteRows(self)
+
+    @_rows.setter
+    def _rows(self, rows: Iterable[Sequence[str]]) -> None:
+        """!
+        @brief 行のリストで表を作り直す
+        @exception ColumnCountError カラム数が異なる行を含む場合
+        """
+        if self._column_next > 0 or len(self._order) > 0:
+            self._database_open()
+        rows_iter = iter(rows)
+        while True:
+            batch = list(itertools.islice(rows_iter, SQLITE_FETCH_SIZE))
+            if len(batch) == 0:
+                break
+            self.row_add_multi(batch)
+
+    def table_sort_sql(
+        self: Self, column_index_list: list[int], column_attr: list[str], *, reverse: bool = False
+    ) -> bool:
+        """!
+        @brief SQLiteのORDER BYで行をソートする
+        @details table_sort()と同じ順序(安定ソート)になる。値はSQLiteの関数でPythonのint(),float()で変換する
+        @param column_index_list ソートするカラムのインデックスのリスト。先頭のカラムを優先する
+        @param column_attr カラムの属性のリスト。str, int, float
+        @param reverse 降順にする場合はTrue
+        @retval True ソートした
+        @retval False ソートできない(行の順序がrowid順でない,属性が不明,変換できない値を含むなど)。表は変更しない
+        """
+        if not self._order_rowid or len(column_attr) < len(column_index_list):
+            return False
+        key_formats = {"str": "{}", "int": "csv_int({})", "float": "csv_float({})"}
+        keys = []
+        for column_index, attr in zip(column_index_list, column_attr):
+            if attr not in key_formats or not -len(self._columns) <= column_index < len(self._columns):
+                return False
+            key = key_formats[attr].format(f"c{self._columns[column_index]}")
+            keys.append(f"{key} DESC" if reverse else key)
+        if len(keys) == 0:
+            return False
+        try:
+            cursor = self._connection.execute(f"SELECT rowid FROM t ORDER BY {','.join(keys)},rowid")
+            order = array("q", itertools.chain.from_iterable(cursor))
+        except (sqlite3.Error, OverflowError):  # 例外はPythonでソートした場合に発生させる
+            return False
+        self._order = order
+        self._order_rowid = False
+        return True
+
+    def column_add(self: Self, column: list[str]) -> None:
+        self.column_insert(len(self._columns), column)
+
+    def column_map(self: Self, column_index: int, func: Callable[[str], T]) -> list[T]:
+        if len(self._order) == 0:  # 行がない場合は列もない
+            return []
+        name = f"c{self._columns[column_index]}"
+        if self._order_rowid:
+            cursor = self._connection.execute(f"SELECT {name} FROM t ORDER BY rowid")
+            return list(map(func, itertools.chain.from_iterable(cursor)))
+        values = dict(self._connection.execute(f"SELECT rowid,{name} FROM t").fetchall())
+        return [func(values[rowid]) for rowid in self._order]
+
+    def column_count(self: Self) -> int:
+        if len(self._order) == 0:
+            return 0
+        return len(self._columns)
+
+    def column_insert(self: Self, column_index: int, column: list[str]) -> None:
+        if len(column) < len(self._order):
+            raise IndexError("list index out of range")
+        physical = self._column_physical_add()
+        self._connection.executemany(f"UPDATE t SET c{physical}=? WHERE rowid=?", zip(column, self._order))
+        self._columns.insert(column_index, physical)
+
+    def column_insert_empty(self: Self, column_index: int) -> None:
+        self._columns.insert(column_index, self._column_physical_add())
+
+    def column_move(self: Self, from_index: int, to_index: int) -> None:
+        self._columns.insert(to_index, self._columns.pop(from_index))
+
+    def column_remove(self: Self, column_index: int) -> list[str]:
+        values = self.column_map(column_index, str)
+        self._columns_free.append(self._columns.pop(column_index))
+        return values
+
+    def row_add(self: Self, row: list[str]) -> None:
+        self.row_add_multi([row])
+
+    def row_add_multi(self: Self, rows: list[list[str]]) -> None:
+        if len(rows) == 0:
+            return
+        self._row_check(rows)
+        self._order.extend(self._rows_insert(rows))
+
+    def row_count(self: Self) -> int:
+        return len(self._order)
+
+    def row_duplicate(self: Self, row_index: int) -> SqliteRow:  # type: ignore[override]
+        values = self._rows[row_index].copy()
+        self.row_insert(row_index + 1, values)
+        return SqliteRow(self, self._order[row_index + 1], values)
+
+    def row_insert(self: Self, row_index: int, row: list[str]) -> None:
+        self._row_check([row])
+        (rowid,) = self._rows_insert([row])
+        if row_index < len(self._order):
+            self._order_rowid = False
+        self._order.insert(row_index, rowid)
+
+    def row_insert_empty(self: Self, row_index: int) -> None:
+        self.row_insert(row_index, [""] * len(self._columns))
+
+    def row_move(self: Self, from_index: int, to_index: int) -> None:
+        self._order.insert(to_index, self._order.pop(from_index))
+        self._order_rowid = False
+
+    def row_remove(self: Self, row_index: int) -> list[str]:
+        row = self._rows[row_index].copy()
+        self._connection.execute("DELETE FROM t WHERE rowid=?", (self._order.pop(row_index),))
+        return row
+
+    def row_remove_multi(self: Self, start_row_index: int, end_row_index: int) -> list[list[str]]:
+        rowids = self._order[start_row_index:end_row_index]
+        removed_items = [list(values) for values in self._rows_fetch(rowids)]
+        self._connection.executemany("DELETE FROM t WHERE rowid=?", ((rowid,) for rowid in rowids))
+        del self._order[start_row_index:end_row_index]
+        return removed_items
+
+    def row_values(self: Self) -> Iterable[Sequence[str]]:
+        if len(self._columns) == 0:
+            return itertools.repeat((), len(self._order))
+        if not self._order_rowid:
+            return self._rows_fetch(self._order)
+        return self._connection.execute(f"SELECT {self._column_names()} FROM t ORDER BY rowid")
+
+    def rows_transform(self: Self, transform: Callable[[Iterable[list[str]]], Iterable[list[str]]]) -> None:
+        """!
+        @brief 行のイテレータを変換する関数で、すべての行を変換する
+        @details 変換した行は新しいデータベースに追加するため、すべての行をメモリに読み込まない
+        @param transform 行のイテレータを変換する関数
+        @exception ColumnCountError 変換した行のカラム数が異なる場合
+        """
+        table = SqliteTable()
+        rows_iter = iter(transform(map(list, self.row_values())))
+        while True:
+            batch = list(itertools.islice(rows_iter, SQLITE_FETCH_SIZE))
+            if len(batch) == 0:
+                break
+            table.row_add_multi(batch)
+        self._connection = table._connection
+        self._columns = table._columns
+        self._columns_free = table._columns_free
+        self._column_next = table._column_next
+        self._order = table._order
+        self._order_rowid = table._order_rowid
+
+    def table_column_add(self: Self, column_index: int, *, column_count: int = 1) -> None:
+        new_columns = [self._column_physical_add() for _ in range(column_count)]
+        if column_index < 0:
+            self._columns.extend(new_columns)
+        else:
+            self._columns[column_index:column_index] = new_columns
+
+    def table_column_del(self: Self, column_index: int) -> None:
+        if len(self._order) == 0:
+            return
+        self._columns_free.append(self._columns.pop(column_index))
+
+    def table_column_add_multi(self: Self, column_index_list: list[int], *, column_count: int = 1) -> None:
+        columns = values_column_add(self._columns, column_add_plan(column_index_list, column_count=column_count))
+        self._columns = [self._column_physical_add() if physical == "" else physical for physical in columns]
+
+    def table_column_del_multi(self: Self, column_index_list: list[int]) -> None:
+        if len(self._order) == 0:
+            return
+        self._columns_set(values_column_del(self._columns, column_del_plan(column_index_list, len(self._columns))))
+
+    def table_permute_rows(self: Self, row_index_list: list[int]) -> None:
+        order = array("q", map(self._order.__getitem__, row_index_list))
+        # 同じ行を複数回指定した場合は、2回目以降を新しいrowidに複製する(行ごとに削除,変更できるように)
+        used: set[int] = set()
+        duplicated: list[int] = []  # 複製する行のインデックス
+        for row_index, rowid in enumerate(order):
+            if rowid in used:
+                duplicated.append(row_index)
+            else:
+                used.add(rowid)
+        if len(duplicated) > 0:
+            rows = list(self._rows_fetch(order[row_index] for row_index in duplicated))
+            for row_index, rowid in zip(duplicated, self._rows_insert(rows)):
+                order[row_index] = rowid
+        # 指定しなかった行は削除する
+        removed = [(rowid,) for rowid in self._order if rowid not in used]
+        self._connection.executemany("DELETE FROM t WHERE rowid=?", removed)
+        self._order = order
+        self._order_rowid = False
+
+    def table_permute_columns(self: Self, column_index_list: list[int]) -> None:
+        if len(self._order) == 0:
+            return
+        columns = []
+        for i in column_index_list:
+            physical = self._columns[i]
+            if physical in columns:  # 同じカラムを複数回指定した場合は複製する
+                copied = self._column_physical_add()
+                self._connection.execute(f"UPDATE t SET c{copied}=c{physical}")
+                physical = copied
+            columns.append(physical)
+        self._columns_set(columns)
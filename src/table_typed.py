@@ -0,0 +1,127 @@
+import importlib
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from src.table import Table
+
+TYPED_ROWS_MIN = 1000  # この行数未満の表は型付きの列を使用しない(numpyの読み込みと変換の方が遅いため)
+
+_numpy_module: Any = None  # 読み込んだnumpyモジュール。Falseの場合はインストールされていない
+
+
+def typed_numpy() -> Any:
+    """!
+    @brief numpyモジュールを取得する
+    @details numpyはオプションの依存パッケージ。起動時間に影響しないように、最初に使用する時に読み込む
+    @return numpyモジュール。インストールされていない場合はNone
+    """
+    global _numpy_module
+    if _numpy_module is None:
+        try:
+            _numpy_module = importlib.import_module("numpy")
+        except ImportError:
+            _numpy_module = False
+    return _numpy_module or None
+
+
+@dataclass
+class TypedColumn:
+    """!
+    @brief 型付きの列
+    @details 列の値をnumpyの配列に1回だけ変換して保持する。数値の比較,集計はこの配列に対して行う
+    """
+
+    values: Any  # 値の配列。int:int64,float:float64,str:値の順位(int64)
+    mask: Any  # 空のセルの行をTrueにしたboolの配列
+
+
+def _typed_convert(convert_func: Any) -> Any:
+    """!
+    @brief 空のセルをNoneにする変換関数を作成する
+    @param convert_func 値の変換関数
+    @return 変換関数
+    """
+    return lambda value: convert_func(value) if value != "" else None
+
+
+def typed_column_create(table: Table, column_index: int, column_attr: str) -> Optional[TypedColumn]:
+    """!
+    @brief 表のカラムから型付きの列を作成する
+    @param table 表
+    @param column_index カラムのインデックス
+    @param column_attr カラムの属性。str, int, float
+    @return 型付きの列。numpyがない場合,属性が不明な場合,int64に収まらない整数を含む場合はNone
+    @exception ValueError 値を数値に変換できない場合
+    """
+    np = typed_numpy()
+    if np is None:
+        return None
+    if column_attr == "str":  # 値の順位にする。辞書符号化した列は値の種類ごとに1回だけ参照する
+        ranks = {value: rank for rank, value in enumerate(sorted(set(table.column_map(column_index, str))))}
+        values = np.array(table.column_map(column_index, ranks.__getitem__), dtype=np.int64)
+        return TypedColumn(values, np.zeros(len(values), dtype=bool))
+    convert_funcs = {"int": (int, np.int64), "float": (float, np.float64)}
+    if column_attr not in convert_funcs:
+        return None
+    convert_func, dtype = convert_funcs[column_attr]
+    try:
+        converted = table.column_map(column_index, convert_func)
+        mask = np.zeros(len(converted), dtype=bool)
+    except ValueError:  # 空のセルを含む場合は、空のセルを除いて変換する
+        converted = table.column_map(column_index, _typed_convert(convert_func))
+        mask = np.fromiter((value is None for value in converted), dtype=bool, count=len(converted))
+        converted = [0 if value is None else value for value in converted]
+    try:
+        values = np.array(converted, dtype=dtype)
+    except OverflowError:
+        return None
+    return TypedColumn(values, mask)
+
+
+def typed_sort_index(columns: list[TypedColumn], *, reverse: bool = False) -> Optional[list[int]]:
+    """!
+    @brief 型付きの列で行を安定ソートした順序を求める
+    @details sorted()で各列の値のタプルをキーにした場合と同じ順序になる
+    @param columns ソートのキーの列のリスト。先頭の列を優先する
+    @param reverse 降順にする場合はTrue(同じキーの行は元の順序を保つ)
+    @return 並べ替え後の行の順に並べた、元の行のインデックスのリスト。空のセル,NaNを含む列がある場合はNone
+    """
+    np = typed_numpy()
+    keys = []
+    for column in columns:
+        if column.mask.any():
+            return None
+        values = column.values
+        if values.dtype.kind == "f" and np.isnan(values).any():  # NaNはsorted()と同じ順序にできない
+            return None
+        if reverse:  # 順位を反転する。同じ値は同じ順位のため、安定ソートの順序は変わらない
+            values = -np.unique(values, return_inverse=True)[1].reshape(-1)
+        keys.append(values)
+    if len(keys) == 0:
+        return None
+    return np.lexsort(keys[::-1]).tolist()  # lexsortは最後のキーを優先する
+
+
+def table_sort_index_typed(
+    table: Table, column_index_list: list[int], column_attr: list[str], *, reverse: bool = False
+) -> Optional[list[int]]:
+    """!
+    @brief 数値のカラムを含むソートの順序を型付きの列で求める
+    @param table 表
+    @param column_index_list ソートするカラムのインデックスのリスト。先頭のカラムを優先する
+    @param column_attr カラムの属性のリスト。str, int, float
+    @param reverse 降順にする場合はTrue
+    @return 並べ替え後の行の順に並べた、元の行のインデックスのリスト。型付きの列で求められない場合はNone
+    @exception ValueError 値を数値に変換できない場合
+    """
+    if table.row_count() < TYPED_ROWS_MIN or not any(attr in ("int", "float") for attr in column_attr):
+        return None
+    if len(column_attr) < len(column_index_list) or typed_numpy() is None:
+        return None
+    columns = []
+    for column_index, attr in zip(column_index_list, column_attr):
+        column = typed_column_create(table, column_index, attr)
+        if column is None:
+            return None
+        columns.append(column)
+    return typed_sort_index(columns, reverse=reverse)
@@ -1,14 +1,33 @@
+import functools
+import heapq
 import io
 import itertools
+import operator
+import pickle
 import re
 import sys
+import tempfile
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
-
-from src.common import textfile_read
-from src.csv import csv_file_reader, csv_reader
-from src.table import CsvFileTypeInfo, Table
+from typing import IO, Any, Callable, Iterable, Iterator, Optional, Sequence
+
+from src.common import gc_paused, textfile_read
+from src.csv import csv_file_reader, csv_option, csv_reader
+from src.table import (
+    CsvFileTypeInfo,
+    Table,
+    column_add_plan,
+    column_del_plan,
+    column_move_permutation,
+    column_permute_getter,
+    values_column_add,
+    values_column_del,
+)
+from src.table_sqlite import SqliteTable
+from src.table_typed import table_sort_index_typed
+
+MERGE_SPILL_PARTITIONS = 64  # 一時ファイルに書き出す際の分割数。メモリに保持するグループ数はおよそ1/分割数になる
+MERGE_SPILL_BATCH_SIZE = 256  # 一時ファイルに一度に書き込む行数
 
 
 @dataclass
@@ -96,44 +115,186 @@ def values_set_empty_index_group(values: list[str], index_group: list[list[int]]
 def column_exclusive_index_group(table: Table, column_group: list[list[int]]):
     """!
     @brief カラムグループに従い、排他されるようにレコードを追加する
-    @details 排他するカラムが同一レコードに存在する場合、そのレコードは複製して、排他するカラムを空にする
-    """
-    for row_index in itertools.count():  # 行を複製するため行が増えていく
-        if row_index >= table.row_count():
-            break
-        columns = table._rows[row_index]
-        index_group = values_non_empty_index_group(columns, column_group)
-        if len(index_group) >= 2:  # 2つ以上のカラムグループに値が入っている。よって分離する必要がある
-            duplicated_row = table.row_duplicate(row_index)
-            # 元の行は、1つ目のカラムグループ以外のカラムを空にする
-            empty_index_group = [column_group[i] for i in index_group[1:]]
-            values_set_empty_index_group(columns, empty_index_group)
-            # 複製した行は、1つ目のカラムグループを空にする
-            values_set_empty(duplicated_row, column_group[index_group[0]])
-    pass
+    @details 排他するカラムが同一レコードに存在する場合、そのレコードは複製して、排他するカラムを空にする。
+    rows_column_exclusive()で行を1回だけ走査して作り直す
+    """
+    table.rows_transform(lambda rows: rows_column_exclusive(rows, column_group))
 
 
-def check_column_if(v_left: str, operator: str, v_right: str, *, column_if: Optional[str] = None) -> bool:
+COLUMN_IF_OPERATORS: dict[str, Callable[[Any, Any], bool]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+    "<=": operator.le,
+    ">=": operator.ge,
+}  # --column-ifの比較演算子と比較関数
+
+
+@dataclass
+class ColumnIfTerm:
+    """!
+    @brief --column-ifの1つの比較
+    """
+
+    column_index: int  # 左辺値のカラムのインデックス
+    operator: str  # 比較演算子
+    value: str  # 右辺値
+    quoted: bool = False  # 右辺値をクォートで囲んでいるか。囲んでいる場合は文字列として比較する
+
+
+def column_if_number(value: str) -> Optional[float]:
+    """!
+    @brief --column-ifで比較する値を数値に変換する
+    @param value 値
+    @return 数値(整数はint)。数値ではない場合はNone
+    """
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def column_if_term(
+    term: ColumnIfTerm, *, column_if: Optional[str] = None, typed: bool = False
+) -> Callable[[list[str]], bool]:
+    """!
+    @brief 1つの比較の判定関数を作成する
+    @details <,>,<=,>=は、右辺値が数値の場合に左辺値を数値に変換して比較する。左辺値が数値ではない場合はFalseにする。
+    ==,!=は文字列として比較する。typedを指定した場合は<,>,<=,>=と同様に数値として比較し、
+    左辺値が数値ではない場合は!=のみTrueにする。
+    右辺値が数値ではない場合,クォートで囲んでいる場合は、常に文字列として比較する。
+    @param term 比較
+    @param column_if エラーメッセージに表示する--column-ifの指定
+    @param typed ==,!=でも右辺値が数値の場合に数値として比較する
+    @return 行を受け取り、比較の結果を返す関数
+    """
+    compare = COLUMN_IF_OPERATORS.get(term.operator)
+    if compare is None:
+        raise Exception(f"--column-ifの指定が正しくありません。未サポート演算子。--column-if {column_if}")
+    column_index, v_right = term.column_index, term.value
+    number = None
+    if not term.quoted and (typed or term.operator not in ("==", "!=")):
+        number = column_if_number(v_right)
+    if number is None:
+        return lambda row: compare(row[column_index], v_right)
+    not_number = term.operator == "!="  # 左辺値が数値ではない場合の結果
+
+    def term(row: list[str]) -> bool:
+        v_left = column_if_number(row[column_index])
+        if v_left is None:
+            return not_number
+        return compare(v_left, number)
+
+    return term
+
+
+def check_column_if(
+    v_left: str, operator: str, v_right: str, *, column_if: Optional[str] = None, typed: bool = False
+) -> bool:
     """!
     @brief fillの実行を判定する
     @param v_left 左辺値
     @param operator 比較演算子
     @param v_right 右辺値
+    @param typed ==,!=でも右辺値が数値の場合に数値として比較する
     @retval True 実行する
     @retval False 実行しない
     """
-    if operator == "!=":
-        if v_left != v_right:
-            return True
-    elif operator == "==":
-        if v_left == v_right:
-            return True
-    else:
-        raise Exception(f"--column-ifの指定が正しくありません。未サポート演算子。--column-if {column_if}")
-    return False
+    return column_if_term(ColumnIfTerm(0, operator, v_right), column_if=column_if, typed=typed)([v_left])
 
 
-#
+def column_if_parse(column_if: str) -> tuple[int, str, str]:
+    """!
+    @brief --column-ifの指定を解析する
+    @param column_if 判定条件。インデックス+比較演算子+値
+    @return (インデックス, 比較演算子, 右辺値)
+    """
+    match = re.match(r"(\d+)([!=><]=?)(.*)", column_if)
+    if match is None:
+        raise Exception(f"--column-ifの指定が正しくありません。--raw-if {column_if}")
+    column_if_index = int(match.group(1))  # 先頭の数字部分
+    column_if_operator = match.group(2)  # 比較演算子
+    column_if_rest = match.group(3)  # 残りの文字列
+    ## 右辺の正規化
+    match = re.search(r'(["\'])(.*?)\1', column_if_rest)
+    if match:
+        column_if_rest = match.group(2)  # クォート内の文字列を取得
+    return (column_if_index, column_if_operator, column_if_rest)
+
+
+def _column_if_is_term(text: str) -> bool:
+    """!
+    @brief 文字列が比較(インデックス+比較演算子)で始まるかを判定する
+    """
+    return re.match(r"\d+(==|!=|<=|>=|<|>)", text) is not None
+
+
+def _column_if_term_parse(term: str) -> ColumnIfTerm:
+    """!
+    @brief 1つの比較の文字列を解析する
+    """
+    return ColumnIfTerm(*column_if_parse(term), quoted=re.search(r'(["\'])(.*?)\1', term) is not None)
+
+
+def column_if_terms(column_if: str) -> list[list[ColumnIfTerm]]:
+    """!
+    @brief and,orで組み合わせた--column-ifの指定を解析する
+    @details andはorより優先する。クォート内のand,orと、両辺が比較ではないand,orは区切りにしない。
+    例: 2==rock and rollは、カラム2が"rock and roll"と等しいかの1つの比較になる
+    @param column_if 判定条件。比較をand,orで区切る。例: 1!='' and 2>=10 or 3=="x"
+    @return orで区切った、andで区切った比較のリストのリスト
+    """
+    terms: list[list[ColumnIfTerm]] = [[]]
+    start = 0
+    for match in re.finditer(r"(\"[^\"]*\"|'[^']*')|\s+(and|or)\s+", column_if):
+        if match.group(2) is None:  # クォート内の文字列
+            continue
+        if not _column_if_is_term(column_if[start : match.start()]) or not _column_if_is_term(column_if[match.end() :]):
+            continue  # 値の一部
+        terms[-1].append(_column_if_term_parse(column_if[start : match.start()]))
+        if match.group(2) == "or":
+            terms.append([])
+        start = match.end()
+    terms[-1].append(_column_if_term_parse(column_if[start:]))  # 最後の比較
+    return terms
+
+
+def _column_if_and(
+    func1: Callable[[list[str]], bool], func2: Callable[[list[str]], bool]
+) -> Callable[[list[str]], bool]:
+    """!
+    @brief 2つの判定関数のandの判定関数を作成する
+    """
+    return lambda row: func1(row) and func2(row)
+
+
+def _column_if_or(
+    func1: Callable[[list[str]], bool], func2: Callable[[list[str]], bool]
+) -> Callable[[list[str]], bool]:
+    """!
+    @brief 2つの判定関数のorの判定関数を作成する
+    """
+    return lambda row: func1(row) or func2(row)
+
+
+def column_if_compile(column_if: str, *, typed: bool = False) -> Callable[[list[str]], bool]:
+    """!
+    @brief --column-ifの指定を判定関数に変換する
+    @details 指定の解析は1回だけ行い、行ごとには比較関数の呼び出しだけを行う
+    @param column_if 判定条件。column_if_terms()を参照
+    @param typed ==,!=でも右辺値が数値の場合に数値として比較する。column_if_term()を参照
+    @return 行を受け取り、置換を実行する場合にTrueを返す関数
+    """
+    or_funcs = []
+    for terms in column_if_terms(column_if):
+        and_funcs = [column_if_term(term, column_if=column_if, typed=typed) for term in terms]
+        or_funcs.append(functools.reduce(_column_if_and, and_funcs))
+    return functools.reduce(_column_if_or, or_funcs)
 
 
 def column_fill_index(
@@ -144,6 +305,7 @@ def column_fill_index(
     *,
     header: int = 0,
     column_if: Optional[str] = None,
+    column_if_typed: bool = False,
 ):
     """!
     @brief カラムの空白を埋める
@@ -153,30 +315,17 @@ def column_fill_index(
     @param value 埋める文字列
     @param header ヘッダ行数
     @param column_if 置換を実行するかを行のカラムの値で判定
+    @param column_if_typed column_ifの==,!=でも右辺値が数値の場合に数値として比較する
     """
     # column_ifのセットアップ
-    if column_if is not None:
-        match = re.match(r"(\d+)([!=><]=?)(.*)", column_if)
-        if match is None:
-            raise Exception(f"--column-ifの指定が正しくありません。--raw-if {column_if}")
-        column_if_index = int(match.group(1))  # 先頭の数字部分
-        column_if_operator = match.group(2)  # 比較演算子
-        column_if_rest = match.group(3)  # 残りの文字列
-        # 指定値の正規化
-        column_if_index = int(column_if_index)
-        ## 右辺の正規化
-        match = re.search(r'(["\'])(.*?)\1', column_if_rest)
-        if match:
-            column_if_rest = match.group(2)  # クォート内の文字列を取得
+    predicate = column_if_compile(column_if, typed=column_if_typed) if column_if is not None else None
     #
     value_prev = value
     for row in table._rows[header:]:
         column_value = row[column_index]
         if column_value == "":
-            if column_if is not None:
-                v_left = row[column_if_index]
-                if check_column_if(v_left, column_if_operator, column_if_rest, column_if=column_if) == False:
-                    continue
+            if predicate is not None and not predicate(row):
+                continue
             # 穴埋め
             if value_source == "constant":
                 v = value
@@ -193,47 +342,11 @@ def column_fill_index(
 def column_merge_index_group(table: Table, column_key: list[int], column_group: list[list[int]]):
     """!
     @brief カラムグループに従い、排他されたレコードをマージする
+    @details rows_column_merge()で行を1回だけ走査して作り直す
     @param column_key マージする際にキーとするカラムのインデックス
     @param column_group カラムグループ
     """
-    # column_keyとcolumn_group以外のカラムのインデックスリストを作成する
-    other_column_index_list = {i for i in range(table.column_count())}
-    other_column_index_list = other_column_index_list.difference(set(column_key))
-    for column_index_list in column_group:
-        other_column_index_list = other_column_index_list.difference(set(column_index_list))
-    #
-    row_index = 0
-    # for row_index in itertools.count():  # 行をマージするため行が減っていく
-    while True:  # 行をマージするため行が減っていく
-        if (row_index + 1) >= table.row_count():  # 次の行が無くなったら終了
-            break
-        # 同一のキーを持つ行を探す
-        columns1 = table._rows[row_index]
-        columns2 = table._rows[row_index + 1]
-        b = values_equal_index_group(columns1, columns2, column_key)
-        if b == False:
-            row_index += 1
-            continue
-        #
-        # index_group1 = values_non_empty_index_group(columns1, column_group)
-        index_group1 = set(values_non_empty_index_group(columns1, column_group))  # setにすることで、重複を除去する
-        # index_group2 = values_non_empty_index_group(columns2, column_group)
-        index_group2 = set(values_non_empty_index_group(columns2, column_group))  # setにすることで、重複を除去する
-        if index_group1.isdisjoint(index_group2) == False:  # 重複があるためマージできない
-            row_index += 1
-            continue
-        # column_keyとcolumn_group以外のカラムが同一であることを確認する
-        b = values_equal_index_group(columns1, columns2, list(other_column_index_list))
-        if b == False:
-            row_index += 1
-            continue
-        # マージする
-        for i in index_group2:
-            for j in column_group[i]:
-                table._rows[row_index][j] = columns2[j]
-        # マージした行を削除する
-        table.row_remove(row_index + 1)
-    pass
+    table.rows_transform(lambda rows: rows_column_merge(rows, column_key, column_group))
 
 
 def column_quote(table: Table, column_index: int) -> None:
@@ -243,11 +356,18 @@ def column_quote(table: Table, column_index: int) -> None:
     @param column_index カラムのインデックス
     """
     for row in table._rows:
-        column_value = row[column_index]
-        if len(column_value) > 1 and column_value[0] == '"':  # 既にクォートで囲んでいる?
-            pass
-        else:
-            row[column_index] = f'"{column_value}"'
+        row[column_index] = value_quote(row[column_index])
+
+
+def value_quote(value: str) -> str:
+    """!
+    @brief 値をクォートで囲む
+    @param value 値
+    @return クォートで囲んだ値。既にクォートで囲んでいる場合はそのまま
+    """
+    if len(value) > 1 and value[0] == '"':  # 既にクォートで囲んでいる?
+        return value
+    return f'"{value}"'
 
 
 def column_replace_index(
@@ -280,7 +400,7 @@ def csv_filetype_detect(csv_type_list: list[CsvFileTypeInfo], file_path: Path) -
     @retval None 判定できない
     """
     # ファイルの読み込み
-    lines = textfile_read(file_path, line_max=csv_type_list[0].header_row_count)
+    lines = textfile_read(file_path, line_max=csv_type_list[0].header_row_count, encoding=csv_option.encoding)
     # ファイルの種別判定
     return csv_filetype_detect_lines(csv_type_list, lines)
 
@@ -385,23 +505,477 @@ def table_sort(table: Table, column_key_set: set[int], column_attr: list[str], *
     @param column_attr カラムの属性のリスト。str, int, float
     @param reverse 降順にする場合はTrue
     """
+    if table.row_count() == 0:  # 行がない場合はカラムもないため、ソートしない
+        return
+    # SQLiteの表は、データベースでソートする
+    if isinstance(table, SqliteTable) and table.table_sort_sql(list(column_key_set), column_attr, reverse=reverse):
+        return
+    # 数値のカラムを含む場合は、numpyの配列に変換してソートする
+    row_index_list = table_sort_index_typed(table, list(column_key_set), column_attr, reverse=reverse)
+    if row_index_list is not None:
+        table.table_permute_rows(row_index_list)
+        return
+    # カラムごとにソートのキーを作成する。辞書符号化した列は値の種類ごとに1回だけ変換する
+    convert_funcs = {"str": str, "int": int, "float": float}
+    column_keys = []
+    for i, col in enumerate(column_key_set):
+        convert_func = convert_funcs.get(column_attr[i])
+        if convert_func is None:
+            raise Exception("unknown column attribute")
+        column_keys.append(table.column_map(col, convert_func))
+    #
+    keys = list(zip(*column_keys)) if len(column_keys) > 0 else [()] * table.row_count()
+    row_index_list = sorted(range(table.row_count()), key=keys.__getitem__, reverse=reverse)
+    table.table_permute_rows(row_index_list)
+    pass
+
+
+# 行単位の変換。csv_file_transform()で1行ずつ処理するために使用する
+
+
+def rows_column_add(
+    rows: Iterable[list[str]], column_index_list: list[int], *, column_count: int = 1
+) -> Iterator[list[str]]:
+    """!
+    @brief 行ごとにカラムを追加する
+    @details Table.table_column_add()をインデックスの大きい順に実行した場合と同じ結果になる。各行は1回だけ作り直す
+    @param rows 行のイテレータ
+    @param column_index_list 追加するカラムのインデックスリスト。-1の場合は最後に追加する。
+    @param column_count 追加するカラム数
+    @return 変換した行のイテレータ
+    """
+    plan = column_add_plan(column_index_list, column_count=column_count)
+    for row in rows:
+        yield values_column_add(row, plan)
+
+
+def rows_column_del(rows: Iterable[list[str]], column_index_list: list[int]) -> Iterator[list[str]]:
+    """!
+    @brief 行ごとにカラムを削除する
+    @details 各行は1回だけ作り直す
+    @param rows 行のイテレータ
+    @param column_index_list 削除するカラムのインデックスリスト
+    @return 変換した行のイテレータ
+    """
+    plans: dict[int, list[slice]] = {}  # 行のカラム数ごとの計画
+    for row in rows:
+        plan = plans.get(len(row))
+        if plan is None:
+            plan = plans[len(row)] = column_del_plan(column_index_list, len(row))
+        yield values_column_del(row, plan)
+
+
+def rows_column_move(
+    rows: Iterable[list[str]], from_index_list: list[int], to_index_list: list[int]
+) -> Iterator[list[str]]:
+    """!
+    @brief 行ごとにカラムを移動する
+    @details 移動後のカラムの並びは行のカラム数ごとに1回だけ求める。カラム数が異なる行も、行ごとに移動した場合と同じ結果になる
+    @param rows 行のイテレータ
+    @param from_index_list 移動元のカラムのインデックスリスト
+    @param to_index_list 移動先のカラムのインデックスリスト。移動元を削除した後のインデックス
+    @return 変換した行のイテレータ
+    @exception IndexError 移動元のインデックスが行のカラム数の範囲外の場合
+    """
+    getters: dict[int, Callable[[Sequence[str]], list[str]]] = {}  # 行のカラム数ごとの関数
+    for row in rows:
+        getter = getters.get(len(row))
+        if getter is None:
+            permutation = column_move_permutation(from_index_list, to_index_list, len(row))
+            getter = getters[len(row)] = column_permute_getter(permutation)
+        yield getter(row)
+
+
+def _column_group_flatten(column_group_node: list[Any]) -> list[int]:
+    """!
+    @brief 入れ子のカラムグループに含まれるカラムのインデックスを順に取り出す
+    @param column_group_node 入れ子のカラムグループ
+    @return カラムのインデックスのリスト
+    """
+    if all(isinstance(value, int) for value in column_group_node):
+        return column_group_node
+    return [index for node in column_group_node for index in _column_group_flatten(node)]
+
 
-    # 複数の列でソートするラムダ関数
-    def custom_sort(row):
-        # return tuple(row[col] for col in column_key_set)
-        result = []
-        for i, col in enumerate(column_key_set):
-            if column_attr[i] == "str":
-                result.append(row[col])
-            elif column_attr[i] == "int":
-                result.append(int(row[col]))
-            elif column_attr[i] == "float":
-                result.append(float(row[col]))
+def column_group_levels(column_group_tree: list[Any]) -> list[list[list[int]]]:
+    """!
+    @brief 入れ子のカラムグループを階層ごとのカラムグループに変換する
+    @details 入れ子のカラムグループは、子のカラムグループのすべてのカラムを持つカラムグループとして上位の階層に含め、
+    子のカラムグループは次の階層に含める。例えば[[[1,2],[3,4]],[5,6]]は[[[1,2,3,4],[5,6]],[[1,2],[3,4]]]になる。
+    @param column_group_tree カラムグループのリスト。カラムグループはインデックスのリスト、またはカラムグループのリスト
+    @return 階層ごとのカラムグループのリスト。先頭が最上位の階層
+    @exception ValueError カラムグループが空の場合,インデックスとカラムグループが混在する場合
+    """
+    levels = []
+    nodes = column_group_tree
+    while len(nodes) > 0:
+        level = []
+        children = []
+        for node in nodes:
+            if not isinstance(node, list) or len(node) == 0:
+                raise ValueError(f"カラムグループが不正です。{node}")
+            if not all(isinstance(value, int) for value in node):
+                if not all(isinstance(value, list) for value in node):
+                    raise ValueError(f"インデックスとカラムグループが混在しています。{node}")
+                children.extend(node)
+            level.append(_column_group_flatten(node))
+        levels.append(level)
+        nodes = children
+    return levels
+
+
+def rows_column_exclusive_levels(
+    rows: Iterable[list[str]], column_group_levels: list[list[list[int]]]
+) -> Iterable[list[str]]:
+    """!
+    @brief 階層ごとのカラムグループに従い、上位の階層から順に行を分割する
+    @details 階層ごとのrows_column_exclusive()を連結するため、column-exclusiveを階層ごとに実行した場合と同じ結果を1回の走査で出力する
+    @param rows 行のイテレータ
+    @param column_group_levels 階層ごとのカラムグループのリスト。先頭が最上位の階層
+    @return 分割した行のイテレータ
+    """
+    for column_group in column_group_levels:
+        rows = rows_column_exclusive(rows, column_group)
+    return rows
+
+
+def rows_column_exclusive(rows: Iterable[list[str]], column_group: list[list[int]]) -> Iterator[list[str]]:
+    """!
+    @brief 行ごとにカラムグループが排他されるように行を分割する
+    @details 2つ以上のカラムグループに値が入っている行は、1つ目のカラムグループだけを残した行を出力し、
+    1つ目のカラムグループを空にした複製の行を続けて同様に分割する
+    @param rows 行のイテレータ
+    @param column_group カラムグループ
+    @return 分割した行のイテレータ
+    """
+    for row in rows:
+        while True:
+            index_group = values_non_empty_index_group(row, column_group)
+            if len(index_group) < 2:
+                yield row
+                break
+            duplicated_row = row.copy()
+            # 元の行は、1つ目のカラムグループ以外のカラムを空にする
+            values_set_empty_index_group(row, [column_group[i] for i in index_group[1:]])
+            # 複製した行は、1つ目のカラムグループを空にする
+            values_set_empty(duplicated_row, column_group[index_group[0]])
+            yield row
+            row = duplicated_row
+
+
+def rows_column_fill(
+    rows: Iterable[list[str]],
+    column_index_list: list[int],
+    value_source: str,
+    value: str,
+    *,
+    column_if: Optional[str] = None,
+    column_if_typed: bool = False,
+) -> Iterator[list[str]]:
+    """!
+    @brief 行ごとにカラムの空白を埋める
+    @details すべてのカラムを1回の走査で埋める。カラムごとに順に実行した場合と同じ結果になる
+    @param rows 行のイテレータ
+    @param column_index_list カラムのインデックスリスト
+    @param value_source 置換する値の元。constant,ffill,column
+    @param value 埋める文字列
+    @param column_if 置換を実行するかを行のカラムの値で判定
+    @param column_if_typed column_ifの==,!=でも右辺値が数値の場合に数値として比較する
+    @return 変換した行のイテレータ
+    """
+    if value_source not in ("constant", "ffill", "column"):
+        raise ValueError(f"未知のvalue_sourceです。value_source={value_source}")
+    predicate = column_if_compile(column_if, typed=column_if_typed) if column_if is not None else None
+    # 判定条件が埋めるカラムを参照する場合は、埋めた値で判定するため、カラムごとに判定する
+    predicate_each = column_if is not None and any(
+        term.column_index in column_index_list for terms in column_if_terms(column_if) for term in terms
+    )
+    values_prev = [value] * len(column_index_list)  # ffillで使用する、カラムごとの直前の値
+    value_column_index = int(value) if value_source == "column" else 0
+    column_pairs = list(enumerate(column_index_list))  # 行ごとにenumerate()を呼ばないように作成しておく
+    for row in rows:
+        matched = None  # 行の判定結果。判定するまではNone
+        for n, column_index in column_pairs:
+            column_value = row[column_index]
+            if column_value:
+                values_prev[n] = column_value
+                continue
+            if predicate is not None:
+                if matched is None or predicate_each:
+                    matched = predicate(row)
+                if not matched:
+                    continue
+            # 穴埋め
+            if value_source == "constant":
+                row[column_index] = value
+            elif value_source == "ffill":
+                row[column_index] = values_prev[n]
             else:
-                raise Exception("unknown column attribute")
-        return tuple(result)
+                row[column_index] = row[value_column_index]
+        yield row
+
 
+def rows_column_merge(
+    rows: Iterable[list[str]], column_key: list[int], column_group: list[list[int]]
+) -> Iterator[list[str]]:
+    """!
+    @brief カラムグループに従い、排他された連続する行をマージする
+    @details マージ中の行を1行だけ保持し、次の行をマージできない時点で出力する。
+    次の行がマージ中の行とキーが一致し、値の入っているカラムグループが重ならず、キーとカラムグループ以外のカラムが一致する場合に、
+    次の行のカラムグループの値をマージ中の行に設定する。
+    @param rows 行のイテレータ
+    @param column_key マージする際にキーとするカラムのインデックス
+    @param column_group カラムグループ
+    @return マージした行のイテレータ
+    """
+    rows_iter = iter(rows)
+    merged = next(rows_iter, None)
+    if merged is None:
+        return
+    # column_keyとcolumn_group以外のカラムのインデックスリストを作成する(カラム数は最初の行)
+    other_column_index_set = set(range(len(merged))).difference(column_key)
+    for column_index_list in column_group:
+        other_column_index_set = other_column_index_set.difference(column_index_list)
+    other_column_index_list = list(other_column_index_set)
     #
-    _sorted_data = sorted(table._rows, key=custom_sort, reverse=reverse)
-    table._rows = _sorted_data
-    pass
+    index_group1 = set(values_non_empty_index_group(merged, column_group))  # マージ中の行の値の入っているカラムグループ
+    for row in rows_iter:
+        if values_equal_index_group(merged, row, column_key):
+            index_group2 = set(values_non_empty_index_group(row, column_group))
+            if index_group1.isdisjoint(index_group2) and values_equal_index_group(merged, row, other_column_index_list):
+                for i in index_group2:
+                    for j in column_group[i]:
+                        merged[j] = row[j]
+                index_group1 = set(values_non_empty_index_group(merged, column_group))
+                continue
+        yield merged
+        merged = row
+        index_group1 = set(values_non_empty_index_group(merged, column_group))
+    yield merged
+
+
+def _merge_key_getter(column_index_list: list[int]) -> Callable[[list[str]], Any]:
+    """!
+    @brief 行からマージのキーを取り出す関数を作成する
+    @param column_index_list キーとするカラムのインデックスのリスト
+    @return 行を受け取り、キーを返す関数。カラムが足りない行は、足りないカラムをNoneにする
+    """
+    getter = operator.itemgetter(*column_index_list)
+
+    def key_get(row: list[str]) -> Any:
+        try:
+            return getter(row)
+        except IndexError:
+            return tuple(row[i] if i < len(row) else None for i in column_index_list)
+
+    return key_get
+
+
+def _merge_group_add(group: list[list[str]], row: list[str], column_group: list[list[int]]) -> None:
+    """!
+    @brief グループの最後の行に行をマージする。マージできない場合はグループに行を追加する
+    @param group マージした行のリスト
+    @param row 行
+    @param column_group カラムグループ
+    """
+    merged = group[-1]
+    index_group2 = values_non_empty_index_group(row, column_group)
+    if not set(values_non_empty_index_group(merged, column_group)).isdisjoint(index_group2):
+        group.append(row)
+        return
+    for i in index_group2:
+        for j in column_group[i]:
+            merged[j] = row[j]
+
+
+def _spill_write(file: IO[bytes], records: list[Any]) -> None:
+    """!
+    @brief 一時ファイルにレコードを書き込む
+    @param file 一時ファイル
+    @param records レコードのリスト。書き込んだ後に空にする
+    """
+    pickle.dump(records, file, protocol=pickle.HIGHEST_PROTOCOL)
+    records.clear()
+
+
+def _spill_read(file: IO[bytes]) -> Iterator[Any]:
+    """!
+    @brief 一時ファイルのレコードを先頭から読み込む
+    @param file 一時ファイル
+    @return レコードのイテレータ
+    """
+    file.seek(0)
+    while True:
+        try:
+            records = pickle.load(file)
+        except EOFError:
+            return
+        yield from records
+
+
+def _spill_merge(file: IO[bytes], key_get: Callable[[list[str]], Any], column_group: list[list[int]]) -> None:
+    """!
+    @brief 一時ファイルの(グループの番号,行)のレコードをグループごとにマージし、(グループの番号,マージした行のリスト)で書き直す
+    @details 一時ファイルには同じキーのすべての行が入っている。グループの番号は最初のレコードの番号にする。
+    書き直した後のレコードはグループの番号の順になる
+    @param file 一時ファイル
+    @param key_get 行からキーを取り出す関数
+    @param column_group カラムグループ
+    """
+    groups: dict[Any, tuple[int, list[list[str]]]] = {}
+    with gc_paused():
+        for group_number, row in _spill_read(file):
+            key = key_get(row)
+            group = groups.get(key)
+            if group is None:
+                groups[key] = (group_number, [row])
+            else:
+                _merge_group_add(group[1], row, column_group)
+    file.seek(0)
+    file.truncate()
+    records: list[Any] = []
+    for group in groups.values():
+        records.append(group)
+        if len(records) >= MERGE_SPILL_BATCH_SIZE:
+            _spill_write(file, records)
+    _spill_write(file, records)
+
+
+def rows_column_merge_hash(
+    rows: Iterable[list[str]],
+    column_key: list[int],
+    column_group: list[list[int]],
+    *,
+    group_max: Optional[int] = None,
+) -> Iterator[list[str]]:
+    """!
+    @brief カラムグループに従い、排他された行を連続していなくてもマージする
+    @details キーとカラムグループ以外のカラムの値でグループに分け、グループごとにrows_column_merge()と同じ条件でマージする。
+    グループは最初に出現した順に出力する。同じグループの行が連続するように入力を並べ替えてから、rows_column_merge()を実行した場合と同じ結果になる。
+    グループ数がgroup_maxを超えた場合は、キーのハッシュ値で分割した一時ファイルに行を書き出し、分割ごとにマージする。
+    @param rows 行のイテレータ
+    @param column_key マージする際にキーとするカラムのインデックス
+    @param column_group カラムグループ
+    @param group_max メモリに保持するグループ数の上限。Noneの場合は一時ファイルを使用しない
+    @return マージした行のイテレータ
+    """
+    rows_iter = iter(rows)
+    first_row = next(rows_iter, None)
+    if first_row is None:
+        return
+    # column_keyとcolumn_group以外のカラムも一致する必要があるため、キーに含める(カラム数は最初の行)
+    other_column_index_set = set(range(len(first_row))).difference(column_key)
+    for column_index_list in column_group:
+        other_column_index_set = other_column_index_set.difference(column_index_list)
+    key_get = _merge_key_getter(list(column_key) + sorted(other_column_index_set))
+    #
+    groups: dict[Any, list[list[str]]] = {}  # キーごとのマージした行のリスト。最初に出現した順
+    partitions: list[IO[bytes]] = []  # グループ数が上限を超えた後に行を書き出す一時ファイル
+    buffers: list[list[Any]] = []  # 一時ファイルごとの書き込み待ちの(グループの番号,行)のリスト
+    try:
+        with gc_paused():  # すべての行を読み込むまで出力しないため、読み込み中はGCを止める
+            for row_number, row in enumerate(itertools.chain([first_row], rows_iter)):
+                key = key_get(row)
+                if len(partitions) == 0:
+                    group = groups.get(key)
+                    if group is not None:
+                        _merge_group_add(group, row, column_group)
+                        continue
+                    if group_max is None or len(groups) < group_max:
+                        groups[key] = [row]
+                        continue
+                    # グループ数が上限を超えたため、保持しているグループを一時ファイルに書き出す。
+                    # グループの番号は出現順の番号にする(以降の行の番号より小さく、順序も変わらない)
+                    partitions = [tempfile.TemporaryFile() for _ in range(MERGE_SPILL_PARTITIONS)]
+                    buffers = [[] for _ in range(MERGE_SPILL_PARTITIONS)]
+                    for group_number, (group_key, group) in enumerate(groups.items()):
+                        partition_index = hash(group_key) % MERGE_SPILL_PARTITIONS
+                        for merged in group:
+                            buffers[partition_index].append((group_number, merged))
+                            if len(buffers[partition_index]) >= MERGE_SPILL_BATCH_SIZE:
+                                _spill_write(partitions[partition_index], buffers[partition_index])
+                    groups = {}
+                partition_index = hash(key) % MERGE_SPILL_PARTITIONS
+                buffers[partition_index].append((row_number, row))
+                if len(buffers[partition_index]) >= MERGE_SPILL_BATCH_SIZE:
+                    _spill_write(partitions[partition_index], buffers[partition_index])
+        if len(partitions) == 0:
+            for group in groups.values():
+                yield from group
+            return
+        for partition, buffer in zip(partitions, buffers):
+            _spill_write(partition, buffer)
+            _spill_merge(partition, key_get, column_group)
+        # 分割ごとにグループの番号の順になっているため、併合して全体の出現順にする
+        for _, merged_rows in heapq.merge(*map(_spill_read, partitions), key=operator.itemgetter(0)):
+            yield from merged_rows
+    finally:
+        for partition in partitions:
+            partition.close()
+
+
+def rows_column_merge_levels(
+    rows: Iterable[list[str]],
+    column_key: list[int],
+    column_group_levels: list[list[list[int]]],
+    *,
+    group_by_hash: bool = False,
+    group_max: Optional[int] = None,
+) -> Iterable[list[str]]:
+    """!
+    @brief 階層ごとのカラムグループに従い、下位の階層から順に行をマージする
+    @details 階層ごとのマージを連結するため、column-mergeを下位の階層から実行した場合と同じ結果を1回の走査で出力する
+    @param rows 行のイテレータ
+    @param column_key マージする際にキーとするカラムのインデックス
+    @param column_group_levels 階層ごとのカラムグループのリスト。先頭が最上位の階層
+    @param group_by_hash 連続していない行もマージする場合はTrue。rows_column_merge_hash()を使用する
+    @param group_max rows_column_merge_hash()でメモリに保持するグループ数の上限
+    @return マージした行のイテレータ
+    """
+    for column_group in reversed(column_group_levels):
+        if group_by_hash:
+            rows = rows_column_merge_hash(rows, column_key, column_group, group_max=group_max)
+        else:
+            rows = rows_column_merge(rows, column_key, column_group)
+    return rows
+
+
+def rows_column_quote(rows: Iterable[list[str]], column_index_list: list[int]) -> Iterator[list[str]]:
+    """!
+    @brief 行ごとにカラムをクォートで囲む
+    @param rows 行のイテレータ
+    @param column_index_list カラムのインデックスリスト
+    @return 変換した行のイテレータ
+    """
+    for row in rows:
+        for column_index in column_index_list:
+            row[column_index] = value_quote(row[column_index])
+        yield row
+
+
+def rows_column_replace(
+    rows: Iterable[list[str]], column_index_list: list[int], regex: str, repl: str
+) -> Iterator[list[str]]:
+    """!
+    @brief 行ごとにカラムを置換する
+    @param rows 行のイテレータ
+    @param column_index_list カラムのインデックスリスト
+    @param regex 置換を実行する正規表現
+    @param repl 置換する文字列
+    @return 変換した行のイテレータ
+    """
+    pattern = re.compile(regex)
+    for row in rows:
+        for column_index in column_index_list:
+            row[column_index] = pattern.sub(repl, row[column_index])
+        yield row
+
+
+def rows_column_select(rows: Iterable[list[str]], column_index_list: list[int]) -> Iterator[list[str]]:
+    """!
+    @brief 行ごとに指定したカラムを抽出する
+    @param rows 行のイテレータ
+    @param column_index_list 抽出するカラムのインデックスリスト
+    @return 変換した行のイテレータ
+    """
+    return map(column_permute_getter(column_index_list), rows)
@@ -0,0 +1,66 @@
+import copy
+from typing import Type
+
+from src.table import Table
+from src.table_backend import TABLE_BACKENDS
+from src.table_utl import column_exclusive_index_group, column_fill_index, column_merge_index_group, table_sort
+
+TABLE_3x3 = [["a", "b", "c"], ["1", "2", "3"], ["4", "5", "6"]]
+
+# 行指向の表以外の実装
+TABLE_BACKEND_CLASSES: list[Type[Table]] = [
+    table_class for table_class in TABLE_BACKENDS.values() if table_class is not Table
+]
+
+# 行指向の表と結果を比較する表の操作
+TABLE_OPERATIONS = [
+    ("0101N", lambda tbl: tbl.column_add(["A", "B", "C"])),
+    ("0102N", lambda tbl: tbl.column_insert(1, ["A", "B", "C"])),
+    ("0103N", lambda tbl: tbl.column_insert_empty(1)),
+    ("0104N", lambda tbl: tbl.column_move(0, 2)),
+    ("0105N", lambda tbl: tbl.column_move(2, 0)),
+    ("0106N", lambda tbl: tbl.column_remove(1)),
+    ("0107N", lambda tbl: tbl.table_column_add(1, column_count=2)),
+    ("0108N", lambda tbl: tbl.table_column_add(-1)),  # 末尾に追加
+    ("0109N", lambda tbl: tbl.table_column_del(0)),
+    ("0110N", lambda tbl: tbl.table_column_add_multi([0, -1, 1], column_count=2)),
+    ("0111N", lambda tbl: tbl.table_column_del_multi([0, 2])),
+    ("0112N", lambda tbl: tbl.table_permute_columns([2, 0, 1])),
+    ("0113N", lambda tbl: tbl.column_map(1, str.upper)),
+    ("0114N", lambda tbl: (tbl.table_column_del(0), tbl.table_column_add(1))),  # 削除したカラムの後に追加したカラムは空
+    ("0201N", lambda tbl: tbl.row_add(["7", "8", "9"])),
+    ("0202N", lambda tbl: tbl.row_insert(1, ["7", "8", "9"])),
+    ("0204N", lambda tbl: tbl.row_move(0, 2)),
+    ("0205N", lambda tbl: tbl.row_remove(1)),
+    ("0206N", lambda tbl: tbl.row_remove_multi(0, 2)),
+    ("0207N", lambda tbl: tbl.row_duplicate(1)),
+    ("0208N", lambda tbl: tbl.table_permute_rows([2, 2, 0])),
+    ("0209N", lambda tbl: (tbl.table_permute_rows([2, 2, 0]), tbl.row_remove(0), tbl.row_remove(0))),  # 複製した行の削除
+]
+
+# 行指向の表と結果を比較するtable_utlの処理
+TABLE_PROCESSES = [
+    lambda tbl: column_exclusive_index_group(tbl, [[1], [2]]),
+    lambda tbl: column_merge_index_group(tbl, [0], [[1], [2]]),
+    lambda tbl: column_fill_index(tbl, 1, "ffill", ""),
+    lambda tbl: table_sort(tbl, [0], ["str"]),
+]
+
+
+def tables_create(table_class: Type[Table], rows: list[list[str]]) -> tuple[Table, Table]:
+    """!
+    @brief 同じ行から行指向の表と比較対象の表を作成する
+    @param table_class 比較対象の表のクラス
+    @param rows 行のリスト。複製して使用する
+    @return 行指向の表と比較対象の表
+    """
+    return Table.create_rows(copy.deepcopy(rows)), table_class.create_rows(copy.deepcopy(rows))
+
+
+def table_values(table: Table) -> list[list[str]]:
+    """!
+    @brief 表の値を行のリストで取得する
+    @param table 表
+    @return 行のリスト
+    """
+    return [list(row) for row in table.row_values()]
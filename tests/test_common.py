@@ -1,8 +1,28 @@
+import bz2
+import gc
+import gzip
 import io
+import lzma
+import random
+from pathlib import Path
 
 import pytest
 
-from src.common import split_csv_string_no_normalize, textfile_read_stream
+from src.common import (
+    InternTable,
+    binaryfile_open_read,
+    binaryfile_open_write,
+    binarystream_line_batches,
+    compression_detect,
+    encoding_detect,
+    gc_paused,
+    split_csv_string_no_normalize,
+    split_csv_string_no_normalize_fast,
+    textfile_read,
+    textfile_read_stream,
+    textfile_write,
+    textstream_line_batches,
+)
 
 LINE_3 = """\
 line1
@@ -57,6 +77,55 @@ def test_split_csv_string_no_normalize_0003X(test_id: str, val: str, expected: l
     assert result == expected
 
 
+@pytest.mark.parametrize(
+    "test_id, val",
+    [
+        ("0101N", "a,b"),
+        ("0102N", "a,,c"),
+        ("0103N", " a , b "),
+        ("0201B", ""),
+        ("0202B", "a,"),
+        ("0301N", 'a,"b1,b2"'),
+        ("0302N", 'a,"b1,"",b2"'),  # ダブルクォートのエスケープ
+        ("0303B", 'a,"b1,b2'),  # 閉じるダブルクォートが無い
+        ("0304B", 'a"b,c"d,e'),  # フィールドの途中のダブルクォート
+        ("0305B", '""",a'),  # 連続するダブルクォート
+        ("0306B", '"a""'),
+    ],
+)
+def test_split_csv_string_no_normalize_fast_0001X(test_id: str, val: str):  # 従来版と同一の結果になるか
+    for strip in [False, True]:
+        expected = split_csv_string_no_normalize(val, strip=strip)
+        assert split_csv_string_no_normalize_fast(val, strip=strip) == expected
+
+
+def test_split_csv_string_no_normalize_fast_0002X():  # ランダムな文字列で従来版と比較
+    rand = random.Random(0)
+    for _ in range(10000):
+        val = "".join(rand.choice('ab,"\t ') for _ in range(rand.randint(0, 16)))
+        for delimiter in [",", "\t"]:
+            expected = split_csv_string_no_normalize(val, delimiter=delimiter)
+            assert split_csv_string_no_normalize_fast(val, delimiter=delimiter) == expected
+
+
+@pytest.mark.parametrize(
+    "test_id, val, maxsplit, expected",
+    [
+        ("0101N", "a,b,c,d", 2, ["a", "b", "c,d"]),
+        ("0102N", 'a,"b1,b2",c,"d1,d2"', 2, ["a", '"b1,b2"', 'c,"d1,d2"']),
+        ("0103B", "a,b", 2, ["a", "b"]),  # 分割数よりフィールドが少ない
+        ("0104B", "a,b,c", 0, ["a,b,c"]),
+    ],
+)
+def test_split_csv_string_no_normalize_fast_0003X(test_id: str, val: str, maxsplit: int, expected: list[str]):
+    assert split_csv_string_no_normalize_fast(val, maxsplit=maxsplit) == expected
+
+
+def test_split_csv_string_no_normalize_fast_0004N():  # maxsplitとstrip。残りは除去しない
+    assert split_csv_string_no_normalize_fast(" a , b , c ", strip=True, maxsplit=1) == ["a", " b , c "]
+    assert split_csv_string_no_normalize_fast(' a ,"b", c ', strip=True, maxsplit=1) == ["a", '"b", c ']
+
+
 def test_textfile_read_stream_0101N():
     lines = textfile_read_stream(io.StringIO(LINE_3))
     assert lines == ["line1\n", "line2\n", "line3\n"]
@@ -85,3 +154,149 @@ def test_textfile_read_stream_0105N():  # remove_newline
 def test_textfile_read_stream_0106B():  # skip_line_count,line_max,remove_newlineを同時に指定
     lines = textfile_read_stream(io.StringIO(LINE_3), skip_line_count=1, line_max=1, remove_newline=True)
     assert lines == ["line2"]
+
+
+def test_textstream_line_batches_0101N():
+    batches = list(textstream_line_batches(io.StringIO(LINE_3), batch_size=2))
+    assert batches == [["line1", "line2"], ["line3"]]
+
+
+def test_textstream_line_batches_0102B():  # 最後の行に改行なし,空行
+    batches = list(textstream_line_batches(io.StringIO("line1\n\nline3")))
+    assert batches == [["line1", "", "line3"]]
+
+
+@pytest.mark.parametrize(
+    "test_id, data",
+    [
+        ("0101N", "line1\nline2\nline3\n"),
+        ("0102B", "line1\n\nline3"),  # 最後の行に改行なし,空行
+        ("0103N", "あいう,えお\nかき\n"),  # マルチバイト文字がブロックの境界をまたぐ
+        ("0104N", "a\r\nb\rc\r\r\nd\r"),  # 改行コード
+        ("0105B", ""),
+    ],
+)
+def test_binarystream_line_batches_0001X(test_id: str, data: str):  # テキストモードで読み込んだ場合と同じになるか
+    expected = [line.rstrip("\n") for line in io.TextIOWrapper(io.BytesIO(data.encode("utf-8")), encoding="utf-8")]
+    for block_size in [1, 2, 3, 1024]:
+        batches = binarystream_line_batches(io.BytesIO(data.encode("utf-8")), block_size=block_size)
+        assert [line for lines in batches for line in lines] == expected
+
+
+@pytest.mark.parametrize(
+    "test_id, data, encoding",
+    [
+        ("0101N", "あいう,えお\nかき\n", "utf-8"),
+        ("0102N", "あいう,えお\nかき\n", "utf-8-sig"),
+        ("0103N", "あいう,えお\nかき\n", "cp932"),
+        ("0104N", "a,b\nc,d\nあ\n", "cp932"),  # 先頭がASCIIのみ
+    ],
+)
+def test_binarystream_line_batches_0002X(test_id: str, data: str, encoding: str):  # 文字コードの自動判定
+    for block_size in [16, 1024]:  # 最初のブロックで判定する
+        batches = binarystream_line_batches(io.BytesIO(data.encode(encoding)), block_size=block_size, encoding="auto")
+        assert [line for lines in batches for line in lines] == data.splitlines()
+
+
+@pytest.mark.parametrize("block_size", [0, -1])
+def test_binarystream_line_batches_0201E(block_size: int):  # ブロックのサイズが1未満
+    with pytest.raises(ValueError):
+        list(binarystream_line_batches(io.BytesIO(b"a\n"), block_size=block_size))
+
+
+@pytest.mark.parametrize(
+    "test_id, sample, expected",
+    [
+        ("0101N", "a,b\n".encode("utf-8"), "utf-8"),
+        ("0102N", "a,あ".encode("utf-8")[:-1], "utf-8"),  # 最後のマルチバイト文字が途中で切れている
+        ("0103N", "\ufeffa,あ".encode("utf-8"), "utf-8-sig"),
+        ("0104N", "a,あ".encode("cp932"), "cp932"),
+        ("0201B", b"", "utf-8"),
+    ],
+)
+def test_encoding_detect_0001X(test_id: str, sample: bytes, expected: str):
+    assert encoding_detect(sample) == expected
+
+
+def test_textfile_read_0101N(tmp_path):  # 文字コードの自動判定
+    file_path = tmp_path / "input.txt"
+    file_path.write_bytes("\ufeffあ\nい\n".encode("utf-8"))
+    assert textfile_read(file_path, encoding="auto") == ["あ\n", "い\n"]
+    file_path.write_bytes("あ\nい\n".encode("cp932"))
+    assert textfile_read(file_path, encoding="auto", line_max=1) == ["あ\n"]
+
+
+def test_textfile_write_0101N(tmp_path):
+    file_path = tmp_path / "output.txt"
+    textfile_write(file_path, ["line1", "line2", "line3"], add_newline=True, skip_line_count=1)
+    textfile_write(file_path, ["line4\n"], append=True)
+    assert file_path.read_text(encoding="utf-8") == "line2\nline3\nline4\n"
+
+
+@pytest.mark.parametrize(
+    "test_id, file_name, head, expected",
+    [
+        ("0101N", "a.csv.gz", b"\x1f\x8b\x08", "gzip"),
+        ("0102N", "a.csv", b"BZh91AY&SY", "bz2"),  # 拡張子より先頭のバイト列が優先
+        ("0104N", "a.csv", b"BZh9\x17rE8P\x90", "bz2"),  # 空のデータを圧縮したbz2
+        ("0103N", "a.csv.xz", b"\xfd7zXZ\x00", "xz"),
+        ("0201B", "a.csv.gz", b"a,b", None),  # 拡張子が圧縮形式でも内容が非圧縮
+        ("0202B", "a.csv.gz", b"", "gzip"),  # 空のファイルは拡張子で判定
+        ("0203B", None, b"", None),
+        ("0204B", "a.csv", b"BZh\n1", None),  # bz2と同じ文字列で始まるテキスト
+        ("0205B", None, b"BZh91,a", None),
+    ],
+)
+def test_compression_detect_0001X(test_id: str, file_name, head: bytes, expected):
+    file_path = None if file_name is None else Path(file_name)
+    assert compression_detect(file_path, head) == expected
+
+
+@pytest.mark.parametrize(
+    "test_id, suffix, decompress",
+    [
+        ("0101N", ".gz", gzip.decompress),
+        ("0102N", ".bz2", bz2.decompress),
+        ("0103N", ".xz", lzma.decompress),
+        ("0104N", ".txt", bytes),
+    ],
+)
+def test_binaryfile_open_write_0001X(tmp_path, test_id: str, suffix: str, decompress):  # 拡張子に対応する形式で圧縮
+    file_path = tmp_path / f"output{suffix}"
+    for compress_thread in [False, True]:
+        with binaryfile_open_write(file_path, compress_thread=compress_thread) as o_stream:
+            o_stream.write(b"a,b\n")
+            o_stream.write(b"1,2\n")
+        assert decompress(file_path.read_bytes()) == b"a,b\n1,2\n"
+        with binaryfile_open_read(file_path) as i_stream:  # 展開して読み込む
+            assert i_stream.read() == b"a,b\n1,2\n"
+
+
+def test_binaryfile_open_read_0201B(tmp_path):  # bz2と同じ文字列で始まる非圧縮のファイル
+    file_path = tmp_path / "input.csv"
+    file_path.write_bytes(b"BZh\n1\n")
+    with binaryfile_open_read(file_path) as i_stream:
+        assert i_stream.read() == b"BZh\n1\n"
+
+
+def test_textfile_write_0102N(tmp_path):  # 圧縮ファイルへの追記と読み込み
+    file_path = tmp_path / "output.txt.gz"
+    textfile_write(file_path, ["line1\n"])
+    textfile_write(file_path, ["line2\n"], append=True)
+    assert textfile_read(file_path) == ["line1\n", "line2\n"]
+
+
+def test_intern_table_0101N():  # 上限に達した後は登録しない
+    intern_table = InternTable(maxsize=2)
+    values = ["".join(["a", "b"]), "c", "d", "".join(["a", "b"]), "".join(["d"])]
+    interned = list(map(intern_table.__getitem__, values))
+    assert interned == ["ab", "c", "d", "ab", "d"]
+    assert interned[3] is interned[0]
+    assert len(intern_table) == 2
+
+
+def test_gc_paused_0101N():
+    assert gc.isenabled()
+    with gc_paused():
+        assert not gc.isenabled()
+    assert gc.isenabled()
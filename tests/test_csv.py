@@ -1,7 +1,20 @@
-# import pytest
+import gzip
 import io
+import lzma
 
-from src.csv import csv_reader
+import pytest
+
+from src.csv import (
+    csv_batch_reader,
+    csv_columns_maxsplit,
+    csv_file_reader,
+    csv_file_row_writer,
+    csv_file_transform,
+    csv_option,
+    csv_reader,
+    csv_row_reader,
+    csv_text_chunks,
+)
 from src.table import Table
 
 
@@ -23,3 +36,129 @@ a,"b1,b2",c
 """
     tbl: Table = csv_reader(io.StringIO(test_data))
     assert tbl._rows[0] == ["a", '"b1,b2"', "c"]
+
+
+@pytest.mark.parametrize("engine", ["python", "stdlib", "auto"])
+def test_csv_reader_0103N(engine: str) -> None:  # 分割エンジン
+    test_data = """\
+a,"b1,b2",c
+1,2,3
+"""
+    tbl: Table = csv_reader(io.StringIO(test_data), engine=engine)
+    assert tbl._rows == [["a", '"b1,b2"', "c"], ["1", "2", "3"]]
+
+
+def test_csv_row_reader_0101N() -> None:
+    rows = csv_row_reader(io.StringIO("a,b\n1,2\n"))
+    assert next(rows) == ["a", "b"]
+    assert next(rows) == ["1", "2"]
+
+
+def test_csv_file_transform_0101N(tmp_path) -> None:
+    input_path = tmp_path / "input.csv"
+    output_path = tmp_path / "output.csv"
+    input_path.write_text("a,b\n1,2\n", encoding="utf-8")
+    csv_file_transform(input_path, output_path, lambda rows: ([row[1], row[0]] for row in rows))
+    assert output_path.read_text(encoding="utf-8") == "b,a\n2,1\n"
+
+
+def test_csv_file_transform_0102B(tmp_path) -> None:  # 入力ファイルに上書き
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("a,b\n1,2\n", encoding="utf-8")
+    csv_file_transform(input_path, input_path, lambda rows: ([row[1], row[0]] for row in rows))
+    assert input_path.read_text(encoding="utf-8") == "b,a\n2,1\n"
+
+
+def test_csv_file_transform_0103N(tmp_path) -> None:  # 必要なカラムまで分割し、残りはそのまま出力する
+    input_path = tmp_path / "input.csv"
+    output_path = tmp_path / "output.csv"
+    input_path.write_text('a,b,"c1,c2",d\n1,2\n', encoding="utf-8")
+    rows_list: list[list[str]] = []
+
+    def transform(rows):
+        for row in rows:
+            rows_list.append(list(row))
+            row[0] = row[0].upper()
+            yield row
+
+    csv_file_transform(input_path, output_path, transform, columns=[0])
+    assert rows_list == [["a", 'b,"c1,c2",d'], ["1", "2"]]
+    assert output_path.read_text(encoding="utf-8") == 'A,b,"c1,c2",d\n1,2\n'
+
+
+def test_csv_file_transform_0104N(tmp_path, monkeypatch) -> None:  # 読み込み,書き込みを別スレッドで行う
+    monkeypatch.setattr(csv_option, "pipeline", True)
+    monkeypatch.setattr(csv_option, "block_size", 8)
+    monkeypatch.setattr(csv_option, "flush_rows", 2)
+    input_path = tmp_path / "input.csv"
+    output_path = tmp_path / "output.csv"
+    input_path.write_text("".join(f"{i},{i + 1}\n" for i in range(100)), encoding="utf-8")
+    csv_file_transform(input_path, output_path, lambda rows: ([row[1], row[0]] for row in rows))
+    assert output_path.read_text(encoding="utf-8") == "".join(f"{i + 1},{i}\n" for i in range(100))
+
+
+def test_csv_file_transform_0105N(tmp_path) -> None:  # 圧縮ファイルの入出力
+    input_path = tmp_path / "input.csv.gz"
+    output_path = tmp_path / "output.csv.xz"
+    input_path.write_bytes(gzip.compress(b"a,b\n1,2\n"))
+    csv_file_transform(input_path, output_path, lambda rows: ([row[1], row[0]] for row in rows))
+    assert lzma.decompress(output_path.read_bytes()) == b"b,a\n2,1\n"
+
+
+@pytest.mark.parametrize(
+    "test_id, columns, expected",
+    [
+        ("0101N", [1, 3, 0], 4),
+        ("0201B", None, -1),
+        ("0202B", [], -1),
+        ("0203B", [1, -1], -1),  # 負のインデックスはすべて分割する
+    ],
+)
+def test_csv_columns_maxsplit_0001X(test_id: str, columns, expected: int) -> None:
+    assert csv_columns_maxsplit(columns) == expected
+
+
+def test_csv_text_chunks_0101N() -> None:
+    chunks = list(csv_text_chunks([["a", "b"], [], ["1", "2"]], flush_rows=2))
+    assert chunks == ["a,b\n\n", "1,2\n"]
+
+
+@pytest.mark.parametrize("flush_rows", [0, -1])
+def test_csv_text_chunks_0201E(flush_rows: int) -> None:  # 結合する行数が1未満
+    with pytest.raises(ValueError):
+        list(csv_text_chunks([["a", "b"]], flush_rows=flush_rows))
+
+
+def test_csv_file_row_writer_0101N(tmp_path) -> None:
+    output_path = tmp_path / "output.csv"
+    csv_file_row_writer(output_path, iter([["a", "b"], ["1", "2"]]), flush_rows=1)
+    assert output_path.read_text(encoding="utf-8") == "a,b\n1,2\n"
+
+
+def test_csv_file_row_writer_0201E(tmp_path) -> None:  # 結合する行数が1未満の場合は、出力ファイルを変更しない
+    output_path = tmp_path / "output.csv"
+    output_path.write_text("x\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        csv_file_row_writer(output_path, iter([["a", "b"]]), flush_rows=0)
+    assert output_path.read_text(encoding="utf-8") == "x\n"
+
+
+def test_csv_batch_reader_0101N() -> None:  # compact。同じ値を共有し、mutable=Falseの場合はタプルにする
+    lines = ["ab,x", "ab,y"]
+    rows = list(csv_batch_reader([lines], compact=True, mutable=False))
+    assert rows == [("ab", "x"), ("ab", "y")]
+    assert rows[0][0] is rows[1][0]
+    rows = list(csv_batch_reader([lines], compact=True))
+    assert rows == [["ab", "x"], ["ab", "y"]]
+
+
+def test_csv_file_reader_0101N(tmp_path) -> None:  # compact,mutable=Falseでもヘッダはリスト
+    input_path = tmp_path / "input.csv"
+    input_path.write_text("h1,h2\nb,1\na,2\n", encoding="utf-8")
+    csv_option.compact = True
+    try:
+        table = csv_file_reader(input_path, header=1, mutable=False)
+    finally:
+        csv_option.compact = False
+    assert table._header_rows == [["h1", "h2"]]
+    assert table._rows == [("b", "1"), ("a", "2")]
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from src.common import split_csv_string_no_normalize
+from src.csv_engine import PARSE_ENGINES, fields_quote_merge, parse_engine_get, parse_lines_auto, parse_lines_stdlib
+
+LINES = [
+    "a,b,c",
+    "",
+    " a , b ",
+    'a,"b1,b2",c',
+    'a,"b1,"",b2"',
+    'a,"b1,b2',
+    'a"b,c"d,e',
+]
+
+
+@pytest.mark.parametrize(
+    "test_id, fields, expected",
+    [
+        ("0101N", ["a", "b"], ["a", "b"]),
+        ("0102N", ["a", '"b1', 'b2"'], ["a", '"b1,b2"']),
+        ("0103N", ['"b1', "", 'b2"', "c"], ['"b1,,b2"', "c"]),
+        ("0201B", ["a", '"b1', "b2"], ["a", '"b1,b2']),  # 閉じるダブルクォートが無い
+    ],
+)
+def test_fields_quote_merge_0001X(test_id: str, fields: list[str], expected: list[str]):
+    assert fields_quote_merge(fields) == expected
+
+
+@pytest.mark.parametrize("engine", list(PARSE_ENGINES.keys()))
+def test_parse_lines_0101N(engine: str):  # 従来版と同一の結果になるか
+    parse_lines = parse_engine_get(engine)
+    for strip in [False, True]:
+        expected = [split_csv_string_no_normalize(line, strip=strip) for line in LINES]
+        assert parse_lines(LINES, strip=strip) == expected
+
+
+@pytest.mark.parametrize("engine", list(PARSE_ENGINES.keys()))
+def test_parse_lines_0102N(engine: str):  # ランダムな文字列で従来版と比較
+    parse_lines = parse_engine_get(engine)
+    rand = random.Random(0)
+    for _ in range(1000):
+        lines = ["".join(rand.choice('ab,," ') for _ in range(rand.randint(0, 200))) for _ in range(4)]
+        assert parse_lines(lines) == [split_csv_string_no_normalize(line) for line in lines]
+
+
+@pytest.mark.parametrize("engine", list(PARSE_ENGINES.keys()))
+def test_parse_lines_0103N(engine: str):  # maxsplit。分割したフィールドは従来版と同一で、残りはそのまま
+    parse_lines = parse_engine_get(engine)
+    for maxsplit in [0, 1, 2, 5]:
+        for line, row in zip(LINES, parse_lines(LINES, maxsplit=maxsplit)):
+            expected = split_csv_string_no_normalize(line)
+            assert row[:maxsplit] == expected[:maxsplit]
+            assert ",".join(row) == line
+            assert len(row) <= maxsplit + 1
+
+
+def test_parse_lines_stdlib_0201A():  # \rを含む行は分割できない
+    with pytest.raises(ValueError):
+        parse_lines_stdlib(["a,b\r"])
+
+
+def test_parse_lines_auto_0201B():  # \rを含む行はpythonエンジンで分割する
+    assert parse_lines_auto(["a,b\r", '"c\r,d"'] * 200) == [["a", "b\r"], ['"c\r,d"']] * 200
+
+
+def test_parse_engine_get_0101A():  # 未知のエンジン
+    with pytest.raises(ValueError):
+        parse_engine_get("unknown")
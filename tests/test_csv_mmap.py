@@ -0,0 +1,98 @@
+from pathlib import Path
+
+import pytest
+
+from src.csv import csv_file_reader
+from src.csv_mmap import MmapRowList, mmap_has_lone_cr, mmap_line_offsets, mmap_row_list_read
+
+CSV_3x3 = b"""\
+a,b,c
+1,"2,2",3
+4,5,6
+"""
+
+
+@pytest.mark.parametrize(
+    "test_id, data, expected",
+    [
+        ("0101N", b"a\nbc\n", [0, 2, 5]),
+        ("0102B", b"a\nbc", [0, 2, 4]),  # 最後の行に改行なし
+        ("0103B", b"", [0]),
+        ("0104N", b"\n\n", [0, 1, 2]),
+    ],
+)
+def test_mmap_line_offsets_0001X(test_id: str, data: bytes, expected: list[int]):
+    for block_size in [1, 2, 1024]:
+        assert list(mmap_line_offsets(data, block_size=block_size)) == expected
+
+
+@pytest.mark.parametrize(
+    "test_id, data, expected",
+    [
+        ("0101N", b"a\r\nb\r\n", False),
+        ("0102N", b"a\rb\r", True),
+        ("0103N", b"a\r\nb\rc", True),  # \r\nと\rの混在
+        ("0104B", b"a\nb", False),
+        ("0105B", b"a\r", True),  # 末尾の\r
+    ],
+)
+def test_mmap_has_lone_cr_0001X(test_id: str, data: bytes, expected: bool):
+    for block_size in [1, 2, 3, 1024]:  # \r\nがブロックの境界をまたぐ
+        assert mmap_has_lone_cr(data, block_size=block_size) == expected
+
+
+def test_mmap_row_list_0101N():  # 参照した行だけ分割する
+    rows = MmapRowList(CSV_3x3, mmap_line_offsets(CSV_3x3))
+    assert len(rows) == 3
+    assert rows[1] == ["1", '"2,2"', "3"]
+    assert len(rows._cache) == 1
+    assert rows[-1] == ["4", "5", "6"]
+    assert list(rows) == [["a", "b", "c"], ["1", '"2,2"', "3"], ["4", "5", "6"]]
+
+
+def test_mmap_row_list_0102N():  # 値の変更を保持する
+    rows = MmapRowList(CSV_3x3, mmap_line_offsets(CSV_3x3))
+    rows[0][0] = "x"
+    for row in rows[1:]:  # スライスは分割済みの行を共有する
+        row[0] = "y"
+    assert [row[0] for row in rows] == ["x", "y", "y"]
+
+
+def test_mmap_row_list_0103N():  # 行の挿入,削除
+    rows = MmapRowList(CSV_3x3, mmap_line_offsets(CSV_3x3))
+    rows.insert(1, ["A"])
+    del rows[0]
+    assert rows.materialized()
+    assert rows == [["A"], ["1", '"2,2"', "3"], ["4", "5", "6"]]
+
+
+def test_mmap_row_list_read_0101N(tmp_path: Path):
+    file = tmp_path / "3x3.csv"
+    file.write_bytes(CSV_3x3.replace(b"\n", b"\r\n"))
+    assert list(mmap_row_list_read(file)) == [["a", "b", "c"], ["1", '"2,2"', "3"], ["4", "5", "6"]]
+
+
+@pytest.mark.parametrize("encoding", ["utf-8-sig", "cp932"])
+def test_mmap_row_list_read_0102N(tmp_path: Path, encoding: str):  # 文字コードの自動判定,BOMの除去
+    file = tmp_path / "3x3.csv"
+    file.write_bytes("あ,い\nう,え\n".encode(encoding))
+    assert list(mmap_row_list_read(file, encoding="auto")) == [["あ", "い"], ["う", "え"]]
+
+
+def test_csv_file_reader_0101N(tmp_path: Path):  # mmapの有無で同じ表になる
+    file = tmp_path / "3x3.csv"
+    file.write_bytes(CSV_3x3)
+    tbl1 = csv_file_reader(file, header=1, use_mmap=True)
+    tbl2 = csv_file_reader(file, header=1, use_mmap=False)
+    assert isinstance(tbl1._rows, MmapRowList)
+    assert tbl1._header_rows == tbl2._header_rows
+    assert list(tbl1._rows) == tbl2._rows
+
+
+def test_csv_file_reader_0201B(tmp_path: Path):  # 改行コードが\rのみの場合はmmapせずに読み込む
+    file = tmp_path / "cr.csv"
+    file.write_bytes(b"b,1\ra,2\r")
+    assert mmap_row_list_read(file) is None
+    tbl = csv_file_reader(file, use_mmap=True)
+    assert not isinstance(tbl._rows, MmapRowList)
+    assert tbl._rows == [["b", "1"], ["a", "2"]]
@@ -0,0 +1,157 @@
+import pytest
+from click.testing import CliRunner
+
+from src.csv import csv_option
+from src.main import cli
+from src.table_backend import TABLE_BACKENDS
+
+
+@pytest.fixture(autouse=True)
+def csv_option_restore():  # グローバルオプションで変更した既定値を元に戻す
+    saved = vars(csv_option).copy()
+    yield
+    vars(csv_option).update(saved)
+
+
+def test_cli_0101N() -> None:  # 標準出力に出力
+    runner = CliRunner()
+    result = runner.invoke(cli, ["column-select", "--column", "[1,0]"], input="a,b\n1,2\n")
+    assert result.exit_code == 0
+    assert result.output == "b,a\n2,1\n"
+
+
+def test_cli_0102N() -> None:  # グローバルオプション
+    runner = CliRunner()
+    global_args = ["--engine", "stdlib", "--flush-rows", "1", "--pipeline", "--queue-size", "1"]
+    args = global_args + ["column-sort", "--column-key", "[0]"]
+    result = runner.invoke(cli, args, input="b,1\na,2\n")
+    assert result.exit_code == 0
+    assert result.output == "a,2\nb,1\n"
+
+
+def test_cli_0103N(tmp_path) -> None:  # 文字コードを判定し、デコードした行でヘッダを判定する
+    (tmp_path / "info").mkdir()
+    (tmp_path / "info" / "jp_header.csv").write_text("名前,住所\n", encoding="utf-8")
+    (tmp_path / "input.csv").write_bytes("名前,住所\n山田,東京\n".encode("cp932"))
+    runner = CliRunner()
+    args = ["--encoding", "auto", "csv-filetype", "--csv-info-dir", str(tmp_path / "info"), str(tmp_path / "input.csv")]
+    result = runner.invoke(cli, args)
+    assert result.exit_code == 0
+    assert "jp" in result.output
+
+
+def test_cli_0104N() -> None:  # --compact。行を変更しないコマンドと変更するコマンド
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--compact", "column-sort", "--column-key", "[0]"], input="b,1\na,2\n")
+    assert result.exit_code == 0
+    assert result.output == "a,2\nb,1\n"
+    result = runner.invoke(cli, ["--compact", "column-quote", "--column", "[0]"], input="b,1\na,2\n")
+    assert result.exit_code == 0
+    assert result.output == '"b",1\n"a",2\n'
+
+
+def test_cli_0105N() -> None:  # column-mergeの--group-by-hash。連続していない行をマージする
+    runner = CliRunner()
+    args = ["column-merge", "--column-key", "[0]", "--column-group", "[1]", "--column-group", "[2]"]
+    input = "k,1,\nj,3,\nk,,2\nj,,4\n"
+    result = runner.invoke(cli, args, input=input)
+    assert result.exit_code == 0
+    assert result.output == input
+    for spill_args in [[], ["--spill-groups", "1"]]:
+        result = runner.invoke(cli, args + ["--group-by-hash"] + spill_args, input=input)
+        assert result.exit_code == 0
+        assert result.output == "k,1,2\nj,3,4\n"
+    result = runner.invoke(cli, args + ["--spill-groups", "1"], input=input)
+    assert result.exit_code != 0
+
+
+def test_cli_0106N() -> None:  # 入れ子のカラムグループ。1回の実行で階層ごとに分割し、マージで元に戻す
+    runner = CliRunner()
+    group_args = ["--column-group", "[[1],[2]]", "--column-group", "[3]"]
+    result = runner.invoke(cli, ["column-exclusive"] + group_args, input="k,1,2,3\n")
+    assert result.exit_code == 0
+    assert result.output == "k,1,,\nk,,2,\nk,,,3\n"
+    result = runner.invoke(cli, ["column-merge", "--column-key", "[0]"] + group_args, input=result.output)
+    assert result.exit_code == 0
+    assert result.output == "k,1,2,3\n"
+    result = runner.invoke(cli, ["column-exclusive", "--column-group", "[[1],2]"], input="k,1,2,3\n")
+    assert result.exit_code != 0
+
+
+@pytest.mark.parametrize(
+    "test_id, args, expected",
+    [
+        ("0107N", ["column-del", "--column", "[0,0]"], "c,d,e\n"),  # 重複したインデックス
+        ("0108N", ["column-del", "--column", "[1,0,2]"], "d,e\n"),
+        ("0109N", ["column-del", "--column", "[3,3]"], "a,b,c\n"),
+        ("0110N", ["column-add", "--column", "[2,2]"], "a,b,,,c,d,e\n"),
+        ("0111N", ["column-add", "--column", "[3,0,3]"], ",a,b,c,,,d,e\n"),
+    ],
+)
+def test_cli_column_split(test_id, args, expected) -> None:  # 必要なカラムまで分割した場合も、すべて分割した場合と同じ結果になるか
+    runner = CliRunner()
+    result = runner.invoke(cli, args, input="a,b,c,d,e\n")
+    assert result.exit_code == 0
+    assert result.output == expected
+
+
+def test_cli_0112N() -> None:  # column-move。空の入力,カラム数が異なる行
+    runner = CliRunner()
+    args = ["column-move", "--from", "[0]", "--to", "[2]"]
+    result = runner.invoke(cli, args, input="")
+    assert result.exit_code == 0
+    assert result.output == ""
+    result = runner.invoke(cli, args, input="a,b,c,d,e\n1,2\n3,4,5,6,7,8\n9\n")
+    assert result.exit_code == 0
+    assert result.output == "b,c,a,d,e\n2,1\n4,5,3,6,7,8\n9\n"
+
+
+@pytest.mark.parametrize("backend", sorted(TABLE_BACKENDS))
+def test_cli_0113B(backend) -> None:  # 空の入力のソート
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--backend", backend, "column-sort", "--column-key", "[0]"], input="")
+    assert result.exit_code == 0
+    assert result.output == ""
+
+
+def test_cli_0114B(tmp_path) -> None:  # --mmap。改行コードが\rのみのファイル
+    input_path = tmp_path / "input.csv"
+    input_path.write_bytes(b"b,1\ra,2\r")
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--mmap", "column-sort", "-i", str(input_path), "--column-key", "[0]"])
+    assert result.exit_code == 0
+    assert result.output == "a,2\nb,1\n"
+
+
+@pytest.mark.parametrize(
+    "test_id, options, expected",
+    [
+        ("0101N", ["--column-if", "1==rock and roll"], "x,rock and roll\n,rock\n,01\n,1.0\n"),  # andは値の一部
+        ("0102N", ["--column-if", "1==1"], ",rock and roll\n,rock\n,01\n,1.0\n"),  # 文字列として比較する
+        ("0103N", ["--column-if", "1==1", "--column-if-typed"], ",rock and roll\n,rock\nx,01\nx,1.0\n"),
+    ],
+)
+def test_cli_column_fill_if(test_id, options, expected) -> None:  # column-fill --column-if
+    runner = CliRunner()
+    args = ["column-fill", "--column", "[0]", "--value", "x", *options]
+    result = runner.invoke(cli, args, input=",rock and roll\n,rock\n,01\n,1.0\n")
+    assert result.exit_code == 0
+    assert result.output == expected
+
+
+def test_cli_0201A() -> None:  # 未知の文字コード
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--encoding", "unknown", "column-select", "--column", "[0]"], input="a\n")
+    assert result.exit_code != 0
+
+
+def test_cli_0202A() -> None:  # ブロックのサイズが1未満
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--block-size", "0", "column-select", "--column", "[0]"], input="a\n")
+    assert result.exit_code != 0
+
+
+def test_cli_0203A() -> None:  # 結合して書き込む行数が1未満
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--flush-rows", "0", "column-select", "--column", "[0]"], input="a\n")
+    assert result.exit_code != 0
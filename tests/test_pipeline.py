@@ -0,0 +1,80 @@
+import io
+import threading
+
+import pytest
+
+from src.pipeline import ThreadWriteStream, iter_batches, thread_reader, thread_writer
+
+
+def test_iter_batches_0101N():
+    assert list(iter_batches(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_iter_batches_0102B():  # 要素なし
+    assert list(iter_batches([], 2)) == []
+
+
+def test_thread_reader_0101N():
+    assert list(thread_reader(iter(range(100)), maxsize=1)) == list(range(100))
+
+
+def test_thread_reader_0102A():  # 読み込みスレッドの例外を再送出する
+    def items():
+        yield 1
+        raise ValueError("read error")
+
+    reader = thread_reader(items())
+    assert next(reader) == 1
+    with pytest.raises(ValueError, match="read error"):
+        next(reader)
+
+
+def test_thread_reader_0103B():  # 途中で終了した場合は読み込みスレッドも終了する
+    reader = thread_reader(iter(range(1000)), maxsize=1)
+    assert next(reader) == 0
+    reader.close()
+    assert [t for t in threading.enumerate() if t.name == "thread_reader"] == []
+
+
+def test_thread_writer_0101N():
+    result: list[int] = []
+    thread_writer(result.extend, iter(range(100)), maxsize=1)
+    assert result == list(range(100))
+
+
+def test_thread_writer_0102A():  # 書き込みスレッドの例外を再送出する
+    def consume(items):
+        for item in items:
+            if item == 3:
+                raise ValueError("write error")
+
+    with pytest.raises(ValueError, match="write error"):
+        thread_writer(consume, iter(range(100)), maxsize=1)
+
+
+def test_thread_writer_0103A():  # 呼び出し側の例外。追加済みの要素は処理する
+    def items():
+        yield 1
+        raise ValueError("transform error")
+
+    result: list[int] = []
+    with pytest.raises(ValueError, match="transform error"):
+        thread_writer(result.extend, items())
+    assert result == [1]
+
+
+def test_thread_write_stream_0101N():
+    o_stream = io.BytesIO()
+    with ThreadWriteStream(o_stream, maxsize=1) as stream:
+        for i in range(100):
+            stream.write(b"%d," % i)
+    assert o_stream.getvalue() == b"".join(b"%d," % i for i in range(100))
+
+
+def test_thread_write_stream_0102A():  # 書き込みスレッドの例外をclose()で再送出する
+    o_stream = io.BytesIO()
+    o_stream.close()
+    stream = ThreadWriteStream(o_stream)
+    stream.write(b"a")
+    with pytest.raises(ValueError):
+        stream.close()
@@ -1,8 +1,11 @@
-# import pytest
 import copy
 import io
+import random
 
-from src.table import Table
+import pytest
+
+from src.table import Table, TableView, column_move_permutation
+from src.table_utl import column_quote
 
 TABLE_3x3 = [["a", "b", "c"], ["1", "2", "3"], ["4", "5", "6"]]
 
@@ -151,3 +154,126 @@ def test_table_select_column_range_0101N():
     assert tbl._rows[0] == ["b"]
     assert tbl._rows[1] == ["2"]
     assert tbl._rows[2] == ["5"]
+
+
+def test_table_select_column_list_0101N():  # 抽出した表は元の表と独立している
+    tbl = Table.create_rows(copy.deepcopy(TABLE_3x3))
+    selected = tbl.table_select_column_list([2, 0])
+    ranged = tbl.table_select_column_range(1, 3)
+    assert type(selected) is Table and type(ranged) is Table
+    column_quote(tbl, 0)
+    tbl.row_add(["7", "8", "9"])
+    assert selected._rows == [["c", "a"], ["3", "1"], ["6", "4"]]
+    assert ranged._rows == [["b", "c"], ["2", "3"], ["5", "6"]]
+
+
+def test_table_view_column_list_0101N():  # 行を複製しないビュー
+    tbl = Table.create_rows(copy.deepcopy(TABLE_3x3))
+    view = tbl.table_view_column_list([2, 0])
+    assert type(view) is TableView
+    assert view.row_count() == 3
+    assert view.column_count() == 2
+    assert [list(row) for row in view.row_values()] == [["c", "a"], ["3", "1"], ["6", "4"]]
+    assert view.column_map(0, str.upper) == ["C", "3", "6"]
+    assert view.table_view_column_list([1])._parent is tbl  # ビューの抽出は親の表を参照する
+    assert view.materialized() == False
+
+
+def test_table_view_column_list_0102N():  # 変更した時点で行を複製する
+    tbl = Table.create_rows(copy.deepcopy(TABLE_3x3))
+    view = tbl.table_view_column_list([2, 0])
+    view.column_insert_empty(0)
+    view.row_remove(1)
+    assert view.materialized() == True
+    assert view._rows == [["", "c", "a"], ["", "6", "4"]]
+    assert tbl._rows == TABLE_3x3
+    range_view = tbl.table_view_column_range(1, 3)
+    assert range_view.column_count() == 2
+    range_view._rows[0][0] = "X"
+    assert [list(row) for row in range_view.row_values()] == [["X", "c"], ["2", "3"], ["5", "6"]]
+    assert tbl._rows == TABLE_3x3
+
+
+def test_table_view_column_list_0103N():  # 空の表
+    view = Table().table_view_column_list([1, 0])
+    assert view.row_count() == 0
+    assert view.column_count() == 0
+    assert list(view.row_values()) == []
+
+
+@pytest.mark.parametrize(
+    "test_id, column_index_list, column_count",
+    [
+        ("0101N", [1], 1),
+        ("0102N", [0, -1, 1], 2),
+        ("0103N", [1, 1], 1),  # 同じインデックス
+        ("0104B", [5, 0], 1),  # カラム数より大きいインデックス
+        ("0105B", [-2], 3),  # -1以外の負のインデックス
+    ],
+)
+def test_table_column_add_multi_0001X(test_id: str, column_index_list: list[int], column_count: int):
+    # table_column_add()をインデックスの大きい順に実行した場合と同じになるか
+    expected = Table.create_rows(copy.deepcopy(TABLE_3x3))
+    for column_index in sorted(column_index_list, reverse=True):
+        expected.table_column_add(column_index, column_count=column_count)
+    tbl = Table.create_rows(copy.deepcopy(TABLE_3x3))
+    tbl.table_column_add_multi(column_index_list, column_count=column_count)
+    assert tbl._rows == expected._rows
+
+
+@pytest.mark.parametrize(
+    "test_id, column_index_list",
+    [
+        ("0101N", [1]),
+        ("0102N", [0, 2]),
+        ("0103N", [1, 1]),  # 同じインデックス。削除後の同じ位置のカラムも削除される
+        ("0104N", [0, -1]),  # 負のインデックス
+        ("0105N", [2, 1, 0]),
+    ],
+)
+def test_table_column_del_multi_0001X(test_id: str, column_index_list: list[int]):
+    # table_column_del()をインデックスの大きい順に実行した場合と同じになるか
+    expected = Table.create_rows(copy.deepcopy(TABLE_3x3))
+    for column_index in sorted(column_index_list, reverse=True):
+        expected.table_column_del(column_index)
+    tbl = Table.create_rows(copy.deepcopy(TABLE_3x3))
+    tbl.table_column_del_multi(column_index_list)
+    assert tbl._rows == expected._rows
+
+
+def test_table_column_del_multi_0002E():  # 範囲外のインデックス
+    tbl = Table.create_rows(copy.deepcopy(TABLE_3x3))
+    with pytest.raises(IndexError):
+        tbl.table_column_del_multi([3])
+
+
+def test_column_move_permutation_0101N():  # column_remove(),column_insert()で移動した場合と同じになるか
+    rand = random.Random(0)
+    for _ in range(1000):
+        column_count = rand.randint(1, 6)
+        from_index_list = rand.sample(range(column_count), rand.randint(1, column_count))
+        to_index_list = [rand.randint(0, column_count - len(from_index_list)) for _ in from_index_list]
+        expected = Table.create_rows([[str(i) for i in range(column_count)]])
+        removed = []
+        for order, from_index in sorted(enumerate(from_index_list), key=lambda x: x[1], reverse=True):
+            removed.append((to_index_list[order], order, expected.column_remove(from_index)))
+        for to_index, _order, column in sorted(removed, key=lambda x: (x[0], x[1]), reverse=True):
+            expected.column_insert(to_index, column)
+        permutation = column_move_permutation(from_index_list, to_index_list, column_count)
+        assert [str(i) for i in permutation] == expected._rows[0]
+
+
+@pytest.mark.parametrize(
+    "test_id, column_index_list, expected",
+    [
+        ("0101N", [2, 0, 1], [["c", "a", "b"], ["3", "1", "2"], ["6", "4", "5"]]),
+        ("0102N", [1], [["b"], ["2"], ["5"]]),  # 1カラム
+        ("0103N", [0, 0], [["a", "a"], ["1", "1"], ["4", "4"]]),  # 同じインデックス
+        ("0104B", [], [[], [], []]),
+    ],
+)
+def test_table_permute_columns_0001X(test_id: str, column_index_list: list[int], expected: list[list[str]]):
+    tbl = Table.create_rows(copy.deepcopy(TABLE_3x3))
+    tbl.table_permute_columns(column_index_list)
+    assert tbl._rows == expected
+    assert all(type(row) is list for row in tbl._rows)
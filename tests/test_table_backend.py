@@ -0,0 +1,49 @@
+import pytest
+
+from src.table_utl import table_sort
+from tests.table_cases import (
+    TABLE_BACKEND_CLASSES,
+    TABLE_OPERATIONS,
+    TABLE_PROCESSES,
+    TABLE_3x3,
+    table_values,
+    tables_create,
+)
+
+pytestmark = pytest.mark.parametrize("table_class", TABLE_BACKEND_CLASSES, ids=lambda cls: cls.__name__)
+
+
+@pytest.mark.parametrize("test_id, operation", TABLE_OPERATIONS)
+def test_table_backend_0001X(table_class, test_id: str, operation):  # 行指向の表と同じ結果になるか
+    row_table, table = tables_create(table_class, TABLE_3x3)
+    expected = operation(row_table)
+    result = operation(table)
+    assert result == expected
+    assert table_values(table) == table_values(row_table)
+    assert table.row_count() == row_table.row_count()
+    assert table.column_count() == row_table.column_count()
+
+
+def test_table_backend_0002N(table_class):  # table_utlの処理
+    rows = [list(row) for row in [["k", "1", ""], ["k", "", "2"], ["j", "3", "4"], ["i", "", ""], ["i", "5", "6"]] * 3]
+    for process in TABLE_PROCESSES:
+        row_table, table = tables_create(table_class, rows)
+        process(row_table)
+        process(table)
+        assert table_values(table) == table_values(row_table)
+
+
+def test_table_backend_0003B(table_class):  # 空の表のソート
+    table = table_class.create_rows([])
+    assert table.column_map(0, str) == []
+    table_sort(table, [0], ["str"])
+    table_sort(table, [0], ["int"], reverse=True)
+    assert table.row_count() == 0
+
+
+def test_table_backend_0004B(table_class):  # NaNを含むカラムのソート
+    rows = [[value, key] for value in ["nan", "1", "NaN", "0"] for key in ["b", "a", "c"]] * 3
+    row_table, table = tables_create(table_class, rows)
+    table_sort(row_table, [0, 1], ["float", "str"])
+    table_sort(table, [0, 1], ["float", "str"])
+    assert table_values(table) == table_values(row_table)
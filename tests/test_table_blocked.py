@@ -0,0 +1,67 @@
+import copy
+import random
+
+import pytest
+
+from src.table import Table
+from src.table_blocked import BlockedRowList, BlockedTable
+from src.table_utl import column_exclusive_index_group, column_merge_index_group, table_sort
+
+
+def test_blocked_row_list_0101N():  # ランダムな操作でlistと比較
+    rand = random.Random(0)
+    expected: list[int] = list(range(20))
+    rows = BlockedRowList(expected, block_size=4)
+    for i in range(2000):
+        operation = rand.randrange(7)
+        index = rand.randint(-len(expected) - 2, len(expected) + 2)
+        if operation == 0:
+            expected.insert(index, i)
+            rows.insert(index, i)
+        elif operation == 1 and len(expected) > 0:
+            index = rand.randrange(-len(expected), len(expected))
+            assert rows.pop(index) == expected.pop(index)
+        elif operation == 2:
+            start, stop = sorted([rand.randint(0, len(expected)), rand.randint(0, len(expected))])
+            del expected[start:stop]
+            del rows[start:stop]
+        elif operation == 3:
+            expected.append(i)
+            rows.append(i)
+        elif operation == 4 and len(expected) > 0:
+            index = rand.randrange(-len(expected), len(expected))
+            expected[index] = i
+            rows[index] = i
+        elif operation == 5:
+            start, stop = sorted([rand.randint(0, len(expected)), rand.randint(0, len(expected))])
+            assert rows[start:stop] == expected[start:stop]
+        elif operation == 6:
+            expected.extend([i, i])
+            rows.extend([i, i])
+        assert len(rows) == len(expected)
+        assert list(rows) == expected
+    assert rows[::2] == expected[::2]
+
+
+def test_blocked_row_list_0102B():  # 範囲外のインデックス
+    rows = BlockedRowList([1, 2])
+    for index in [2, -3]:
+        with pytest.raises(IndexError):
+            rows[index]
+    assert BlockedRowList()[0:5] == []
+
+
+def test_blocked_table_0101N():  # table_utlの処理が行指向の表と同じ結果になるか
+    rows = [["k", "1", ""], ["k", "", "2"], ["j", "3", "4"], ["i", "", ""], ["i", "5", "6"]] * 3
+    for process in [
+        lambda tbl: column_exclusive_index_group(tbl, [[1], [2]]),
+        lambda tbl: column_merge_index_group(tbl, [0], [[1], [2]]),
+        lambda tbl: table_sort(tbl, [0], ["str"]),
+        lambda tbl: tbl.row_remove_multi(2, 7),
+        lambda tbl: tbl.row_duplicate(3),
+    ]:
+        row_table = Table.create_rows(copy.deepcopy(rows))
+        blocked_table = BlockedTable.create_rows(BlockedRowList(copy.deepcopy(rows), block_size=2))
+        assert process(blocked_table) == process(row_table)
+        assert list(blocked_table.row_values()) == list(row_table.row_values())
+        assert type(blocked_table._rows) is BlockedRowList
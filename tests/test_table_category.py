@@ -0,0 +1,82 @@
+import copy
+
+import pytest
+
+from src.csv import csv_rows_to_table
+from src.table import Table
+from src.table_category import CategoryColumn, CategoryTable
+from src.table_utl import column_fill_index, column_merge_index_group, table_sort
+from tests.table_cases import table_values
+
+ROWS = [["k", "1", "x"], ["k", "", "y"], ["j", "1", "x"], ["i", "", "x"]]
+
+
+def test_category_column_0101N():
+    column = CategoryColumn(["a", "b", "a"])
+    assert list(column) == ["a", "b", "a"]
+    assert column.dictionary_size() == 2
+    assert column[0] is column[2]  # 同じ値は同じオブジェクト
+    column[1] = "c"
+    column.insert(0, "a")
+    column.append("b")
+    del column[1]
+    assert list(column) == ["a", "c", "a", "b"]
+    assert column.map(str.upper) == ["A", "C", "A", "B"]
+    assert list(column.take([3, 0])) == ["b", "a"]
+
+
+def test_category_column_0102N():  # 複製は辞書を共有し、符号は共有しない
+    column = CategoryColumn(["a", "b"])
+    copied = column.copy()
+    copied[0] = "c"
+    assert list(column) == ["a", "b"]
+    assert list(copied) == ["c", "b"]
+    assert column.dictionary_size() == 3
+
+
+def test_category_table_0101N():  # 値の種類が多い列はリストの列になる
+    table = CategoryTable.create_rows([[str(i), "a"] for i in range(10)])
+    assert type(table._columns[0]) is list
+    assert type(table._columns[1]) is CategoryColumn
+    assert table_values(table) == [[str(i), "a"] for i in range(10)]
+
+
+def test_category_table_0102N(monkeypatch):  # table_utlの処理が行指向の表と同じ結果になるか
+    monkeypatch.setattr("src.table_category.CATEGORY_DISTINCT_RATIO", 1.0)  # すべての列を辞書符号化する
+    for process in [
+        lambda tbl: column_merge_index_group(tbl, [0], [[1], [2]]),
+        lambda tbl: column_fill_index(tbl, 1, "ffill", ""),
+        lambda tbl: table_sort(tbl, [0, 1], ["str", "str"], reverse=True),
+        lambda tbl: tbl.table_column_add_multi([1, -1]),
+        lambda tbl: tbl.table_permute_columns([2, 0]),
+    ]:
+        row_table = Table.create_rows(copy.deepcopy(ROWS))
+        category_table = CategoryTable.create_rows(copy.deepcopy(ROWS))
+        assert all(type(column) is CategoryColumn for column in category_table._columns)
+        process(row_table)
+        process(category_table)
+        assert table_values(category_table) == table_values(row_table)
+
+
+def test_csv_rows_to_table_0101N():  # 読み込みながら表に追加する
+    rows = [["h1", "h2"]] + [[str(i % 3), "a"] for i in range(10000)]
+    table = csv_rows_to_table(iter(copy.deepcopy(rows)), header=1, backend="category")
+    assert type(table) is CategoryTable
+    assert table._header_rows == rows[:1]
+    assert table_values(table) == rows[1:]
+
+
+def test_csv_rows_to_table_0102B():  # 途中にカラム数が異なる行がある場合は行指向の表になる
+    rows = [["a", "b"]] * 5000 + [["c"]] + [["d", "e"]] * 10
+    table = csv_rows_to_table(iter(copy.deepcopy(rows)), backend="category")
+    assert type(table) is Table
+    assert table_values(table) == rows
+
+
+def test_csv_rows_to_table_0103E():  # 読み込み中の例外は表の実装の切り替えで隠さない
+    def rows():
+        yield ["a", "b"]
+        raise ValueError("read error")
+
+    with pytest.raises(ValueError, match="read error"):
+        csv_rows_to_table(rows(), backend="columns")
@@ -0,0 +1,50 @@
+import copy
+
+import pytest
+
+from src.csv import csv_rows_to_table
+from src.table import Table
+from src.table_column import ColumnTable
+from tests.table_cases import TABLE_3x3, table_values, tables_create
+
+
+def test_column_table_0002N():  # 列の抽出
+    row_table, column_table = tables_create(ColumnTable, TABLE_3x3)
+    expected = row_table.table_select_column_list([2, 0])
+    assert table_values(column_table.table_select_column_list([2, 0])) == table_values(expected)
+    expected = row_table.table_select_column_range(1, 3)
+    assert table_values(column_table.table_select_column_range(1, 3)) == table_values(expected)
+
+
+def test_column_table_0003N():  # 行のビューの変更が列に反映される
+    _, column_table = tables_create(ColumnTable, TABLE_3x3)
+    row = column_table._rows[1]
+    row[0] = "X"
+    row[1:] = ["Y", "Z"]
+    assert column_table._columns == [["a", "X", "4"], ["b", "Y", "5"], ["c", "Z", "6"]]
+    with pytest.raises(TypeError):
+        row.append("W")  # 行の長さは変更できない
+
+
+def test_column_table_0004N():  # 空の行はカラム数分の空文字になる
+    _, column_table = tables_create(ColumnTable, TABLE_3x3)
+    column_table.row_insert_empty(1)
+    assert table_values(column_table)[1] == ["", "", ""]
+
+
+def test_column_table_0005B():  # カラム数が異なる行
+    with pytest.raises(ValueError):
+        ColumnTable.create_rows([["a", "b"], ["1"]])
+    table = csv_rows_to_table([["a", "b"], ["1"]], backend="columns")  # 行指向の表になる
+    assert type(table) is Table
+    table = csv_rows_to_table(copy.deepcopy(TABLE_3x3), header=1, backend="columns")
+    assert type(table) is ColumnTable
+    assert table._header_rows == [["a", "b", "c"]]
+    assert table_values(table) == TABLE_3x3[1:]
+
+
+def test_column_table_0007N():  # 同じ列を複数回指定した場合は別の列になる
+    _, column_table = tables_create(ColumnTable, TABLE_3x3)
+    column_table.table_permute_columns([0, 0])
+    column_table._rows[0][0] = "X"
+    assert table_values(column_table)[0] == ["X", "a"]
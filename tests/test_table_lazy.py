@@ -0,0 +1,142 @@
+import copy
+import random
+
+import pytest
+
+from src.table import Table
+from src.table_column import ColumnTable
+from src.table_lazy import LazyTable, layout_column_index_list
+from src.table_utl import column_quote, rows_column_add, rows_column_quote, rows_column_replace, table_sort
+from tests.table_cases import TABLE_3x3, table_values
+
+COLUMN_OPERATIONS = [
+    lambda tbl: tbl.column_insert_empty(1),
+    lambda tbl: tbl.column_insert_empty(-1),
+    lambda tbl: tbl.column_move(0, 2),
+    lambda tbl: tbl.column_move(-1, 0),
+    lambda tbl: tbl.table_column_add(1, column_count=2),
+    lambda tbl: tbl.table_column_add(-1),
+    lambda tbl: tbl.table_column_del(0),
+    lambda tbl: tbl.table_column_add_multi([0, -1, 1]),
+    lambda tbl: tbl.table_column_del_multi([0, 1]),
+    lambda tbl: tbl.table_permute_columns([1, 0, 1, 2]),
+    lambda tbl: tbl.rows_transform(lambda rows: rows_column_quote(rows, [0])),
+    lambda tbl: tbl.rows_transform(lambda rows: rows_column_replace(rows, [1], "[0-9]", "N")),
+    lambda tbl: tbl.rows_transform(lambda rows: rows_column_add(rows, [0])),
+]
+
+
+@pytest.mark.parametrize(
+    "test_id, operation",
+    [
+        ("0101N", lambda tbl: tbl.column_insert_empty(1)),
+        ("0102N", lambda tbl: tbl.column_move(0, 2)),
+        ("0103N", lambda tbl: tbl.table_column_add(1, column_count=2)),
+        ("0104N", lambda tbl: tbl.table_column_add(-1)),
+        ("0105N", lambda tbl: tbl.table_column_del(-1)),
+        ("0106N", lambda tbl: tbl.table_column_add_multi([0, -1], column_count=2)),
+        ("0107N", lambda tbl: tbl.table_column_del_multi([0, 2])),
+        ("0108N", lambda tbl: tbl.table_permute_columns([2, 2, 0])),
+        ("0109N", lambda tbl: tbl.rows_transform(lambda rows: rows_column_quote(rows, [1]))),
+    ],
+)
+def test_lazy_table(test_id, operation):  # 行指向の表と同じ結果になるか
+    table = Table.create_rows(copy.deepcopy(TABLE_3x3))
+    lazy_table = LazyTable.create_rows(copy.deepcopy(TABLE_3x3))
+    operation(table)
+    operation(lazy_table)
+    assert lazy_table.materialized() == False
+    assert lazy_table.column_count() == table.column_count()
+    assert lazy_table.row_count() == table.row_count()
+    assert table_values(lazy_table) == table_values(table)
+    assert lazy_table.materialized() == True
+
+
+def test_lazy_table_0201N():  # ランダムな操作の連続で行指向の表と比較
+    rand = random.Random(0)
+    rows = [[f"{r}-{c}" for c in range(6)] for r in range(10)]
+    for _ in range(200):
+        table = Table.create_rows(copy.deepcopy(rows))
+        lazy_table = LazyTable.create_table(Table.create_rows(copy.deepcopy(rows)))
+        for operation in rand.choices(COLUMN_OPERATIONS, k=rand.randint(1, 6)):
+            operation(table)
+            operation(lazy_table)
+        assert lazy_table.column_count() == table.column_count()
+        assert table_values(lazy_table) == table_values(table)
+
+
+def test_lazy_table_0202N():  # カラム数が異なる行
+    rows = [["a", "b", "c"], ["1"], ["2", "3"]]
+    table = Table.create_rows(copy.deepcopy(rows))
+    lazy_table = LazyTable.create_rows(copy.deepcopy(rows))
+    for tbl in [table, lazy_table]:
+        tbl.table_column_add(0)
+        tbl.table_column_del(-1)
+    assert table_values(lazy_table) == table_values(table) == [["", "a", "b"], [""], ["", "2"]]
+
+
+def test_lazy_table_0203N():  # 元の表は実行するまで変更せず、実行後は同じ種類の表になる
+    source = ColumnTable.create_rows(copy.deepcopy(TABLE_3x3))
+    lazy_table = LazyTable.create_table(source)
+    lazy_table.rows_transform(lambda rows: rows_column_quote(rows, [0]))
+    lazy_table.column_move(0, 2)
+    assert table_values(source) == TABLE_3x3
+    assert table_values(lazy_table) == [["b", "c", '"a"'], ["2", "3", '"1"'], ["5", "6", '"4"']]
+    assert table_values(source) == TABLE_3x3
+    assert type(lazy_table._source) is ColumnTable
+
+
+def test_lazy_table_0204N():  # 抽出した表は元の表と記録した操作を共有する
+    lazy_table = LazyTable.create_rows(copy.deepcopy(TABLE_3x3))
+    lazy_table.table_column_add(0)
+    selected = lazy_table.table_select_column_list([1, 0])
+    lazy_table.table_column_del(1)
+    assert type(selected) is LazyTable
+    assert table_values(selected) == [["a", ""], ["1", ""], ["4", ""]]
+    assert table_values(lazy_table) == [["", "b", "c"], ["", "2", "3"], ["", "5", "6"]]
+    ranged = lazy_table.table_select_column_range(1, 3)
+    assert table_values(ranged) == [["b", "c"], ["2", "3"], ["5", "6"]]
+
+
+def test_lazy_table_0205N():  # 行の参照,並べ替えは記録した操作を実行してから行う
+    lazy_table = LazyTable.create_rows(copy.deepcopy(TABLE_3x3))
+    lazy_table.column_move(0, 2)
+    table_sort(lazy_table, [2], ["str"], reverse=True)
+    assert lazy_table.materialized() == True
+    assert lazy_table.row_remove(0) == ["b", "c", "a"]
+    lazy_table.table_column_del(0)
+    lazy_table.row_add_multi([["x", "y"]])
+    assert table_values(lazy_table) == [["6", "4"], ["3", "1"], ["x", "y"]]
+
+
+def test_lazy_table_0206N():  # 記録した操作がなくても、元の表は変更しない
+    source = Table.create_rows(copy.deepcopy(TABLE_3x3))
+    lazy_table = LazyTable.create_table(source)
+    column_quote(lazy_table, 0)
+    lazy_table.row_add_multi([["x", "y", "z"]])
+    table_sort(lazy_table, [1], ["str"], reverse=True)
+    assert source._rows == TABLE_3x3
+    assert table_values(lazy_table) == [["x", "y", "z"], ['"a"', "b", "c"], ['"4"', "5", "6"], ['"1"', "2", "3"]]
+
+
+def test_lazy_table_0207N():  # 抽出した表は、抽出後の元の表の変更の影響を受けない
+    lazy_table = LazyTable.create_rows(copy.deepcopy(TABLE_3x3))
+    selected = lazy_table.table_select_column_list([1])
+    lazy_table.row_add_multi([["x", "y", "z"]])
+    column_quote(lazy_table, 1)
+    assert table_values(selected) == [["b"], ["2"], ["5"]]
+    selected.row_add_multi([["w"]])
+    assert table_values(lazy_table) == [["a", '"b"', "c"], ["1", '"2"', "3"], ["4", '"5"', "6"], ["x", '"y"', "z"]]
+    assert table_values(selected) == [["b"], ["2"], ["5"], ["w"]]
+
+
+def test_lazy_table_0301E():  # 記録した操作のエラーは実行した時点で発生する
+    lazy_table = LazyTable.create_rows(copy.deepcopy(TABLE_3x3))
+    lazy_table.table_column_del(5)
+    with pytest.raises(IndexError):
+        lazy_table.row_values()
+
+
+def test_layout_column_index_list_0101N():
+    operations = [("table_column_add", (0,), {"column_count": 1}), ("column_move", (1, 2), {})]
+    assert layout_column_index_list(operations, 3) == [3, 1, 0, 2]
@@ -0,0 +1,104 @@
+import copy
+import random
+
+import pytest
+
+from src.csv import csv_rows_to_table
+from src.table import Table
+from src.table_sqlite import SqliteTable
+from src.table_utl import table_sort
+from tests.table_cases import TABLE_3x3, table_values, tables_create
+
+
+def test_sqlite_table_0002N():  # 行のビューの変更がデータベースに反映される
+    _, sqlite_table = tables_create(SqliteTable, TABLE_3x3)
+    row = sqlite_table._rows[1]
+    row[0] = "X"
+    row[1:] = ["Y", "Z"]
+    sqlite_table.table_permute_columns([0, 0, 1])
+    sqlite_table._rows[0][0] = "W"  # 同じ列を複数回指定した場合は別の列になる
+    assert table_values(sqlite_table) == [["W", "a", "b"], ["X", "X", "Y"], ["4", "4", "5"]]
+    with pytest.raises(TypeError):
+        row.append("W")  # 行の長さは変更できない
+
+
+@pytest.mark.parametrize(
+    "test_id, column_key_list, column_attr, reverse",
+    [
+        ("0101N", [0], ["int"], False),
+        ("0102N", [1, 0], ["float", "int"], True),
+        ("0103N", [2, 0], ["str", "int"], False),
+        ("0104N", [2], ["str"], True),
+    ],
+)
+def test_sqlite_table_sort(test_id, column_key_list, column_attr, reverse):  # データベースでソートする
+    rand = random.Random(0)
+    rows = [
+        [
+            str(rand.randint(-3, 3)),
+            str(rand.choice([0.5, -0.0, 0.0, 1e20])),
+            rand.choice(["b", "a", "B", "あ", ""]),
+            str(i),
+        ]
+        for i in range(200)
+    ]
+    row_table, sqlite_table = tables_create(SqliteTable, rows)
+    table_sort(row_table, column_key_list, column_attr, reverse=reverse)
+    assert sqlite_table.table_sort_sql(column_key_list, column_attr, reverse=reverse) == True
+    assert table_values(sqlite_table) == table_values(row_table)
+
+
+def test_sqlite_table_sort_0201E():  # データベースでソートできない場合は、行指向の表と同じ例外
+    rows = [["1"], ["x"], ["2"]]
+    _, sqlite_table = tables_create(SqliteTable, rows)
+    assert sqlite_table.table_sort_sql([0], ["int"]) == False
+    with pytest.raises(ValueError):
+        table_sort(sqlite_table, [0], ["int"])
+    _, sqlite_table = tables_create(SqliteTable, [[str(2**70)], ["1"]])  # SQLiteの整数に収まらない
+    table_sort(sqlite_table, [0], ["int"])
+    assert table_values(sqlite_table) == [["1"], [str(2**70)]]
+
+
+def test_sqlite_table_0004B():  # カラム数が異なる行,空の表
+    with pytest.raises(ValueError):
+        SqliteTable.create_rows([["a", "b"], ["1"]])
+    table = csv_rows_to_table([["a", "b"], ["1"]], backend="sqlite")  # 行指向の表になる
+    assert type(table) is Table
+    table = csv_rows_to_table(copy.deepcopy(TABLE_3x3), header=1, backend="sqlite")
+    assert type(table) is SqliteTable
+    assert table._header_rows == [["a", "b", "c"]]
+    assert table_values(table) == TABLE_3x3[1:]
+    empty = SqliteTable()
+    assert empty.row_count() == 0 and empty.column_count() == 0
+    assert list(empty.row_values()) == []
+
+
+def test_sqlite_table_0005N():  # 行の変換は新しいデータベースに書き込む
+    _, sqlite_table = tables_create(SqliteTable, TABLE_3x3)
+    sqlite_table.table_permute_rows([2, 0, 1])
+    sqlite_table.rows_transform(lambda rows: ([row[0] + "!", *row] for row in rows))
+    assert table_values(sqlite_table) == [["4!", "4", "5", "6"], ["a!", "a", "b", "c"], ["1!", "1", "2", "3"]]
+
+
+def test_sqlite_table_0006N():  # カラムの追加,削除を繰り返しても物理カラムは増え続けない
+    _, sqlite_table = tables_create(SqliteTable, TABLE_3x3)
+    for _ in range(3000):  # SQLiteの表のカラム数の上限(2000)を超える回数
+        sqlite_table.table_column_add(0)
+        sqlite_table.table_column_del(0)
+        sqlite_table.table_permute_columns([0, 1, 2, 0])  # 複製したカラム
+        sqlite_table.table_column_del_multi([3])
+        sqlite_table.table_column_add(-1)
+        sqlite_table.column_remove(-1)
+    assert table_values(sqlite_table) == TABLE_3x3
+    assert sqlite_table._column_next <= 5
+
+
+def test_sqlite_table_0007N():  # 同じ行を複数回指定した並べ替えは行を複製する
+    _, sqlite_table = tables_create(SqliteTable, TABLE_3x3)
+    sqlite_table.table_permute_rows([2, 2, 0])
+    sqlite_table._rows[0][0] = "X"
+    assert table_values(sqlite_table) == [["X", "5", "6"], ["4", "5", "6"], ["a", "b", "c"]]
+    assert sqlite_table.row_remove(1) == ["4", "5", "6"]
+    assert table_values(sqlite_table) == [["X", "5", "6"], ["a", "b", "c"]]
+    (count,) = sqlite_table._connection.execute("SELECT count(*) FROM t").fetchone()
+    assert count == 2  # 並べ替えで指定しなかった行は削除する
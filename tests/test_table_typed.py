@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from src.table import Table
+from src.table_typed import TYPED_ROWS_MIN, table_sort_index_typed, typed_column_create
+from src.table_utl import table_sort
+
+pytest.importorskip("numpy")
+
+
+def rows_create(row_count: int) -> list[list[str]]:
+    rand = random.Random(0)
+    return [
+        [
+            str(rand.randint(-5, 5)),
+            f"{rand.choice([-1.5, 0.0, -0.0, 2.25, 1e20])}",
+            rand.choice(["b", "a", "B", "あ"]),
+            str(i),
+        ]
+        for i in range(row_count)
+    ]
+
+
+@pytest.mark.parametrize(
+    "test_id, column_index_list, column_attr, reverse",
+    [
+        ("0101N", [0], ["int"], False),
+        ("0102N", [0], ["int"], True),
+        ("0103N", [1, 0], ["float", "int"], False),
+        ("0104N", [2, 1], ["str", "float"], True),
+        ("0105N", [0, 2, 1], ["int", "str", "float"], False),
+    ],
+)
+def test_table_sort_index_typed(test_id, column_index_list, column_attr, reverse):  # sorted()と同じ順序になるか
+    rows = rows_create(TYPED_ROWS_MIN * 2)
+    convert_funcs = {"str": str, "int": int, "float": float}
+    expected = sorted(
+        range(len(rows)),
+        key=lambda i: tuple(convert_funcs[a](rows[i][c]) for c, a in zip(column_index_list, column_attr)),
+        reverse=reverse,
+    )
+    tbl = Table.create_rows(rows)
+    assert table_sort_index_typed(tbl, column_index_list, column_attr, reverse=reverse) == expected
+
+
+def test_table_sort_index_typed_0201N():  # 型付きの列を使用しない場合
+    rows = rows_create(TYPED_ROWS_MIN)
+    tbl = Table.create_rows(rows)
+    assert table_sort_index_typed(tbl, [2], ["str"]) is None  # 数値のカラムがない
+    assert table_sort_index_typed(Table.create_rows(rows[:10]), [0], ["int"]) is None  # 行数が少ない
+    assert table_sort_index_typed(tbl, [0], ["date"]) is None  # 不明な属性
+    rows[5][0] = str(2**70)  # int64に収まらない
+    assert table_sort_index_typed(tbl, [0], ["int"]) is None
+    rows[5][0] = ""  # 空のセル
+    column = typed_column_create(tbl, 0, "int")
+    assert column is not None and column.mask.tolist().index(True) == 5
+    assert table_sort_index_typed(tbl, [0], ["int"]) is None
+
+
+def test_table_sort_0101E():  # 数値に変換できない値はソートしない
+    rows = rows_create(TYPED_ROWS_MIN)
+    rows[3][1] = "x"
+    tbl = Table.create_rows(rows)
+    with pytest.raises(ValueError):
+        table_sort(tbl, [1], ["float"])
+    rows[3][1] = ""
+    with pytest.raises(ValueError):
+        table_sort(tbl, [1], ["float"])
+    assert tbl._rows[3][3] == "3"
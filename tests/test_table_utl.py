@@ -1,14 +1,30 @@
-# import pytest
 import copy
 import io
+import random
+
+import pytest
 
 # from src.csv import csv_reader
 from src.table import Table
 from src.table_utl import (
     column_exclusive_index_group,
     column_fill_index,
+    column_group_levels,
+    column_if_compile,
     column_merge_index_group,
     column_quote,
+    rows_column_add,
+    rows_column_del,
+    rows_column_exclusive,
+    rows_column_exclusive_levels,
+    rows_column_fill,
+    rows_column_merge,
+    rows_column_merge_hash,
+    rows_column_merge_levels,
+    rows_column_move,
+    rows_column_quote,
+    rows_column_replace,
+    rows_column_select,
     table_sort,
     values_equal_index_group,
     values_non_empty,
@@ -304,3 +320,299 @@ def test_table_sort_0202N():  # float
     assert tbl._rows[0] == ["a", "1.1", "x"]
     assert tbl._rows[1] == ["c", "2.3", "z"]
     assert tbl._rows[2] == ["b", "10.2", "y"]
+
+
+def test_rows_column_add_0101N():
+    rows = list(rows_column_add(copy.deepcopy(TABLE_3x3), [0, -1, 1], column_count=2))
+    assert rows[0] == ["", "", "a", "", "", "b", "c", "", ""]
+
+
+def test_rows_column_del_0101N():
+    rows = list(rows_column_del(copy.deepcopy(TABLE_3x3), [0, 2]))
+    assert rows == [["b"], ["2"], ["5"]]
+
+
+def test_rows_column_move_0101N():  # カラム数が異なる行は、行ごとに移動した場合と同じになるか
+    rows = [["a", "b", "c", "d", "e"], ["1", "2"], ["3", "4", "5", "6", "7", "8"], ["9"]]
+    expected = copy.deepcopy(rows)
+    for row in expected:
+        row.insert(2, row.pop(0))
+    assert list(rows_column_move(copy.deepcopy(rows), [0], [2])) == expected
+    assert expected == [["b", "c", "a", "d", "e"], ["2", "1"], ["4", "5", "3", "6", "7", "8"], ["9"]]
+
+
+def test_rows_column_move_0201B():  # 空
+    assert list(rows_column_move([], [0], [2])) == []
+
+
+def test_rows_column_fill_0101N():  # constant,column_if
+    LOCAL_TABLE_3x3 = [
+        ["a", "", ""],
+        ["", "", ""],
+        ["c", "2", ""],
+    ]
+    rows = list(rows_column_fill(copy.deepcopy(LOCAL_TABLE_3x3), [1, 2], "constant", "x", column_if="0!=''"))
+    assert rows == [["a", "x", "x"], ["", "", ""], ["c", "2", "x"]]
+
+
+def test_rows_column_fill_0102N():  # column
+    LOCAL_TABLE_2x2 = [
+        ["a", ""],
+        ["b", "2"],
+    ]
+    rows = list(rows_column_fill(copy.deepcopy(LOCAL_TABLE_2x2), [1], "column", "0"))
+    assert rows == [["a", "a"], ["b", "2"]]
+
+
+def test_rows_column_fill_0103N():  # ffill,複数カラムを1回の走査で埋める。カラムごとに実行した場合と同じ結果になるか
+    rand = random.Random(0)
+    rows = [[rand.choice(["", "1", "22", "a"]) for _ in range(4)] for _ in range(200)]
+    for column_if in [None, "0>=2", "1=='' or 3!='a' and 2<22"]:
+        tbl = Table.create_rows(copy.deepcopy(rows))
+        for column_index in [1, 3, 2]:
+            column_fill_index(tbl, column_index, "ffill", "x", column_if=column_if)
+        assert list(rows_column_fill(copy.deepcopy(rows), [1, 3, 2], "ffill", "x", column_if=column_if)) == tbl._rows
+
+
+def test_rows_column_fill_0201A():  # 未知のvalue_source
+    with pytest.raises(ValueError):
+        list(rows_column_fill(copy.deepcopy(TABLE_3x3), [1], "unknown", ""))
+
+
+@pytest.mark.parametrize(
+    "test_id, column_if, expected",
+    [
+        ("0101N", "0==''", [True, False, False, False, False]),
+        ("0102N", "0!=''", [False, True, True, True, True]),
+        ("0103N", "0<10", [False, True, False, False, False]),  # 数値として比較する
+        ("0104N", "0>=10", [False, False, True, True, False]),
+        ("0105N", "0>9.5", [False, False, True, True, False]),
+        ("0106N", "0<='b'", [True, True, True, True, True]),  # 文字列として比較する
+        ("0107N", "0>'10'", [False, True, False, True, True]),
+        ("0108N", "0!=100", [True, True, True, True, True]),  # ==,!=は文字列として比較する
+        ("0109N", "0>=2 and 1=='x'", [False, True, True, False, False]),
+        ("0110N", "0=='' or 1=='y' and 0>2", [True, False, False, True, False]),  # andはorより優先する
+        ("0111N", "1==' and ' or 0=='b'", [False, False, False, False, True]),  # クォート内のandは区切りにしない
+    ],
+)
+def test_column_if_compile(test_id, column_if, expected):
+    rows = [["", "x"], ["9", "x"], ["10", "x"], ["100.0", "y"], ["b", "z"]]
+    predicate = column_if_compile(column_if)
+    assert [predicate(row) for row in rows] == expected
+
+
+@pytest.mark.parametrize(
+    "test_id, column_if, expected",
+    [
+        ("0101N", "0==100", [False, False, False, True, False]),  # 数値として比較する
+        ("0102N", "0!=10", [True, True, False, True, True]),  # 数値ではない左辺値は!=のみTrue
+        ("0103N", "0=='100'", [False, False, False, False, False]),  # クォートで囲んだ値は文字列として比較する
+    ],
+)
+def test_column_if_compile_typed(test_id, column_if, expected):
+    rows = [[""], ["9"], ["10"], ["100.0"], ["b"]]
+    predicate = column_if_compile(column_if, typed=True)
+    assert [predicate(row) for row in rows] == expected
+
+
+@pytest.mark.parametrize(
+    "test_id, column_if, row, expected",
+    [
+        ("0101N", "1==rock and roll", ["", "rock and roll"], True),  # 両辺が比較ではないandは値の一部
+        ("0102N", "1==rock and roll", ["", "rock"], False),
+        ("0103N", "1==rock or 0==x", ["x", "pop"], True),  # 両辺が比較の場合は区切り
+        ("0104N", "1==a or b", ["", "a or b"], True),
+        ("0105N", "1==rock ", ["", "rock "], True),  # 末尾の空白も値に含む
+        ("0106N", "0==1", ["01", ""], False),  # ==,!=は文字列として比較する
+        ("0107N", "0==1", ["1.0", ""], False),
+        ("0108N", "0!=1", ["1.0", ""], True),
+    ],
+)
+def test_column_if_compile_compatible(test_id, column_if, row, expected):  # 以前の--column-ifと同じ結果になるか
+    assert column_if_compile(column_if)(row) == expected
+
+
+def test_column_if_compile_0201E():  # 未サポート演算子
+    with pytest.raises(Exception):
+        column_if_compile("0=1")
+
+
+def test_rows_column_quote_0101N():
+    rows = list(rows_column_quote([["a", '"b"', ""]], [0, 1, 2, 0]))
+    assert rows == [['"a"', '"b"', '""']]
+
+
+def test_rows_column_replace_0101N():
+    rows = list(rows_column_replace(copy.deepcopy(TABLE_3x3), [1], "[0-9]", "X"))
+    assert rows == [["a", "b", "c"], ["1", "X", "3"], ["4", "X", "6"]]
+
+
+def test_rows_column_select_0101N():
+    rows = list(rows_column_select(copy.deepcopy(TABLE_3x3), [2, 0]))
+    assert rows == [["c", "a"], ["3", "1"], ["6", "4"]]
+
+
+def column_exclusive_reference(rows: list[list[str]], column_group: list[list[int]]):
+    # 表に行を挿入しながら分割する、以前の実装
+    row_index = 0
+    while row_index < len(rows):
+        columns = rows[row_index]
+        index_group = values_non_empty_index_group(columns, column_group)
+        if len(index_group) >= 2:
+            duplicated_row = columns.copy()
+            rows.insert(row_index + 1, duplicated_row)
+            values_set_empty_index_group(columns, [column_group[i] for i in index_group[1:]])
+            values_set_empty(duplicated_row, column_group[index_group[0]])
+        row_index += 1
+    return rows
+
+
+@pytest.mark.parametrize(
+    "test_id, column_group",
+    [
+        ("0101N", [[1], [2]]),
+        ("0102N", [[1, 2], [3]]),
+        ("0103N", [[1], [2], [3]]),
+        ("0104N", [[1, 2], [2, 3]]),  # 重なるカラムグループ
+    ],
+)
+def test_rows_column_exclusive(test_id, column_group):  # 以前の実装と同じ結果になるか
+    rand = random.Random(0)
+    rows = [
+        [rand.choice("kj"), rand.choice(["", "1"]), rand.choice(["", "2"]), rand.choice(["", "3"])] for _ in range(300)
+    ]
+    expected = column_exclusive_reference(copy.deepcopy(rows), column_group)
+    assert list(rows_column_exclusive(copy.deepcopy(rows), column_group)) == expected
+    tbl = Table.create_rows(copy.deepcopy(rows))
+    column_exclusive_index_group(tbl, column_group)
+    assert tbl._rows == expected
+
+
+def test_rows_column_exclusive_0201B():  # 空,カラムグループに値がない行
+    assert list(rows_column_exclusive([], [[1], [2]])) == []
+    assert list(rows_column_exclusive([["k", "", ""], ["j"]], [[1], [2]])) == [["k", "", ""], ["j"]]
+
+
+def column_merge_reference(rows: list[list[str]], column_key: list[int], column_group: list[list[int]]):
+    # 行を削除しながら隣の行とマージする、以前の実装
+    other = set(range(len(rows[0]) if len(rows) > 0 else 0)).difference(column_key)
+    for column_index_list in column_group:
+        other = other.difference(column_index_list)
+    row_index = 0
+    while row_index + 1 < len(rows):
+        columns1, columns2 = rows[row_index], rows[row_index + 1]
+        index_group1 = set(values_non_empty_index_group(columns1, column_group))
+        index_group2 = set(values_non_empty_index_group(columns2, column_group))
+        if (
+            not values_equal_index_group(columns1, columns2, column_key)
+            or not index_group1.isdisjoint(index_group2)
+            or not values_equal_index_group(columns1, columns2, list(other))
+        ):
+            row_index += 1
+            continue
+        for i in index_group2:
+            for j in column_group[i]:
+                columns1[j] = columns2[j]
+        rows.pop(row_index + 1)
+    return rows
+
+
+@pytest.mark.parametrize(
+    "test_id, column_group",
+    [
+        ("0101N", [[1], [2]]),
+        ("0102N", [[1, 2], [3]]),
+        ("0103N", [[1], [2], [3]]),
+        ("0104N", [[1, 2], [2, 3]]),  # 重なるカラムグループ
+    ],
+)
+def test_rows_column_merge(test_id, column_group):  # 以前の実装と同じ結果になるか
+    rand = random.Random(0)
+    rows = [
+        [rand.choice("kj"), rand.choice(["", "1"]), rand.choice(["", "2"]), rand.choice(["", "3"]), rand.choice("xy")]
+        for _ in range(300)
+    ]
+    expected = column_merge_reference(copy.deepcopy(rows), [0], column_group)
+    assert list(rows_column_merge(copy.deepcopy(rows), [0], column_group)) == expected
+    tbl = Table.create_rows(copy.deepcopy(rows))
+    column_merge_index_group(tbl, [0], column_group)
+    assert tbl._rows == expected
+
+
+def test_rows_column_merge_0201B():  # 空,1行
+    assert list(rows_column_merge([], [0], [[1], [2]])) == []
+    assert list(rows_column_merge([["k", "1", ""]], [0], [[1], [2]])) == [["k", "1", ""]]
+
+
+@pytest.mark.parametrize(
+    "test_id, column_group, group_max",
+    [
+        ("0101N", [[1], [2]], None),
+        ("0102N", [[1, 2], [3]], None),
+        ("0103N", [[1], [2], [3]], 1000),
+        ("0104N", [[1], [2], [3]], 3),  # 一時ファイルを使用する
+        ("0105N", [[1, 2], [2, 3]], 0),  # 重なるカラムグループ。最初から一時ファイルを使用する
+    ],
+)
+def test_rows_column_merge_hash(test_id, column_group, group_max):  # キーでソートしてからマージした結果と同じになるか
+    rand = random.Random(0)
+    rows = [
+        [rand.choice("kjlm"), rand.choice(["", "1"]), rand.choice(["", "2"]), rand.choice(["", "3"]), rand.choice("xy")]
+        for _ in range(300)
+    ]
+    key_column = [0] + [i for i in range(1, 5) if all(i not in column_index_list for column_index_list in column_group)]
+    first_seen: dict[tuple[str, ...], int] = {}
+    for row_index, row in enumerate(rows):
+        first_seen.setdefault(tuple(row[i] for i in key_column), row_index)
+    sorted_rows = sorted(copy.deepcopy(rows), key=lambda row: first_seen[tuple(row[i] for i in key_column)])
+    expected = list(rows_column_merge(sorted_rows, [0], column_group))
+    assert list(rows_column_merge_hash(copy.deepcopy(rows), [0], column_group, group_max=group_max)) == expected
+
+
+def test_rows_column_merge_hash_0201B():  # 空,1行,カラム数が異なる行
+    assert list(rows_column_merge_hash([], [0], [[1], [2]])) == []
+    assert list(rows_column_merge_hash([["k", "1", ""]], [0], [[1], [2]], group_max=0)) == [["k", "1", ""]]
+    rows = [["k", "1", "", "x"], ["j"], ["k", "", "2", "x"], ["j"]]
+    expected = [["k", "1", "2", "x"], ["j"]]
+    assert list(rows_column_merge_hash(copy.deepcopy(rows), [0], [[1], [2]])) == expected
+    assert list(rows_column_merge_hash(copy.deepcopy(rows), [0], [[1], [2]], group_max=1)) == expected
+
+
+@pytest.mark.parametrize(
+    "test_id, column_group_tree, expected",
+    [
+        ("0101N", [[1, 2], [3]], [[[1, 2], [3]]]),
+        ("0102N", [[[1, 2], [3, 4]], [5, 6]], [[[1, 2, 3, 4], [5, 6]], [[1, 2], [3, 4]]]),
+        ("0103N", [[[[1], [2]], [3]], [[4], [5]]], [[[1, 2, 3], [4, 5]], [[1, 2], [3], [4], [5]], [[1], [2]]]),
+    ],
+)
+def test_column_group_levels(test_id, column_group_tree, expected):
+    assert column_group_levels(column_group_tree) == expected
+
+
+@pytest.mark.parametrize(
+    "test_id, column_group_tree",
+    [
+        ("0201E", [[]]),  # 空のカラムグループ
+        ("0202E", [[1, [2]]]),  # インデックスとカラムグループの混在
+        ("0203E", [1]),  # カラムグループではない
+    ],
+)
+def test_column_group_levels_error(test_id, column_group_tree):
+    with pytest.raises(ValueError):
+        column_group_levels(column_group_tree)
+
+
+def test_rows_column_exclusive_levels_0101N():  # 階層ごとに実行した場合と同じ結果になり、マージで元に戻るか
+    rand = random.Random(0)
+    rows = [[f"k{i}"] + [rand.choice(["", str(c)]) for c in range(1, 7)] for i in range(300)]
+    levels = column_group_levels([[[1, 2], [3, 4]], [[5], [6]]])
+    expected = copy.deepcopy(rows)
+    for column_group in levels:
+        expected = list(rows_column_exclusive(expected, column_group))
+    exclusive = list(rows_column_exclusive_levels(copy.deepcopy(rows), levels))
+    assert exclusive == expected
+    assert list(rows_column_merge_levels(copy.deepcopy(exclusive), [0], levels)) == rows
+    random.Random(1).shuffle(exclusive)
+    merged = list(rows_column_merge_levels(exclusive, [0], levels, group_by_hash=True, group_max=10))
+    assert sorted(merged) == sorted(rows)
@@ -10,6 +10,9 @@ from src.table_utl import check_column_if
     [
         ("0101N", "", "!=", "", False),
         ("0101N", "", "==", "", True),
+        ("0101N", "01", "==", "1", False),  # 文字列として比較する
+        ("0102N", "2", "<", "10", True),
+        ("0102N", "b", ">=", "a", True),
     ],
 )
 def test_check_column_if_0001X(test_id: str, v_left: str, operator: str, v_right: str, expected: bool) -> None:
@@ -1,10 +1,16 @@
 import sys
+import tempfile
+import timeit
 from io import TextIOWrapper
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 import click
 
+from src.common import split_csv_string_no_normalize, split_csv_string_no_normalize_fast
+from src.csv import csv_file_row_writer
+from src.csv_engine import PARSE_ENGINES
+
 __VERSION__ = "0.0.1"
 
 
@@ -134,6 +140,87 @@ def make_csv(output: Optional[str], header_count: int, column_count: int, row_co
     return 0
 
 
+def bench_lines(column_count: int, row_count: int, *, quote: bool = False) -> list[str]:
+    """!
+    @brief ベンチマーク用の行を作成する
+    @param column_count カラム数
+    @param row_count 行数
+    @param quote 1カラムおきにダブルクォートで囲む
+    @return 行のリスト
+    """
+    lines: list[str] = []
+    for row_index in range(row_count):
+        values = [str(row_index * 100 + i) for i in range(column_count)]
+        if quote:
+            values = [f'"{v},{v}"' if i % 2 == 0 else v for i, v in enumerate(values)]
+        lines.append(",".join(values))
+    return lines
+
+
+def bench_time(func: Callable[[], object], *, repeat: int = 3) -> float:
+    """!
+    @brief 処理時間を計測する
+    @param func 計測する関数
+    @param repeat 繰り返し回数
+    @return 最小の処理時間(秒)
+    """
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+@click.command(name="bench-split", help="CSV行の分割処理のベンチマーク")
+@click.option("--column-count", type=int, default=30, help="カラム数")
+@click.option("--row-count", type=int, default=100000, help="行数")
+@click.option("--quote", is_flag=True, help="ダブルクォートを含む行にする")
+@click.option("--maxsplit", type=int, default=-1, help="分割するフィールド数(必要なカラムまで分割する場合の比較)")
+def bench_split(column_count: int, row_count: int, quote: bool, maxsplit: int) -> int:
+    """!
+    @brief split_csv_string_no_normalize()と高速版の処理時間を比較する
+    @retval 0 正常終了
+    """
+    lines = bench_lines(column_count, row_count, quote=quote)
+    t_base = bench_time(lambda: [split_csv_string_no_normalize(line) for line in lines])
+    t_fast = bench_time(lambda: [split_csv_string_no_normalize_fast(line) for line in lines])
+    print(f"split_csv_string_no_normalize      {t_base:.3f}s")
+    print(f"split_csv_string_no_normalize_fast {t_fast:.3f}s ({t_base / t_fast:.1f}x)")
+    for name, parse_lines in PARSE_ENGINES.items():
+        t_engine = bench_time(lambda: parse_lines(lines))
+        print(f"engine={name:<27} {t_engine:.3f}s ({t_base / t_engine:.1f}x)")
+    if maxsplit >= 0:
+        t_project = bench_time(lambda: PARSE_ENGINES["auto"](lines, maxsplit=maxsplit))
+        print(f"engine=auto maxsplit={maxsplit:<14} {t_project:.3f}s ({t_base / t_project:.1f}x)")
+    return 0
+
+
+def bench_write_per_row(file: Path, rows: list[list[str]]):
+    """!
+    @brief 1行ごとにwrite()を呼び出して書き込む(従来のcsv_writer()と同じ方法)
+    @param file 出力ファイル
+    @param rows 行のリスト
+    """
+    with file.open(mode="w", encoding="utf-8") as o_stream:
+        for row in rows:
+            o_stream.write(",".join(row))
+            o_stream.write("\n")
+
+
+@click.command(name="bench-write", help="CSVファイルの書き込み処理のベンチマーク")
+@click.option("--column-count", type=int, default=30, help="カラム数")
+@click.option("--row-count", type=int, default=100000, help="行数")
+def bench_write(column_count: int, row_count: int) -> int:
+    """!
+    @brief 1行ごとの書き込みとcsv_file_row_writer()の処理時間を比較する
+    @retval 0 正常終了
+    """
+    rows = [line.split(",") for line in bench_lines(column_count, row_count)]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file = Path(tmp_dir) / "bench.csv"
+        t_base = bench_time(lambda: bench_write_per_row(file, rows))
+        t_fast = bench_time(lambda: csv_file_row_writer(file, rows))
+    print(f"write per row       {t_base:.3f}s")
+    print(f"csv_file_row_writer {t_fast:.3f}s ({t_base / t_fast:.1f}x)")
+    return 0
+
+
 # サブコマンドをメインコマンドに追加
 @click.group(help="CSVファイルのテスト用ツール")
 @click.version_option(version=__VERSION__)
@@ -142,6 +229,8 @@ def cli():
 
 
 cli.add_command(make_csv)
+cli.add_command(bench_split)
+cli.add_command(bench_write)
 
 if __name__ == "__main__":
     rc = cli(standalone_mode=False)